@@ -5,13 +5,34 @@ Main API server that handles:
 - Image upload
 - Model inference
 - Result delivery
+
+Concurrent /api/predict requests are grouped into batches by a MicroBatcher
+(DERMASCAN_MAX_BATCH images per forward, waiting at most
+DERMASCAN_MAX_WAIT_MS). Results are cached by a hash of the uploaded bytes
+and of the model version (LRU of DERMASCAN_CACHE_SIZE entries, expiring after
+DERMASCAN_CACHE_TTL_S), and identical concurrent uploads share one forward.
+Batching and cache statistics are served at /api/metrics.
+
+/api/predict/batch takes many files (or zip archives of images) in one
+request; every image goes through the same cache, preprocessing pool and
+micro-batcher, so they are decoded in parallel and scored max_batch at a time.
+/api/predict/tensor takes already preprocessed (N, 3, H, W) tensors as raw
+bytes (.npy or octet-stream with shape/dtype headers) and skips decoding.
+Nothing CPU-bound runs on the event loop: decoding and preprocessing go to a
+thread pool sized to the cores BLAS leaves free, the forward runs on the
+batcher's own thread.
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+import asyncio
+import io
+import zipfile
+from typing import List
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, JSONResponse
 import numpy as np
+import os
 from pathlib import Path
 import sys
 
@@ -19,6 +40,10 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from dermascan.inference.predictor import DermaScanPredictor
+from dermascan.inference.batching import MicroBatcher
+from dermascan.inference.cache import PredictionCache, prediction_key
+from dermascan.inference.tensor_payload import parse_tensor
+from dermascan.inference.threads import make_preprocess_executor
 from dermascan.preprocessing.image_processor import ImageProcessor
 from dermascan.database.conditions import SkinConditionDatabase
 
@@ -41,9 +66,32 @@ app.add_middleware(
 app.mount("/static", StaticFiles(directory="frontend/static"), name="static")
 
 # Initialize components
-predictor = DermaScanPredictor()
+predictor = DermaScanPredictor(os.environ.get("DERMASCAN_MODEL_PATH"))
 processor = ImageProcessor()
 db = SkinConditionDatabase()
+preprocess_pool = make_preprocess_executor()
+cache = PredictionCache(
+    max_entries=int(os.environ.get("DERMASCAN_CACHE_SIZE", 1024)),
+    ttl_s=float(os.environ.get("DERMASCAN_CACHE_TTL_S", 3600)),
+)
+batcher = MicroBatcher(
+    predictor.predict_batch,
+    max_batch=int(os.environ.get("DERMASCAN_MAX_BATCH", 16)),
+    max_wait_ms=float(os.environ.get("DERMASCAN_MAX_WAIT_MS", 5)),
+)
+
+
+@app.on_event("startup")
+async def start_batcher():
+    await batcher.start()
+    # hash the weights for cache keys now rather than on the first request
+    await asyncio.get_running_loop().run_in_executor(preprocess_pool, lambda: predictor.model_version)
+
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    await batcher.stop()
+    preprocess_pool.shutdown(wait=False)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -59,6 +107,38 @@ async def health_check():
     return {"status": "healthy", "version": "0.1.0"}
 
 
+async def predict_bytes(contents: bytes) -> list:
+    """Decode and preprocess off the event loop, then predict in a micro-batch"""
+    processed_image = await asyncio.get_running_loop().run_in_executor(
+        preprocess_pool, processor.process_uploaded_image, contents
+    )
+    return await batcher.submit(processed_image)
+
+
+DISCLAIMER = "This is not a medical diagnosis. Please consult a healthcare professional."
+
+
+def format_predictions(predictions: list) -> list:
+    """Top 3 predictions with condition details"""
+    results = []
+    for pred in predictions[:3]:
+        condition_info = db.get_condition_info(pred['class_name'])
+        results.append({
+            "condition": pred['class_name'],
+            "confidence": float(pred['confidence']),
+            "description": condition_info['description'],
+            "severity": condition_info['severity'],
+            "recommendations": condition_info['recommendations']
+        })
+    return results
+
+
+async def predict_cached(contents: bytes) -> list:
+    """Predictions for raw image bytes, through the cache"""
+    key = prediction_key(contents, predictor.model_version)
+    return await cache.get_or_compute(key, lambda: predict_bytes(contents))
+
+
 @app.post("/api/predict")
 async def predict_condition(file: UploadFile = File(...)):
     """
@@ -75,35 +155,140 @@ async def predict_condition(file: UploadFile = File(...)):
         if not file.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="File must be an image")
 
-        # Read and process image
+        # Read image; identical uploads are served from the cache or share
+        # the computation already in flight
         contents = await file.read()
-        processed_image = processor.process_uploaded_image(contents)
-
-        # Get predictions
-        predictions = predictor.predict(processed_image)
+        predictions = await predict_cached(contents)
 
         # Get top 3 predictions with details
-        results = []
-        for pred in predictions[:3]:
-            condition_info = db.get_condition_info(pred['class_name'])
-            results.append({
-                "condition": pred['class_name'],
-                "confidence": float(pred['confidence']),
-                "description": condition_info['description'],
-                "severity": condition_info['severity'],
-                "recommendations": condition_info['recommendations']
-            })
+        results = format_predictions(predictions)
 
         return JSONResponse(content={
             "success": True,
             "predictions": results,
-            "warning": "This is not a medical diagnosis. Please consult a healthcare professional."
+            "warning": DISCLAIMER
         })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
+BATCH_MAX_IMAGES = int(os.environ.get("DERMASCAN_BATCH_MAX_IMAGES", 1000))
+BATCH_MAX_UNZIPPED = 1 << 30  # refuse archives expanding beyond 1 GiB
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp"}
+
+
+def unzip_images(data: bytes) -> List[tuple]:
+    """(name, bytes) of the image entries of a zip archive"""
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        entries = [i for i in zf.infolist()
+                   if not i.is_dir() and Path(i.filename).suffix.lower() in IMAGE_EXTENSIONS
+                   and not Path(i.filename).name.startswith(".")]
+        if sum(i.file_size for i in entries) > BATCH_MAX_UNZIPPED:
+            raise ValueError("Archive too large once extracted")
+        return [(i.filename, zf.read(i)) for i in entries]
+
+
+@app.post("/api/predict/batch")
+async def predict_condition_batch(files: List[UploadFile] = File(...)):
+    """
+    Predict skin conditions for many images in one request
+
+    Args:
+        files: Image files and/or zip archives of images
+
+    Returns:
+        JSON with one result per image, in upload order; images that fail
+        carry an error instead of predictions
+    """
+    loop = asyncio.get_running_loop()
+    images = []
+    for file in files:
+        contents = await file.read()
+        is_zip = (file.content_type in ("application/zip", "application/x-zip-compressed")
+                  or (file.filename or "").lower().endswith(".zip"))
+        if is_zip:
+            try:
+                images.extend(await loop.run_in_executor(preprocess_pool, unzip_images, contents))
+            except (zipfile.BadZipFile, ValueError) as e:
+                raise HTTPException(status_code=400, detail=f"{file.filename}: {e}")
+        elif file.content_type and file.content_type.startswith("image/"):
+            images.append((file.filename, contents))
+        else:
+            raise HTTPException(status_code=400, detail=f"{file.filename}: must be an image or a zip archive")
+        if len(images) > BATCH_MAX_IMAGES:
+            raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_IMAGES} images per request")
+
+    # bound the decoded tensors alive at once; the batcher forms the chunks
+    in_flight = asyncio.Semaphore(4 * batcher.max_batch)
+
+    async def score(name: str, contents: bytes) -> dict:
+        async with in_flight:
+            try:
+                predictions = await predict_cached(contents)
+            except Exception as e:
+                return {"filename": name, "success": False, "error": str(e)}
+        return {"filename": name, "success": True, "predictions": format_predictions(predictions)}
+
+    results = await asyncio.gather(*[score(name, contents) for name, contents in images])
+    return JSONResponse(content={
+        "success": True,
+        "count": len(results),
+        "results": results,
+        "warning": DISCLAIMER
+    })
+
+
+@app.post("/api/predict/tensor")
+async def predict_tensor(request: Request):
+    """
+    Predict from raw preprocessed tensors, without image decoding
+
+    Body is either a .npy file (Content-Type: application/x-npy) or raw
+    bytes (application/octet-stream) with X-Tensor-Shape (e.g. 8,3,224,224)
+    and X-Tensor-Dtype headers. uint8 tensors are raw RGB pixels and are
+    normalized here; float32 tensors must already be normalized.
+
+    Returns:
+        JSON with one result per image, in order, shaped like those of
+        /api/predict/batch (index instead of filename)
+    """
+    body = await request.body()
+    try:
+        x = parse_tensor(
+            body,
+            request.headers.get("content-type"),
+            processor.target_size,
+            shape_header=request.headers.get("x-tensor-shape"),
+            dtype_header=request.headers.get("x-tensor-dtype"),
+            max_images=BATCH_MAX_IMAGES,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if x.dtype == np.uint8:
+        x = await asyncio.get_running_loop().run_in_executor(preprocess_pool, processor.normalize_uint8, x)
+    try:
+        # per-image views into the payload; the batcher groups them max_batch at a time
+        predictions = await asyncio.gather(*[batcher.submit(x[i]) for i in range(x.shape[0])])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+    results = [{"index": i, "success": True, "predictions": format_predictions(p)}
+               for i, p in enumerate(predictions)]
+    return JSONResponse(content={
+        "success": True,
+        "count": len(results),
+        "results": results,
+        "warning": DISCLAIMER
+    })
+
+
+@app.get("/api/metrics")
+async def metrics():
+    """Micro-batching (batch sizes, queue wait, forward time) and cache (hit rate) statistics"""
+    return {"batching": batcher.stats(), "cache": cache.stats()}
+
+
 @app.get("/api/conditions")
 async def list_conditions():
     """Get list of all supported skin conditions"""
@@ -0,0 +1,220 @@
+"""
+Multi-Worker Supervisor for the DermaScan API
+
+Runs N uvicorn worker processes that share one listening socket and one copy
+of the model weights:
+- the weights are exported once to a float32 checkpoint that every worker
+  maps read-only (DERMASCAN_MODEL_PATH), so N workers cost one physical copy
+  of the weights instead of N; a checkpoint already in float32 is mapped
+  as is;
+- each worker pre-warms its predictor (dummy forwards) and reports ready
+  only once its server is up, before it is counted as serving;
+- SIGHUP triggers a rolling restart: the weights are re-exported, then each
+  worker is replaced by a new one that is started and warmed up first, and
+  the old one is stopped gracefully (it finishes its in-flight requests).
+  The socket stays open throughout, so no request is refused;
+- workers that die are replaced; SIGTERM/SIGINT stop everything.
+
+Usage:
+    python -m dermascan.api.supervisor --workers 4 --weights data/dermatology/models/dermascan_best.ckpt
+    kill -HUP <supervisor pid>   # rolling restart, e.g. after new weights
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from dermascan.inference.threads import BLAS_ENV_VARS
+from src.models.checkpoint import is_checkpoint, read_header
+
+
+def _export(model_path: str, flat_path: str):
+    """Child process: load the weights once and write the float32 checkpoint"""
+    from dermascan.inference.predictor import DermaScanPredictor
+    DermaScanPredictor(model_path, compile=False).export_flat(flat_path)
+
+
+def _is_float32_checkpoint(path: Optional[str]) -> bool:
+    """From the header index alone: a checkpoint whose arrays are all float32"""
+    if path is None or not Path(path).exists() or not is_checkpoint(path):
+        return False
+    return all(dtype == "<f4" for _, _, dtype in read_header(path)["arrays"].values())
+
+
+def _serve(sock: socket.socket, ready, warmup_batches: Tuple[int, ...]):
+    """Child process: warm up the predictor, then serve on the shared socket"""
+    import uvicorn
+    from dermascan.api import app as app_module
+
+    app_module.predictor.warmup(warmup_batches)
+    # ready once the app has started (batcher running), not just imported
+    app_module.app.router.on_startup.append(ready.set)
+    server = uvicorn.Server(uvicorn.Config(app_module.app, log_level="info", timeout_graceful_shutdown=30))
+    server.run(sockets=[sock])
+
+
+class Supervisor:
+    """
+    Prefork supervisor with pre-warming and rolling restarts
+
+    Attributes:
+        weights: Source weights (checkpoint or legacy .npz)
+        flat_path: float32 checkpoint the workers map
+        workers: Number of worker processes
+        ready_timeout: Seconds a new worker gets to warm up
+        graceful_timeout: Seconds an old worker gets to drain before SIGKILL
+    """
+
+    def __init__(
+        self,
+        weights: Optional[str],
+        flat_path: str,
+        host: str = "0.0.0.0",
+        port: int = 8000,
+        workers: int = 2,
+        warmup_batches: Tuple[int, ...] = (1,),
+        ready_timeout: float = 120.0,
+        graceful_timeout: float = 30.0,
+    ):
+        self.weights = weights
+        self.flat_path = flat_path
+        self.host = host
+        self.port = port
+        self.workers = max(1, int(workers))
+        self.warmup_batches = tuple(warmup_batches)
+        self.ready_timeout = ready_timeout
+        self.graceful_timeout = graceful_timeout
+
+        # spawn: children start clean instead of inheriting our memory and BLAS state
+        self.ctx = mp.get_context("spawn")
+        self.sock: Optional[socket.socket] = None
+        self.procs: List[mp.Process] = []
+        self._restart = False
+        self._stop = False
+
+    # -------- setup --------
+    def export_weights(self):
+        """Write the float32 checkpoint in a throwaway process"""
+        if _is_float32_checkpoint(self.weights):
+            self.flat_path = self.weights
+        else:
+            p = self.ctx.Process(target=_export, args=(self.weights, self.flat_path))
+            p.start()
+            p.join()
+            if p.exitcode != 0:
+                raise RuntimeError(f"Exporting {self.weights} to {self.flat_path} failed")
+        os.environ["DERMASCAN_MODEL_PATH"] = self.flat_path
+
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _limit_blas_threads(self):
+        # N workers share the cores; explicit settings win
+        per_worker = str(max(1, (os.cpu_count() or 1) // self.workers))
+        for var in BLAS_ENV_VARS:
+            os.environ.setdefault(var, per_worker)
+
+    # -------- workers --------
+    def _spawn(self) -> Optional[mp.Process]:
+        """Start one worker and wait until it is warm; None if it never gets ready"""
+        ready = self.ctx.Event()
+        proc = self.ctx.Process(target=_serve, args=(self.sock, ready, self.warmup_batches), daemon=False)
+        proc.start()
+        deadline = time.monotonic() + self.ready_timeout
+        while not ready.wait(0.2):
+            if not proc.is_alive() or time.monotonic() > deadline:
+                print(f"⚠️  Worker {proc.pid} failed to start")
+                self._terminate(proc)
+                return None
+        print(f"✅ Worker {proc.pid} ready")
+        return proc
+
+    def _terminate(self, proc: mp.Process):
+        """SIGTERM (uvicorn drains in-flight requests), SIGKILL after graceful_timeout"""
+        if proc.is_alive():
+            proc.terminate()
+            proc.join(self.graceful_timeout)
+        if proc.is_alive():
+            proc.kill()
+            proc.join()
+
+    def rolling_restart(self):
+        """Replace workers one at a time, starting each replacement before stopping the old one"""
+        print("🔄 Rolling restart")
+        self.export_weights()
+        for i, old in enumerate(list(self.procs)):
+            new = self._spawn()
+            if new is None:
+                print("⚠️  Keeping the remaining old workers")
+                return
+            self.procs[i] = new
+            self._terminate(old)
+
+    # -------- main loop --------
+    def run(self):
+        self._limit_blas_threads()
+        self.export_weights()
+        self.sock = self._bind()
+        print(f"🚀 Serving on http://{self.host}:{self.port} with {self.workers} workers")
+
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "_restart", True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "_stop", True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, "_stop", True))
+
+        for _ in range(self.workers):
+            proc = self._spawn()
+            if proc is None:
+                raise RuntimeError("Worker failed to start")
+            self.procs.append(proc)
+
+        try:
+            while not self._stop:
+                time.sleep(0.5)
+                if self._restart:
+                    self._restart = False
+                    self.rolling_restart()
+                for i, proc in enumerate(self.procs):
+                    if not proc.is_alive() and not self._stop:
+                        print(f"⚠️  Worker {proc.pid} exited with {proc.exitcode}, replacing it")
+                        self.procs[i] = self._spawn() or proc
+        finally:
+            print("🛑 Stopping workers")
+            for proc in self.procs:
+                if proc.is_alive():
+                    proc.terminate()
+            for proc in self.procs:
+                self._terminate(proc)
+            self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the DermaScan API with N pre-warmed workers")
+    parser.add_argument("--weights", type=str, default="data/dermatology/models/dermascan_best.ckpt",
+                        help="Source checkpoint, exported once to --flat unless already float32")
+    parser.add_argument("--flat", type=str, default="data/dermatology/models/dermascan_best.f32.ckpt",
+                        help="float32 checkpoint mapped by the workers")
+    parser.add_argument("--host", type=str, default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--warmup-batches", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+
+    Supervisor(args.weights, args.flat, args.host, args.port, args.workers, tuple(args.warmup_batches)).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""
+Data Module for DermaScan
+
+Dataset ingestion and storage for dermatology images (HAM10000).
+"""
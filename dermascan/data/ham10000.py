@@ -0,0 +1,258 @@
+"""
+HAM10000 Ingestion and Tensor Store
+
+Decodes the HAM10000 JPEGs once, in a process pool, into fixed-size uint8
+NCHW memmap shards at the configured image size, plus label and lesion-id
+index arrays. Re-running the ingestion only processes images that are not
+in the store yet, so training never decodes a JPEG per epoch.
+
+Store layout (e.g. data/dermatology/processed/ham10000_224x224/):
+    manifest.json        image size, shard size, count, ordered image ids
+    shard_0000.npy ...   uint8 (shard_size, 3, H, W), last shard partially filled
+    labels.npy           int64 class ids (order of DermaScanPredictor.DEFAULT_CLASSES)
+    lesion_ids.npy       lesion id per image (several images can share a lesion)
+
+For training, `store.images` is an array-like (N, 3, H, W) uint8 view that
+src.data.cache.IndexedView and src.data.batching.BatchIterator gather from,
+and split_by_lesion() keeps every photo of a lesion in the same split.
+"""
+
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+# HAM10000 diagnosis codes -> class ids (same order as DermaScanPredictor.DEFAULT_CLASSES)
+DX_TO_CLASS = {"akiec": 0, "bcc": 1, "bkl": 2, "df": 3, "mel": 4, "nv": 5, "vasc": 6}
+
+MANIFEST = "manifest.json"
+
+
+def _decode(args: Tuple[str, Tuple[int, int]]) -> np.ndarray:
+    """Decode one JPEG and resize it to (H, W); returns uint8 (3, H, W)."""
+    path, (H, W) = args
+    with Image.open(path) as img:
+        img.draft("RGB", (W, H))  # let the JPEG decoder downscale when possible
+        img = img.convert("RGB").resize((W, H), Image.LANCZOS)
+        return np.asarray(img, dtype=np.uint8).transpose(2, 0, 1)
+
+
+def _atomic_save(path: Path, arr: np.ndarray) -> None:
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp, path)
+
+
+def read_metadata(raw_dir: Path) -> List[Dict[str, str]]:
+    """Rows of HAM10000_metadata.csv (lesion_id, image_id, dx, ...)."""
+    with open(raw_dir / "HAM10000_metadata.csv", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def find_images(raw_dir: Path) -> Dict[str, Path]:
+    """Map image_id -> JPEG path across HAM10000_images_part_* folders."""
+    return {p.stem: p for p in raw_dir.rglob("*.jpg")}
+
+
+def store_dir(data_dir: Path, image_size: Tuple[int, int]) -> Path:
+    H, W = image_size
+    return Path(data_dir) / "processed" / f"ham10000_{H}x{W}"
+
+
+def ingest(
+    raw_dir: Path,
+    out_dir: Path,
+    image_size: Tuple[int, int] = (224, 224),
+    shard_size: int = 1024,
+    workers: int | None = None,
+) -> int:
+    """
+    Ingest new HAM10000 images into the store at out_dir.
+
+    Args:
+        raw_dir: Folder with HAM10000_metadata.csv and the image folders
+        out_dir: Store directory
+        image_size: Target (H, W)
+        shard_size: Images per shard (fixed once the store exists)
+        workers: Decode processes (default: os.cpu_count())
+
+    Returns:
+        Number of images added
+    """
+    raw_dir, out_dir = Path(raw_dir), Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    H, W = int(image_size[0]), int(image_size[1])
+
+    manifest_path = out_dir / MANIFEST
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        if tuple(manifest["image_size"]) != (H, W):
+            raise ValueError(f"Store at {out_dir} holds {manifest['image_size']} images, not {[H, W]}")
+        # the index arrays are saved before the manifest: entries past the
+        # committed count come from an interrupted ingest and are dropped
+        count = int(manifest["count"])
+        labels = list(np.load(out_dir / "labels.npy")[:count])
+        lesions = list(np.load(out_dir / "lesion_ids.npy")[:count])
+    else:
+        manifest = {"image_size": [H, W], "shard_size": int(shard_size), "count": 0, "image_ids": []}
+        labels, lesions = [], []
+    shard_size = int(manifest["shard_size"])
+
+    done = set(manifest["image_ids"])
+    images = find_images(raw_dir)
+    todo = [r for r in read_metadata(raw_dir)
+            if r["image_id"] not in done and r["image_id"] in images and r["dx"] in DX_TO_CLASS]
+    if not todo:
+        return 0
+
+    count = int(manifest["count"])
+    shard = None
+    shard_idx = -1
+    jobs = ((str(images[r["image_id"]]), (H, W)) for r in todo)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for row, img in zip(todo, pool.map(_decode, jobs, chunksize=16)):
+            k, j = divmod(count, shard_size)
+            if k != shard_idx:
+                if shard is not None:
+                    shard.flush()
+                path = out_dir / f"shard_{k:04d}.npy"
+                if path.exists():
+                    shard = np.load(path, mmap_mode="r+")
+                else:
+                    shard = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8,
+                                                      shape=(shard_size, 3, H, W))
+                shard_idx = k
+            shard[j] = img
+            labels.append(DX_TO_CLASS[row["dx"]])
+            lesions.append(row["lesion_id"])
+            manifest["image_ids"].append(row["image_id"])
+            count += 1
+    if shard is not None:
+        shard.flush()
+        del shard
+
+    # index arrays first, manifest last: the manifest count is the commit point
+    _atomic_save(out_dir / "labels.npy", np.asarray(labels, dtype=np.int64))
+    _atomic_save(out_dir / "lesion_ids.npy", np.asarray(lesions, dtype=str))
+    manifest["count"] = count
+    tmp = manifest_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest))
+    os.replace(tmp, manifest_path)
+    return len(todo)
+
+
+class HAM10000Store:
+    """
+    Read-only view of an ingested store.
+
+    store[i] -> (uint8 image (3, H, W), label), usable with src.data.loader.DataLoader.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        manifest = json.loads((self.path / MANIFEST).read_text())
+        self.image_size = tuple(manifest["image_size"])
+        self.shard_size = int(manifest["shard_size"])
+        self.count = int(manifest["count"])
+        self.image_ids = manifest["image_ids"]
+        self.labels = np.load(self.path / "labels.npy")[:self.count]
+        self.lesion_ids = np.load(self.path / "lesion_ids.npy")[:self.count]
+        n_shards = -(-self.count // self.shard_size)
+        self.shards = [np.load(self.path / f"shard_{k:04d}.npy", mmap_mode="r") for k in range(n_shards)]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> Tuple[np.ndarray, int]:
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        k, j = divmod(int(i), self.shard_size)
+        return self.shards[k][j], int(self.labels[i])
+
+    def read(self, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Contiguous rows [start, stop) as sequential shard reads (block dataset
+        protocol of src.data.batching.BlockShuffleIterator).
+        """
+        stop = min(stop, self.count)
+        parts = []
+        i = start
+        while i < stop:
+            k, j = divmod(i, self.shard_size)
+            n = min(stop - i, self.shard_size - j)
+            parts.append(self.shards[k][j:j + n])
+            i += n
+        X = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return X, self.labels[start:stop]
+
+    def get_batch(self, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Gather uint8 images (N, 3, H, W) and labels, reading shard by shard."""
+        indices = np.asarray(indices, dtype=np.int64)
+        out = np.empty((indices.size, 3) + self.image_size, dtype=np.uint8)
+        k = indices // self.shard_size
+        for shard in np.unique(k):
+            sel = np.nonzero(k == shard)[0]
+            out[sel] = self.shards[shard][indices[sel] % self.shard_size]
+        return out, self.labels[indices]
+
+    @property
+    def images(self) -> "StoreImages":
+        """Array-like view of all images, gathered with get_batch."""
+        return StoreImages(self)
+
+
+class StoreImages:
+    """
+    (N, 3, H, W) uint8 array-like over a HAM10000Store: shape, dtype and
+    integer-array indexing, enough for IndexedView and BatchIterator.
+    """
+
+    def __init__(self, store: HAM10000Store) -> None:
+        self.store = store
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return (len(self.store), 3) + self.store.image_size
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(np.uint8)
+
+    @property
+    def ndim(self) -> int:
+        return 4
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getitem__(self, key) -> np.ndarray:
+        if isinstance(key, (int, np.integer)):
+            return self.store[int(key)][0]
+        return self.store.get_batch(np.arange(len(self.store))[key] if isinstance(key, slice) else key)[0]
+
+
+def split_by_lesion(
+    lesion_ids: np.ndarray, fractions: Tuple[float, ...], seed: int = 0
+) -> List[np.ndarray]:
+    """
+    Split image indices into len(fractions) parts of about those fractions of
+    the lesions (e.g. (0.7, 0.15, 0.15)); all photos of a lesion land in the
+    same part, so validation never sees a lesion seen in training.
+
+    Returns:
+        One sorted index array per fraction
+    """
+    lesions, inverse = np.unique(np.asarray(lesion_ids), return_inverse=True)
+    order = np.random.default_rng(seed).permutation(lesions.size)
+    bounds = np.rint(np.cumsum(fractions) / np.sum(fractions) * lesions.size).astype(np.int64)
+    part_of = np.empty(lesions.size, dtype=np.int64)
+    part_of[order] = np.searchsorted(bounds, np.arange(lesions.size), side="right")
+    parts = part_of[inverse.reshape(-1)]
+    return [np.nonzero(parts == p)[0] for p in range(len(fractions))]
@@ -0,0 +1,185 @@
+"""
+Dynamic Micro-Batching for DermaScan Inference
+
+Concurrent /api/predict requests each carry one (1, C, H, W) image. Instead
+of running one forward per request, requests put their preprocessed tensor
+on a queue and await a future; a single worker task takes the first waiting
+item, keeps collecting until it has `max_batch` items or `max_wait_ms` has
+passed since that first item arrived, runs one batched forward through
+`predict_batch` and resolves every future with its own result.
+
+Under load the batches fill up and the GEMMs run at full width; an idle
+server adds at most `max_wait_ms` of latency to a lone request.
+"""
+
+import asyncio
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    In-process batching scheduler in front of a batched predict function
+
+    Attributes:
+        predict_batch: Callable taking an (N, C, H, W) array and returning N results
+        max_batch: Largest batch run in one forward
+        max_wait_ms: Longest time the oldest queued request waits for company
+        max_queue: Queue capacity; submit() waits when it is full
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[np.ndarray], list],
+        max_batch: int = 16,
+        max_wait_ms: float = 5.0,
+        max_queue: int = 1024,
+        stats_window: int = 1000,
+    ):
+        assert max_batch >= 1, "max_batch must be >= 1"
+        assert max_wait_ms >= 0, "max_wait_ms must be >= 0"
+        self.predict_batch = predict_batch
+        self.max_batch = int(max_batch)
+        self.max_wait = float(max_wait_ms) / 1000.0
+        self.max_queue = int(max_queue)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # one thread: the forward itself is parallelized by BLAS
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="microbatch")
+
+        # statistics
+        self.requests = 0
+        self.batches = 0
+        self.batch_sizes: Counter = Counter()
+        self._queue_waits: deque = deque(maxlen=stats_window)
+        self._forward_times: deque = deque(maxlen=stats_window)
+
+    # -------- lifecycle --------
+    async def start(self):
+        """Start the worker task on the running event loop"""
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker; requests still queued fail with RuntimeError"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("MicroBatcher stopped"))
+        self._executor.shutdown(wait=False)
+
+    # -------- requests --------
+    async def submit(self, image: np.ndarray):
+        """
+        Queue one preprocessed image and wait for its prediction
+
+        Args:
+            image: Array of shape (1, C, H, W) or (C, H, W)
+
+        Returns:
+            The entry of predict_batch's result for this image
+        """
+        if self._worker is None:
+            raise RuntimeError("MicroBatcher.submit called before start()")
+        if image.ndim == 4:
+            if image.shape[0] != 1:
+                raise ValueError(f"Expected a single image, got batch of {image.shape[0]}")
+            image = image[0]
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> list:
+        """First waiting item, then more until max_batch or the deadline"""
+        items = [await self._queue.get()]
+        deadline = items[0][2] + self.max_wait
+        while len(items) < self.max_batch:
+            # take what is already queued without yielding to the loop
+            try:
+                items.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    def _forward(self, images: List[np.ndarray]) -> list:
+        return self.predict_batch(np.stack(images))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            # requests cancelled while queued (client went away) are dropped
+            items = [it for it in items if not it[1].cancelled()]
+            if not items:
+                continue
+            start = time.perf_counter()
+            images = [image for image, _, _ in items]
+            try:
+                # stacking copies the whole batch: keep it off the event loop too
+                results = await loop.run_in_executor(self._executor, self._forward, images)
+            except Exception as e:
+                for _, future, _ in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            end = time.perf_counter()
+
+            self.requests += len(items)
+            self.batches += 1
+            self.batch_sizes[len(items)] += 1
+            self._forward_times.append(end - start)
+            self._queue_waits.extend(start - queued for _, _, queued in items)
+            for (_, future, _), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
+
+    # -------- statistics --------
+    def stats(self) -> dict:
+        """
+        Batch-size and queue-wait statistics
+
+        Returns:
+            Dict with request/batch counts, batch-size histogram and mean,
+            queue depth, and queue-wait / forward-time percentiles in ms
+            (over the last `stats_window` samples)
+        """
+        def ms(values) -> dict:
+            if not values:
+                return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+            v = np.asarray(values) * 1000.0
+            return {"mean": float(v.mean()), "p50": float(np.percentile(v, 50)),
+                    "p95": float(np.percentile(v, 95)), "max": float(v.max())}
+
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "batch_size_histogram": {int(k): v for k, v in sorted(self.batch_sizes.items())},
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_wait_ms": ms(list(self._queue_waits)),
+            "forward_ms": ms(list(self._forward_times)),
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
@@ -0,0 +1,143 @@
+"""
+Prediction Cache for DermaScan Inference
+
+Results are keyed by a hash of the uploaded bytes and of the model version,
+so a re-uploaded photo skips decode, preprocessing and the forward pass, and
+new weights never serve stale results. The cache is a bounded LRU whose
+entries expire after `ttl_s`.
+
+Concurrent requests for the same key are coalesced (single flight): the
+first one starts the computation as a task, later ones await the same task,
+so N simultaneous duplicates cost one forward. The task is shielded, so a
+client disconnecting does not cancel the work the others are waiting for.
+Failures are passed to every waiter and are not cached.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+def prediction_key(data: bytes, model_version: str) -> str:
+    """
+    Cache key of an upload
+
+    Args:
+        data: Raw uploaded bytes
+        model_version: Identifier of the weights (DermaScanPredictor.model_version)
+
+    Returns:
+        Hex digest
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(model_version.encode())
+    h.update(data)
+    return h.hexdigest()
+
+
+class PredictionCache:
+    """
+    Bounded LRU + TTL cache with single-flight computation
+
+    Attributes:
+        max_entries: Maximum number of cached results (0 disables caching,
+                     coalescing still applies)
+        ttl_s: Seconds a result stays valid
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_s: float = 3600.0):
+        assert max_entries >= 0, "max_entries must be >= 0"
+        self.max_entries = int(max_entries)
+        self.ttl_s = float(ttl_s)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        # statistics
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _lookup(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if time.monotonic() >= expires:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, value: Any):
+        if self.max_entries == 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Cached result for key, computing it at most once at a time
+
+        Args:
+            key: Cache key (see prediction_key)
+            compute: Coroutine function producing the result on a miss
+
+        Returns:
+            The (possibly shared) result
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            self.hits += 1
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+
+            def done(t: asyncio.Task):
+                self._inflight.pop(key, None)
+                if not t.cancelled() and t.exception() is None:
+                    self._store(key, t.result())
+
+            task.add_done_callback(done)
+        return await asyncio.shield(task)
+
+    def clear(self):
+        """Drop every cached result (in-flight computations are kept)"""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Hit-rate statistics
+
+        Returns:
+            Dict with hits, misses, coalesced requests, evictions,
+            expirations, current size and hit rates (coalesced requests
+            count as served without their own forward)
+        """
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self._entries),
+            "inflight": len(self._inflight),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
@@ -2,8 +2,20 @@
 Predictor for Skin Condition Classification
 
 Loads trained CNN model and performs inference on dermatological images.
+
+Checkpoints (src/models/checkpoint.py) are not copied into the model: the
+layers are bound to read-only views of a memory map, so every server worker
+loading the same file shares one physical copy.
+The model is built with deferred initialization, so loading never pays for
+drawing the random init of the params it replaces.
+
+Inference runs on an ahead-of-time compiled copy of the model (see
+src/models/compiled.py: fused Conv+BN+ReLU, vectorized pooling, float32,
+preallocated buffers); the layer-by-layer path is kept with compile=False.
 """
 
+import hashlib
+import re
 import numpy as np
 from pathlib import Path
 import sys
@@ -12,14 +24,78 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.models.sequential import Sequential
+from src.models.checkpoint import load_checkpoint, save_checkpoint
+from src.models.compiled import compile_model
+from src.layers.base import deferred_init
 from src.layers.conv2d import Conv2D
-from src.layers.pooling import MaxPool2D
+from src.layers.pooling import AdaptiveAvgPool2D, MaxPool2D
 from src.layers.dense import Dense
 from src.layers.activations import ReLU, Softmax
 from src.layers.batchnorm import BatchNorm2D
 from src.layers.dropout import Dropout
 
 
+def build_model(num_classes: int) -> Sequential:
+    """
+    Build the DermaScan CNN (also used by the training script)
+
+    Args:
+        num_classes: Number of output classes
+
+    Returns:
+        Sequential model
+    """
+    # Architecture inspired by ResNet/EfficientNet for medical imaging
+    # Adapted for our custom NumPy CNN implementation
+
+    model = Sequential([
+        # Block 1: Initial feature extraction
+        Conv2D(in_channels=3, out_channels=32, kernel_size=3, stride=1, padding=1),
+        BatchNorm2D(num_features=32),
+        ReLU(),
+        Conv2D(in_channels=32, out_channels=32, kernel_size=3, stride=1, padding=1),
+        BatchNorm2D(num_features=32),
+        ReLU(),
+        MaxPool2D(kernel_size=2, stride=2),
+
+        # Block 2: Deeper features
+        Conv2D(in_channels=32, out_channels=64, kernel_size=3, stride=1, padding=1),
+        BatchNorm2D(num_features=64),
+        ReLU(),
+        Conv2D(in_channels=64, out_channels=64, kernel_size=3, stride=1, padding=1),
+        BatchNorm2D(num_features=64),
+        ReLU(),
+        MaxPool2D(kernel_size=2, stride=2),
+
+        # Block 3: Complex patterns
+        Conv2D(in_channels=64, out_channels=128, kernel_size=3, stride=1, padding=1),
+        BatchNorm2D(num_features=128),
+        ReLU(),
+        Conv2D(in_channels=128, out_channels=128, kernel_size=3, stride=1, padding=1),
+        BatchNorm2D(num_features=128),
+        ReLU(),
+        MaxPool2D(kernel_size=2, stride=2),
+
+        # Block 4: High-level features
+        Conv2D(in_channels=128, out_channels=256, kernel_size=3, stride=1, padding=1),
+        BatchNorm2D(num_features=256),
+        ReLU(),
+        MaxPool2D(kernel_size=2, stride=2),
+        # Global average pool: the same 256 features at any input size
+        # >= 16 px (progressive resizing trains at 64/128/224)
+        AdaptiveAvgPool2D(output_size=1),
+
+        # Classification head
+        Dense(in_features=256, out_features=512),
+        ReLU(),
+        Dropout(p=0.5),
+        Dense(in_features=512, out_features=num_classes),
+        Softmax()
+    ])
+
+    return model
+
+
 class DermaScanPredictor:
     """
     Handles model loading and prediction for skin conditions
@@ -41,17 +117,24 @@ class DermaScanPredictor:
         "Vascular Lesion"  # VASC
     ]
 
-    def __init__(self, model_path: str = None, class_names: list = None):
+    def __init__(self, model_path: str = None, class_names: list = None, compile: bool = True,
+                 batch_sizes: tuple = (1, 4, 16), image_size: tuple = (224, 224)):
         """
         Initialize predictor
 
         Args:
-            model_path: Path to saved model weights (.npz file)
+            model_path: Path to a checkpoint (or legacy .npz) of the weights
             class_names: List of class names for predictions
+            compile: Run inference on the compiled engine (else layer by layer)
+            batch_sizes: Batch sizes the engine preallocates buffers for
+            image_size: Input (H, W)
         """
-        self.model_path = model_path or "data/dermatology/models/dermascan_best.npz"
+        self.model_path = model_path or "data/dermatology/models/dermascan_best.ckpt"
         self.class_names = class_names or self.DEFAULT_CLASSES
-        self.model = self._build_model()
+        self.image_size = tuple(image_size)
+        # Random init is only drawn if no checkpoint fills the params
+        with deferred_init():
+            self.model = self._build_model()
 
         # Load weights if available
         if Path(self.model_path).exists():
@@ -60,6 +143,18 @@ class DermaScanPredictor:
             print(f"Warning: Model weights not found at {self.model_path}")
             print("Model initialized with random weights.")
 
+        self.engine = None
+        if compile:
+            self.engine = compile_model(self.model, (3,) + self.image_size, batch_sizes, dtype=np.float32)
+
+    def _forward(self, images: np.ndarray) -> np.ndarray:
+        """Class probabilities (N, num_classes) in evaluation mode"""
+        if self.engine is not None:
+            return self.engine(images)
+        # BatchNorm running stats, no Dropout: each image's result is
+        # independent of the others in the batch
+        return self.model.forward(images, training=False)
+
     def _build_model(self) -> Sequential:
         """
         Build the CNN architecture for dermatological classification
@@ -67,62 +162,19 @@ class DermaScanPredictor:
         Returns:
             Sequential model
         """
-        # Architecture inspired by ResNet/EfficientNet for medical imaging
-        # Adapted for our custom NumPy CNN implementation
-
-        model = Sequential([
-            # Block 1: Initial feature extraction
-            Conv2D(in_channels=3, out_channels=32, kernel_size=3, stride=1, padding=1),
-            BatchNorm2D(num_features=32),
-            ReLU(),
-            Conv2D(in_channels=32, out_channels=32, kernel_size=3, stride=1, padding=1),
-            BatchNorm2D(num_features=32),
-            ReLU(),
-            MaxPool2D(kernel_size=2, stride=2),
-
-            # Block 2: Deeper features
-            Conv2D(in_channels=32, out_channels=64, kernel_size=3, stride=1, padding=1),
-            BatchNorm2D(num_features=64),
-            ReLU(),
-            Conv2D(in_channels=64, out_channels=64, kernel_size=3, stride=1, padding=1),
-            BatchNorm2D(num_features=64),
-            ReLU(),
-            MaxPool2D(kernel_size=2, stride=2),
-
-            # Block 3: Complex patterns
-            Conv2D(in_channels=64, out_channels=128, kernel_size=3, stride=1, padding=1),
-            BatchNorm2D(num_features=128),
-            ReLU(),
-            Conv2D(in_channels=128, out_channels=128, kernel_size=3, stride=1, padding=1),
-            BatchNorm2D(num_features=128),
-            ReLU(),
-            MaxPool2D(kernel_size=2, stride=2),
-
-            # Block 4: High-level features
-            Conv2D(in_channels=128, out_channels=256, kernel_size=3, stride=1, padding=1),
-            BatchNorm2D(num_features=256),
-            ReLU(),
-            MaxPool2D(kernel_size=2, stride=2),
-
-            # Classification head
-            Dense(in_features=256 * 14 * 14, out_features=512),  # Adjusted for 224x224 input
-            ReLU(),
-            Dropout(p=0.5),
-            Dense(in_features=512, out_features=len(self.class_names)),
-            Softmax()
-        ])
-
-        return model
+        return build_model(len(self.class_names))
 
     def _load_weights(self):
-        """Load model weights from file"""
-        try:
-            weights_dict = np.load(self.model_path, allow_pickle=True)
-            # Load weights into model layers
-            # Implementation depends on saved format
-            print(f"Model weights loaded from {self.model_path}")
-        except Exception as e:
-            print(f"Error loading weights: {e}")
+        """Map model weights from file (a bad file fails loudly)"""
+        arrays, _ = load_checkpoint(self.model_path)
+        # legacy save_model keys: layer_{i}_W / layer_{i}_b (no BatchNorm
+        # state was saved, it keeps its defaults)
+        keys = {f"{m[1]}.{self.model.layers[int(m[1])].__class__.__name__}.{m[2]}": k
+                for k in arrays if (m := re.fullmatch(r"layer_(\d+)_(W|b)", k))}
+        if keys:
+            arrays = {new: arrays[old] for new, old in keys.items()}
+        self.model.load_params(arrays, strict=not keys)
+        print(f"Model weights mapped from {self.model_path}")
 
     def predict(self, image: np.ndarray, top_k: int = 3) -> list:
         """
@@ -135,11 +187,8 @@ class DermaScanPredictor:
         Returns:
             List of dicts with class_name, confidence, and class_id
         """
-        # Set model to evaluation mode
-        self.model.training = False
-
         # Forward pass
-        output = self.model.forward(image)  # Shape: (1, num_classes)
+        output = self._forward(image)  # Shape: (1, num_classes)
 
         # Get probabilities (already softmax from model)
         probabilities = output[0]  # Shape: (num_classes,)
@@ -168,10 +217,8 @@ class DermaScanPredictor:
         Returns:
             List of prediction lists (one per image)
         """
-        self.model.training = False
-
         # Forward pass
-        outputs = self.model.forward(images)  # Shape: (N, num_classes)
+        outputs = self._forward(images)  # Shape: (N, num_classes)
 
         batch_predictions = []
         for output in outputs:
@@ -190,20 +237,61 @@ class DermaScanPredictor:
 
         return batch_predictions
 
-    def save_model(self, path: str):
+    @property
+    def model_version(self) -> str:
+        """
+        Content hash of the weights (params and BatchNorm statistics),
+        computed once; identifies the model in prediction cache keys
         """
-        Save model weights
+        if getattr(self, "_model_version", None) is None:
+            h = hashlib.blake2b(digest_size=16)
+            arrays = {**self.model.params(), **self.model.buffers()}
+            for k in sorted(arrays):
+                h.update(k.encode())
+                h.update(memoryview(np.ascontiguousarray(arrays[k])).cast("B"))
+            self._model_version = h.hexdigest()
+        return self._model_version
+
+    def warmup(self, batch_sizes: tuple = (1,)):
+        """
+        Run dummy forwards so the first real request does not pay for page
+        faults on the weights and first-time allocations
+
+        Args:
+            batch_sizes: Batch sizes to run
+        """
+        for n in batch_sizes:
+            self.predict_batch(np.zeros((n, 3) + self.image_size, dtype=np.float32))
+        self.model_version  # hashed here rather than on the first request
+
+    def export_flat(self, path: str) -> str:
+        """
+        Export params and BatchNorm statistics as a float32 checkpoint that
+        server workers map read-only (see _load_weights)
+
+        float32 is the compiled engine's precision, so the engine uses the
+        mapped Dense weights in place instead of converting them.
 
         Args:
-            path: Path to save weights (.npz file)
+            path: Output path (.ckpt)
+
+        Returns:
+            path
         """
-        # Extract weights from all layers
-        weights_dict = {}
-        for i, layer in enumerate(self.model.layers):
-            if hasattr(layer, 'W'):
-                weights_dict[f'layer_{i}_W'] = layer.W
-            if hasattr(layer, 'b'):
-                weights_dict[f'layer_{i}_b'] = layer.b
+        arrays = {k: v.astype(np.float32, copy=False)
+                  for k, v in {**self.model.params(), **self.model.buffers()}.items()}
+        save_checkpoint(path, arrays, meta={"class_names": list(self.class_names)})
+        print(f"Float32 weights exported to {path}")
+        return path
 
-        np.savez(path, **weights_dict)
+    def save_model(self, path: str):
+        """
+        Save model weights (params and BatchNorm statistics, same keys as
+        Sequential.params())
+
+        Args:
+            path: Path to save weights (.ckpt file)
+        """
+        arrays = {**self.model.params(), **self.model.buffers()}
+        save_checkpoint(path, arrays, meta={"class_names": list(self.class_names)})
         print(f"Model saved to {path}")
@@ -0,0 +1,111 @@
+"""
+Raw Tensor Payloads for DermaScan Inference
+
+Clients that already hold preprocessed images send them as raw bytes instead
+of JPEGs: either a .npy file (Content-Type application/x-npy) or bare bytes
+(application/octet-stream) described by X-Tensor-Shape / X-Tensor-Dtype
+headers. The payload is viewed in place with np.frombuffer, no copy and no
+image codec.
+
+Accepted tensors are (N, 3, H, W) or (3, H, W) at the model input size:
+- uint8: raw RGB pixels, normalized server-side like decoded uploads;
+- float32: already normalized, used as is.
+"""
+
+import ast
+from typing import Optional, Tuple
+
+import numpy as np
+
+ALLOWED_DTYPES = {np.dtype(np.uint8), np.dtype(np.float32)}
+
+
+def _parse_npy(body: bytes) -> Tuple[Tuple[int, ...], np.dtype, int]:
+    """(shape, dtype, data offset) from a .npy header, without copying the data"""
+    magic = b"\x93NUMPY"
+    if body[:6] != magic or len(body) < 10:
+        raise ValueError("Not a .npy payload")
+    major = body[6]
+    if major == 1:
+        header_len, start = int.from_bytes(body[8:10], "little"), 10
+    elif major in (2, 3):
+        header_len, start = int.from_bytes(body[8:12], "little"), 12
+    else:
+        raise ValueError(f"Unsupported .npy version {major}")
+    try:
+        header = ast.literal_eval(body[start:start + header_len].decode("latin1"))
+        shape, fortran, descr = tuple(header["shape"]), header["fortran_order"], header["descr"]
+        dtype = np.dtype(descr)
+    except (ValueError, SyntaxError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid .npy header: {e}")
+    if fortran:
+        raise ValueError("Fortran-ordered arrays are not supported")
+    return shape, dtype, start + header_len
+
+
+def _parse_shape(value: str) -> Tuple[int, ...]:
+    try:
+        shape = tuple(int(v) for v in value.replace("x", ",").split(",") if v.strip())
+    except ValueError:
+        raise ValueError(f"Invalid X-Tensor-Shape {value!r}")
+    if not shape or any(d <= 0 for d in shape):
+        raise ValueError(f"Invalid X-Tensor-Shape {value!r}")
+    return shape
+
+
+def parse_tensor(
+    body: bytes,
+    content_type: Optional[str],
+    image_size: Tuple[int, int],
+    shape_header: Optional[str] = None,
+    dtype_header: Optional[str] = None,
+    max_images: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Validate a raw tensor payload and view it as (N, 3, H, W)
+
+    Args:
+        body: Request body
+        content_type: application/x-npy or application/octet-stream
+        image_size: Expected (H, W)
+        shape_header: X-Tensor-Shape, e.g. "8,3,224,224" (octet-stream only)
+        dtype_header: X-Tensor-Dtype, uint8 (default) or float32 (octet-stream only)
+        max_images: Largest accepted N
+
+    Returns:
+        Read-only array viewing `body` (uint8 or float32)
+
+    Raises:
+        ValueError: Malformed payload, wrong shape/dtype or size mismatch
+    """
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type == "application/x-npy":
+        shape, dtype, offset = _parse_npy(body)
+    elif content_type == "application/octet-stream":
+        if not shape_header:
+            raise ValueError("X-Tensor-Shape header is required for application/octet-stream")
+        shape, offset = _parse_shape(shape_header), 0
+        try:
+            dtype = np.dtype(dtype_header or "uint8")
+        except TypeError:
+            raise ValueError(f"Invalid X-Tensor-Dtype {dtype_header!r}")
+    else:
+        raise ValueError("Content-Type must be application/x-npy or application/octet-stream")
+
+    if not dtype.isnative or dtype not in ALLOWED_DTYPES:
+        raise ValueError(f"dtype must be native uint8 or float32, got {dtype}")
+    if len(shape) == 3:
+        shape = (1,) + shape
+    H, W = image_size
+    if len(shape) != 4 or shape[1:] != (3, H, W):
+        raise ValueError(f"Expected shape (N, 3, {H}, {W}) or (3, {H}, {W}), got {shape}")
+    if max_images is not None and shape[0] > max_images:
+        raise ValueError(f"At most {max_images} images per request")
+    expected = int(np.prod(shape)) * dtype.itemsize
+    if len(body) - offset != expected:
+        raise ValueError(f"Payload has {len(body) - offset} data bytes, shape {shape} {dtype} needs {expected}")
+
+    x = np.frombuffer(body, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+    if dtype == np.float32 and not np.isfinite(x).all():
+        raise ValueError("Tensor contains NaN or Inf")
+    return x
@@ -0,0 +1,67 @@
+"""
+Thread Budget for DermaScan Serving
+
+The model forward is parallelized inside BLAS, which already uses
+`blas_threads()` cores. Image decoding and preprocessing (PIL and NumPy,
+both releasing the GIL) run on a separate thread pool sized to the cores
+BLAS leaves free, so concurrent requests overlap decode, preprocessing and
+compute without oversubscribing the CPU.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+BLAS_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+def blas_threads() -> int:
+    """
+    Number of threads the BLAS library uses for one GEMM
+
+    Returns:
+        Value reported by threadpoolctl if installed, else the first of
+        OMP/OPENBLAS/MKL_NUM_THREADS that is set, else the CPU count
+    """
+    try:
+        from threadpoolctl import threadpool_info
+        n = max((int(i["num_threads"]) for i in threadpool_info() if i.get("user_api") == "blas"), default=0)
+        if n > 0:
+            return n
+    except ImportError:
+        pass
+    for var in BLAS_ENV_VARS:
+        value = os.environ.get(var, "").strip()
+        if value.isdigit() and int(value) > 0:
+            return int(value)
+    return os.cpu_count() or 1
+
+
+def preprocess_workers(blas: Optional[int] = None) -> int:
+    """
+    Preprocessing pool size: cores not used by BLAS, at least 2
+
+    Args:
+        blas: BLAS threads (default: blas_threads())
+
+    Returns:
+        DERMASCAN_PREPROCESS_WORKERS if set, else max(2, cpu_count - blas)
+    """
+    override = os.environ.get("DERMASCAN_PREPROCESS_WORKERS", "").strip()
+    if override:
+        return max(1, int(override))
+    blas = blas_threads() if blas is None else blas
+    return max(2, (os.cpu_count() or 1) - blas)
+
+
+def make_preprocess_executor(workers: Optional[int] = None) -> ThreadPoolExecutor:
+    """
+    Bounded thread pool for image decoding and preprocessing
+
+    Args:
+        workers: Pool size (default: preprocess_workers())
+
+    Returns:
+        ThreadPoolExecutor
+    """
+    return ThreadPoolExecutor(max_workers=workers or preprocess_workers(), thread_name_prefix="preprocess")
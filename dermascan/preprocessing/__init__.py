@@ -5,5 +5,5 @@ Handles image preprocessing specific to dermatological images:
 - Resizing and normalization
 - Hair removal
 - Color correction
-- Data augmentation
+- Data augmentation (batched, see augmentation.BatchAugmenter)
 """
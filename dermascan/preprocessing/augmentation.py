@@ -0,0 +1,251 @@
+"""
+Batched Data Augmentation for Dermatological Images
+
+Applies per-sample random geometric and photometric augmentation to a whole
+(N, C, H, W) batch at once, driven by the `train.augmentation` block of the
+model YAML config.
+
+Geometry (flips, 90° rotations, free rotation, zoom and random resized crop)
+is composed into one 2x2 affine map plus offset per sample and resampled
+with a nearest-neighbour gather. Brightness and contrast are folded into a
+256-entry lookup table per sample, so uint8 batches stay uint8 end to end
+and are only converted to float at the end of the pipeline.
+
+The per-sample terms (fixed-point source coordinates, lookup tables) are
+computed for the whole batch up front; each image is then indexed, gathered
+and color mapped while it is still in cache. One np.take over the whole
+flattened batch was measured slower: numpy converts the batch-sized index
+to intp in one big temporary, which costs more than the gather itself.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class BatchAugmenter:
+    """
+    Random augmentation of image batches
+
+    Attributes:
+        rotation_range: Max absolute rotation in degrees (uniform in [-r, r])
+        horizontal_flip: Random left-right flips
+        vertical_flip: Random up-down flips
+        rot90: Random multiples of 90° rotation
+        brightness_range: (low, high) multiplicative brightness factor
+        contrast_range: (low, high) contrast factor around mid-gray
+        zoom_range: (low, high) zoom factor, > 1 zooms in
+        crop_scale: (low, high) area fraction of the random resized crop
+        crop_ratio: (low, high) aspect ratio range of the random resized crop
+        output_size: Output (H, W); defaults to the input size
+    """
+
+    def __init__(
+        self,
+        rotation_range: float = 0.0,
+        horizontal_flip: bool = False,
+        vertical_flip: bool = False,
+        rot90: bool = False,
+        brightness_range: Optional[Tuple[float, float]] = None,
+        contrast_range: Optional[Tuple[float, float]] = None,
+        zoom_range: Optional[Tuple[float, float]] = None,
+        crop_scale: Optional[Tuple[float, float]] = None,
+        crop_ratio: Tuple[float, float] = (3 / 4, 4 / 3),
+        output_size: Optional[Tuple[int, int]] = None,
+    ):
+        self.rotation_range = float(rotation_range)
+        self.horizontal_flip = bool(horizontal_flip)
+        self.vertical_flip = bool(vertical_flip)
+        self.rot90 = bool(rot90)
+        self.brightness_range = brightness_range
+        self.contrast_range = contrast_range
+        self.zoom_range = zoom_range
+        self.crop_scale = crop_scale
+        self.crop_ratio = crop_ratio
+        self.output_size = output_size
+
+    @classmethod
+    def from_config(cls, cfg: Optional[dict], output_size: Optional[Tuple[int, int]] = None) -> "BatchAugmenter":
+        """
+        Build from the `augmentation` block of the model config
+
+        Args:
+            cfg: Dict with rotation_range, horizontal_flip, vertical_flip, rot90,
+                 brightness_range, contrast_range, zoom_range and
+                 random_resized_crop: {scale, ratio}
+            output_size: Output (H, W), e.g. data.image_size
+
+        Returns:
+            BatchAugmenter
+        """
+        cfg = cfg or {}
+        crop = cfg.get("random_resized_crop") or {}
+        return cls(
+            rotation_range=cfg.get("rotation_range", 0.0),
+            horizontal_flip=cfg.get("horizontal_flip", False),
+            vertical_flip=cfg.get("vertical_flip", False),
+            rot90=cfg.get("rot90", False),
+            brightness_range=cfg.get("brightness_range"),
+            contrast_range=cfg.get("contrast_range"),
+            zoom_range=cfg.get("zoom_range"),
+            crop_scale=crop.get("scale"),
+            crop_ratio=tuple(crop.get("ratio", (3 / 4, 4 / 3))),
+            output_size=tuple(output_size) if output_size is not None else None,
+        )
+
+    @property
+    def has_geometry(self) -> bool:
+        return (self.rotation_range > 0 or self.horizontal_flip or self.vertical_flip or self.rot90
+                or self.zoom_range is not None or self.crop_scale is not None)
+
+    # -------- geometry --------
+    def _affine(self, n: int, H: int, W: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-sample (n, 2, 2) maps and (n, 2) offsets, output -> source pixel offsets from center."""
+        sy = np.ones(n)
+        sx = np.ones(n)
+        ty = np.zeros(n)
+        tx = np.zeros(n)
+        if self.crop_scale is not None:
+            area = rng.uniform(self.crop_scale[0], self.crop_scale[1], n)
+            log_r = np.log(np.asarray(self.crop_ratio, dtype=np.float64))
+            ratio = np.exp(rng.uniform(log_r[0], log_r[1], n))
+            sy = np.minimum(1.0, np.sqrt(area / ratio))
+            sx = np.minimum(1.0, np.sqrt(area * ratio))
+            ty = rng.uniform(-1.0, 1.0, n) * (1.0 - sy) * H / 2
+            tx = rng.uniform(-1.0, 1.0, n) * (1.0 - sx) * W / 2
+        if self.zoom_range is not None:
+            zoom = rng.uniform(self.zoom_range[0], self.zoom_range[1], n)
+            sy = sy / zoom
+            sx = sx / zoom
+
+        theta = np.zeros(n)
+        if self.rotation_range > 0:
+            theta += np.deg2rad(rng.uniform(-self.rotation_range, self.rotation_range, n))
+        if self.rot90:
+            theta += rng.integers(0, 4, n) * (np.pi / 2)
+        cos, sin = np.cos(theta), np.sin(theta)
+        fy = np.where(rng.random(n) < 0.5, -1.0, 1.0) if self.vertical_flip else np.ones(n)
+        fx = np.where(rng.random(n) < 0.5, -1.0, 1.0) if self.horizontal_flip else np.ones(n)
+
+        # A = Flip @ Rot @ Scale
+        A = np.empty((n, 2, 2))
+        A[:, 0, 0] = fy * cos * sy
+        A[:, 0, 1] = -fy * sin * sx
+        A[:, 1, 0] = fx * sin * sy
+        A[:, 1, 1] = fx * cos * sx
+        return A, np.stack([ty, tx], axis=1)
+
+    def _source_terms(self, A: np.ndarray, t: np.ndarray, H: int, W: int,
+                      Ho: int, Wo: int) -> Tuple[np.ndarray, ...]:
+        """16.16 fixed-point row (n, Ho) and column (n, Wo) terms of the source y and x."""
+        # output pixel centers in source pixel units, relative to the center
+        gy = ((np.arange(Ho, dtype=np.float32) + 0.5) / Ho - 0.5) * H
+        gx = ((np.arange(Wo, dtype=np.float32) + 0.5) / Wo - 0.5) * W
+        A = A.astype(np.float32)
+        t = t.astype(np.float32) + np.array([H / 2, W / 2], dtype=np.float32)
+        # src = A @ (gy, gx) + t is separable into a row term and a column term,
+        # so each coordinate needs one full-size add, done in 16.16 fixed point
+        # (int32 add and shift are much cheaper than float add + float->int cast)
+        terms = []
+        for r in (0, 1):
+            terms.append(np.rint((A[:, r, 0, None] * gy + t[:, r, None]) * 65536).astype(np.int32))
+            terms.append(np.rint((A[:, r, 1, None] * gx) * 65536).astype(np.int32))
+        return tuple(terms)
+
+    @staticmethod
+    def _source_index(terms: Tuple[np.ndarray, ...], i: int, H: int, W: int,
+                      iy: np.ndarray, ix: np.ndarray) -> np.ndarray:
+        """Flat source pixel index (Ho * Wo,) of sample i, built in the (Ho, Wo) buffers iy and ix."""
+        for (rows, cols), size, buf in zip((terms[:2], terms[2:]), (H, W), (iy, ix)):
+            rows, cols = rows[i], cols[i]
+            np.add(rows[:, None], cols[None, :], out=buf)
+            buf >>= 16  # arithmetic shift == floor
+            # the extremes of a separable sum come from the small terms,
+            # so the full-size clip only runs when some pixel falls outside
+            if (rows.min() + cols.min()) >> 16 < 0 or (rows.max() + cols.max()) >> 16 > size - 1:
+                np.clip(buf, 0, size - 1, out=buf)
+        iy *= W
+        iy += ix
+        return iy.reshape(-1)
+
+    # -------- photometric --------
+    def _photometric(self, n: int, rng: np.random.Generator) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Per-sample (brightness, contrast) factors, or None."""
+        if self.brightness_range is None and self.contrast_range is None:
+            return None
+        b = rng.uniform(*self.brightness_range, n) if self.brightness_range is not None else np.ones(n)
+        c = rng.uniform(*self.contrast_range, n) if self.contrast_range is not None else np.ones(n)
+        return b.astype(np.float32), c.astype(np.float32)
+
+    @staticmethod
+    def _color_tables(b: np.ndarray, c: np.ndarray) -> np.ndarray:
+        """One (256,) uint8 brightness/contrast table per sample, (n, 256)."""
+        v = np.arange(256, dtype=np.float32)
+        lut = (v[None, :] * b[:, None] - 127.5) * c[:, None] + 127.5
+        return np.clip(np.rint(lut), 0, 255).astype(np.uint8)
+
+    @staticmethod
+    def _pair_tables(lut: np.ndarray) -> np.ndarray:
+        """
+        (n, 65536) uint16 tables mapping two pixels at once
+
+        Viewing a uint8 image as uint16 halves the number of lookups (and of
+        index conversions inside np.take); entry k holds the table applied
+        to both bytes of k (whatever the byte order, the high byte of k maps
+        to the high byte of the entry).
+        """
+        lut = lut.astype(np.uint16)
+        return ((lut[:, :, None] << 8) | lut[:, None, :]).reshape(lut.shape[0], -1)
+
+    def __call__(self, X: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """
+        Augment a batch
+
+        Args:
+            X: Batch (N, C, H, W), uint8 (preferred) or float in [0, 1]
+            rng: Random generator
+
+        Returns:
+            Augmented batch (N, C, Ho, Wo) of the same dtype
+        """
+        N, C, H, W = X.shape
+        Ho, Wo = self.output_size if self.output_size is not None else (H, W)
+        resample = self.has_geometry or (Ho, Wo) != (H, W)
+        if resample:
+            terms = self._source_terms(*self._affine(N, H, W, rng), H, W, Ho, Wo)
+
+        factors = self._photometric(N, rng)
+        lut = None
+        if factors is not None and X.dtype == np.uint8:
+            lut = self._color_tables(*factors)
+            if (C * Ho * Wo) % 2 == 0:
+                lut = self._pair_tables(lut)
+
+        if not resample and lut is None:
+            out = np.array(X)
+        else:
+            src = np.ascontiguousarray(X).reshape(N, C, H * W)
+            out = np.empty((N, C, Ho * Wo), dtype=X.dtype)
+            iy = np.empty((Ho, Wo), dtype=np.int32)
+            ix = np.empty_like(iy)
+            # sample by sample, so the index and the image stay in cache
+            # between the gather and the color lookup
+            for i in range(N):
+                if resample:
+                    idx = self._source_index(terms, i, H, W, iy, ix)
+                    np.take(src[i], idx, axis=1, out=out[i])  # one gather serves all channels
+                    img = out[i]
+                else:
+                    img = src[i]
+                if lut is not None:
+                    if lut.dtype == np.uint16:
+                        np.take(lut[i], img.reshape(-1).view(np.uint16), out=out[i].reshape(-1).view(np.uint16))
+                    else:
+                        np.take(lut[i], img, out=out[i])
+        out = out.reshape(N, C, Ho, Wo)
+
+        if factors is not None and lut is None:
+            b, c = factors
+            b, c = b[:, None, None, None], c[:, None, None, None]
+            out = np.clip((out * b - 0.5) * c + 0.5, 0.0, 1.0).astype(out.dtype, copy=False)
+        return out
@@ -2,12 +2,19 @@
 Image Processor for Dermatological Images
 
 Handles preprocessing of skin images for model inference.
+
+Fast path for uploads (phone photos are often 12 MP JPEGs):
+- JPEGs are decoded with draft(), so the DCT scaling in the decoder already
+  reduces them by up to 8x, to the smallest size still >= the target;
+- the remaining downscale is a cheap reduce + bilinear resize;
+- normalization is a per-channel 256-entry uint8 -> float32 lookup table
+  written straight into a (preallocated) NCHW float32 buffer.
 """
 
 import numpy as np
 from PIL import Image
 import io
-from typing import Union
+from typing import Optional
 
 
 class ImageProcessor:
@@ -31,53 +38,91 @@ class ImageProcessor:
         # ImageNet normalization (can be updated with dataset-specific values)
         self.mean = np.array([0.485, 0.456, 0.406])
         self.std = np.array([0.229, 0.224, 0.225])
+        self._lut = self._build_lut()
+
+    def _build_lut(self) -> np.ndarray:
+        """(3, 256) float32 table: normalized value of every uint8 per channel"""
+        v = np.arange(256, dtype=np.float64) / 255.0
+        return ((v[None, :] - self.mean[:, None]) / self.std[:, None]).astype(np.float32)
+
+    def set_normalization(self, mean, std):
+        """
+        Change normalization statistics (rebuilds the lookup table)
+
+        Args:
+            mean: Per-channel mean
+            std: Per-channel std
+        """
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+        self._lut = self._build_lut()
 
-    def process_uploaded_image(self, image_bytes: bytes) -> np.ndarray:
+    def process_uploaded_image(self, image_bytes: bytes, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Process an uploaded image file
 
         Args:
             image_bytes: Raw image bytes from upload
+            out: Optional float32 buffer of shape (1, C, H, W) to write into
 
         Returns:
-            Preprocessed image array of shape (1, C, H, W)
+            Preprocessed float32 image array of shape (1, C, H, W)
         """
-        # Load image from bytes
+        # Load image from bytes; for JPEGs, let the decoder downscale
         image = Image.open(io.BytesIO(image_bytes))
+        H, W = self.target_size
+        image.draft('RGB', (W, H))
 
         # Convert to RGB if needed
         if image.mode != 'RGB':
             image = image.convert('RGB')
 
-        # Process the image
-        processed = self.process_image(image)
+        if out is None:
+            out = np.empty((1, 3, H, W), dtype=np.float32)
+        self.process_image(image, out=out[0])
+        return out
 
-        # Add batch dimension
-        return np.expand_dims(processed, axis=0)
-
-    def process_image(self, image: Image.Image) -> np.ndarray:
+    def process_image(self, image: Image.Image, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Process a PIL image
 
         Args:
-            image: PIL Image object
+            image: PIL Image object (RGB)
+            out: Optional float32 buffer of shape (C, H, W) to write into
 
         Returns:
-            Preprocessed image array of shape (C, H, W)
+            Preprocessed float32 image array of shape (C, H, W)
         """
-        # Resize
-        image = image.resize(self.target_size, Image.LANCZOS)
+        # Resize: box reduction to within 2x of the target, then bilinear
+        H, W = self.target_size
+        if image.size != (W, H):
+            image = image.resize((W, H), Image.BILINEAR, reducing_gap=2.0)
+
+        # Normalize through the lookup table, (H, W, C) uint8 -> (C, H, W) float32
+        pixels = np.asarray(image, dtype=np.uint8)
+        if out is None:
+            out = np.empty((3, H, W), dtype=np.float32)
+        for c in range(3):
+            np.take(self._lut[c], pixels[:, :, c], out=out[c])
 
-        # Convert to numpy array and normalize to [0, 1]
-        img_array = np.array(image, dtype=np.float32) / 255.0
+        return out
 
-        # Normalize using mean and std
-        img_array = (img_array - self.mean) / self.std
+    def normalize_uint8(self, pixels: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Normalize raw uint8 RGB tensors through the lookup table
 
-        # Convert from (H, W, C) to (C, H, W)
-        img_array = np.transpose(img_array, (2, 0, 1))
+        Args:
+            pixels: uint8 array of shape (N, 3, H, W)
+            out: Optional float32 buffer of the same shape
 
-        return img_array
+        Returns:
+            Normalized float32 array of shape (N, 3, H, W)
+        """
+        if out is None:
+            out = np.empty(pixels.shape, dtype=np.float32)
+        for c in range(3):
+            np.take(self._lut[c], pixels[:, c], out=out[:, c])
+        return out
 
     def denormalize(self, image: np.ndarray) -> np.ndarray:
         """
@@ -0,0 +1,49 @@
+"""
+Script to ingest HAM10000 into the DermaScan tensor store
+
+Decodes and resizes the JPEGs once (in parallel) into uint8 memmap shards.
+Safe to re-run: already ingested images are skipped.
+
+Run: python -m dermascan.scripts.ingest_ham10000 --config dermascan/configs/dermascan_model.yaml
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from dermascan.data.ham10000 import HAM10000Store, ingest, store_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest HAM10000 into sharded uint8 tensors")
+    parser.add_argument("--config", type=str, default="dermascan/configs/dermascan_model.yaml")
+    parser.add_argument("--data-dir", type=str, default="data/dermatology")
+    parser.add_argument("--workers", type=int, default=None, help="Decode processes (default: all cores)")
+    parser.add_argument("--shard-size", type=int, default=1024, help="Images per shard")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        cfg = yaml.safe_load(f)
+    image_size = tuple(cfg.get("data", {}).get("image_size", [224, 224]))
+
+    raw_dir = Path(args.data_dir) / "raw" / "HAM10000"
+    if not (raw_dir / "HAM10000_metadata.csv").exists():
+        print(f"❌ Error: HAM10000_metadata.csv not found in {raw_dir}")
+        print("  python -m dermascan.scripts.download_data --dataset ham10000")
+        return
+
+    out_dir = store_dir(Path(args.data_dir), image_size)
+    t0 = time.time()
+    added = ingest(raw_dir, out_dir, image_size, shard_size=args.shard_size, workers=args.workers)
+    store = HAM10000Store(out_dir)
+    print(f"✓ Added {added} images in {time.time() - t0:.1f}s, store has {len(store)} images at {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
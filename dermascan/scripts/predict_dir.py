@@ -0,0 +1,169 @@
+"""
+Script to score a directory of images in bulk
+
+Images are read, decoded and preprocessed on a process pool while the main
+process runs batched forwards. At most `--window` images are in flight at
+any time, so memory stays bounded however large the directory is. Results
+are written as JSON lines, in file order, as soon as each batch is scored;
+unreadable images and failed batches get error records instead.
+
+Run: python -m dermascan.scripts.predict_dir images/ --out predictions.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from dermascan.preprocessing.image_processor import ImageProcessor
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp"}
+
+_processor = None
+
+
+def _init_worker(target_size: Tuple[int, int]):
+    global _processor
+    _processor = ImageProcessor(target_size=target_size)
+
+
+def _load(path: str) -> np.ndarray:
+    """Worker: read and preprocess one image to (C, H, W) float32"""
+    with open(path, "rb") as f:
+        return _processor.process_uploaded_image(f.read())[0]
+
+
+def find_images(root: Path) -> Iterator[Path]:
+    """
+    Image files under root, in sorted order (the order of sorted(root.rglob("*")))
+
+    Walks one directory at a time, so only the listings of the directories
+    on the current path are held, never the whole tree.
+    """
+    with os.scandir(root) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from find_images(Path(entry.path))
+        elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+            yield Path(entry.path)
+
+
+def preprocessed(paths: Iterator[Path], pool: ProcessPoolExecutor, window: int) -> Iterator[Tuple[Path, object]]:
+    """
+    (path, image or exception) in input order, with at most `window`
+    submitted and not yet consumed
+
+    Args:
+        paths: Image paths
+        pool: Process pool running _load
+        window: Maximum images in flight
+
+    Yields:
+        (path, (C, H, W) array) or (path, Exception)
+    """
+    pending = deque()
+    for path in paths:
+        pending.append((path, pool.submit(_load, str(path))))
+        if len(pending) >= window:
+            yield _result(*pending.popleft())
+    while pending:
+        yield _result(*pending.popleft())
+
+
+def _result(path: Path, future) -> Tuple[Path, object]:
+    try:
+        return path, future.result()
+    except Exception as e:
+        return path, e
+
+
+def score(predictor, batch: List[Tuple[Path, object]], top_k: int, root: Path) -> List[dict]:
+    """
+    JSON records, in order, for one batch of preprocessed images (or load
+    errors). If the forward fails, every image of the batch gets an error
+    record and the run goes on with the next batch.
+    """
+    images = [image for _, image in batch if not isinstance(image, Exception)]
+    predictions, failure = iter([]), None
+    if images:
+        try:
+            predictions = iter(predictor.predict_batch(np.stack(images), top_k=top_k))
+        except Exception as e:
+            failure = f"Prediction failed: {e}"
+    records = []
+    for path, image in batch:
+        record = {"path": str(path.relative_to(root))}
+        if isinstance(image, Exception):
+            record["error"] = str(image)
+        elif failure is not None:
+            record["error"] = failure
+        else:
+            record["predictions"] = next(predictions)
+        records.append(record)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score every image of a directory, writing JSONL")
+    parser.add_argument("input_dir", type=str)
+    parser.add_argument("--out", type=str, default="predictions.jsonl")
+    parser.add_argument("--weights", type=str, default=None, help="Model checkpoint (.ckpt)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=None, help="Preprocessing processes (default: all cores)")
+    parser.add_argument("--window", type=int, default=None,
+                        help="Max images in flight (default: 4 * batch size)")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--image-size", type=int, nargs=2, default=[224, 224])
+    args = parser.parse_args()
+
+    root = Path(args.input_dir)
+    if not root.is_dir():
+        print(f"❌ Error: {root} is not a directory")
+        return
+
+    from dermascan.inference.predictor import DermaScanPredictor
+    predictor = DermaScanPredictor(args.weights)
+    window = args.window or 4 * args.batch_size
+
+    t0 = time.time()
+    n_ok = n_err = 0
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w") as out, ProcessPoolExecutor(
+        max_workers=args.workers, initializer=_init_worker, initargs=(tuple(args.image_size),)
+    ) as pool:
+        batch: List[Tuple[Path, object]] = []
+        n_images = 0
+        for path, image in preprocessed(find_images(root), pool, window):
+            batch.append((path, image))
+            n_images += not isinstance(image, Exception)
+            if n_images == args.batch_size:
+                for record in score(predictor, batch, args.top_k, root):
+                    out.write(json.dumps(record) + "\n")
+                    n_ok += "predictions" in record
+                    n_err += "error" in record
+                batch, n_images = [], 0
+        if batch:
+            for record in score(predictor, batch, args.top_k, root):
+                out.write(json.dumps(record) + "\n")
+                n_ok += "predictions" in record
+                n_err += "error" in record
+
+    elapsed = time.time() - t0
+    print(f"✓ Scored {n_ok} images ({n_err} failed) in {elapsed:.1f}s "
+          f"({n_ok / max(elapsed, 1e-9):.1f} img/s) -> {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,46 @@ Usage:
 import argparse
 import sys
 from pathlib import Path
+from typing import Callable, Tuple
+
+import yaml
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from dermascan.data.ham10000 import DX_TO_CLASS, HAM10000Store, ingest, split_by_lesion, store_dir
+from dermascan.inference.predictor import build_model
+from dermascan.preprocessing.augmentation import BatchAugmenter
+from dermascan.preprocessing.image_processor import ImageProcessor
+from src.cli.train import build_optimizer
+from src.core.utils import set_seed
+from src.data.batching import BatchIterator
+from src.data.cache import IndexedView
+from src.data.sampler import build_sampler
+from src.models.checkpoint import load_checkpoint
+from src.train.callbacks import EarlyStopping, ModelCheckpoint
+from src.train.loop import time_to_accuracy, train
+from src.train.scheduler import build_resize_schedule, build_scheduler
+
+
+def build_transforms(augmentation_cfg: dict, processor: ImageProcessor) -> Tuple[Callable, Callable]:
+    """
+    Batch transforms for uint8 store batches: (train, eval)
+
+    Both end with the serving normalization (processor.normalize_uint8, the
+    ImageNet mean/std lookup table), so the model is trained on the inputs
+    DermaScanPredictor gets in production; train augments on uint8 first.
+    """
+    augmenter = BatchAugmenter.from_config(augmentation_cfg)
+
+    def train_transform(xb, rng):
+        return processor.normalize_uint8(augmenter(xb, rng))
+
+    def eval_transform(xb, rng):
+        return processor.normalize_uint8(xb)
+
+    return train_transform, eval_transform
+
 
 def main():
     parser = argparse.ArgumentParser(description="Train DermaScan model")
@@ -66,21 +102,85 @@ def main():
     print("✓ Config found")
     print()
 
-    # TODO: Implement actual training
-    # This would use the existing src.cli.train infrastructure
-    # with dermatology-specific data loader
-
-    print("🚀 Training not yet implemented")
+    # Decode/resize JPEGs once into the uint8 tensor store (incremental)
+    with open(config_path, "r") as f:
+        cfg = yaml.safe_load(f)
+    image_size = tuple(cfg.get("data", {}).get("image_size", [224, 224]))
+    out_dir = store_dir(Path(args.data_dir), image_size)
+    added = ingest(data_path, out_dir, image_size)
+    store = HAM10000Store(out_dir)
+    print(f"✓ Tensor store: {len(store)} images ({added} new) at {out_dir}")
     print()
-    print("Next steps:")
-    print("1. Create data loader for HAM10000 in dermascan/data/ham10000.py")
-    print("2. Preprocess images to 224x224")
-    print("3. Use src.train.loop for training")
-    print("4. Save best model to data/dermatology/models/")
+
+    # Lesion-grouped splits: photos of one lesion never straddle train/val
+    data_cfg = cfg.get("data", {})
+    train_cfg = cfg.get("train", {})
+    seed = int(cfg.get("seed", 42))
+    set_seed(seed)
+    fractions = (data_cfg.get("train_split", 0.7), data_cfg.get("val_split", 0.15),
+                 data_cfg.get("test_split", 0.15))
+    train_idx, val_idx, _ = split_by_lesion(store.lesion_ids, fractions, seed=seed)
+    X_train, y_train = IndexedView(store.images, train_idx), store.labels[train_idx]
+    X_val, y_val = IndexedView(store.images, val_idx), store.labels[val_idx]
+    num_classes = int(data_cfg.get("num_classes", len(DX_TO_CLASS)))
+    print(f"✓ Splits: {len(train_idx)} train / {len(val_idx)} val images")
+
+    model = build_model(num_classes)
+    if args.resume:
+        arrays, _ = load_checkpoint(args.resume, mmap=False)
+        model.load_params(arrays)
+        print(f"✓ Resumed from {args.resume}")
+    optimizer = build_optimizer(train_cfg)
+    scheduler = build_scheduler(optimizer, train_cfg.get("scheduler"))
+
+    cbs = []
+    log_csv_path = None
+    for item in (cfg.get("callbacks") or []):
+        if "early_stopping" in item:
+            p = item["early_stopping"]
+            cbs.append(EarlyStopping(monitor=p.get("monitor", "val_loss"),
+                                     patience=int(p.get("patience", 5)),
+                                     mode=p.get("mode", "min")))
+        if "checkpoint" in item:
+            p = item["checkpoint"]
+            cbs.append(ModelCheckpoint(filepath=p.get("filepath", "data/dermatology/models/dermascan_best.ckpt"),
+                                       monitor=p.get("monitor", "val_acc"),
+                                       mode=p.get("mode", "max")))
+        if "csv_logger" in item:
+            log_csv_path = item["csv_logger"].get("filename")
+            Path(log_csv_path).parent.mkdir(parents=True, exist_ok=True)
+
+    # Class-balanced sampling; photos of one lesion share its weight
+    sampler = build_sampler(train_cfg.get("sampler"), y_train, groups=store.lesion_ids[train_idx], seed=seed)
+
+    # Progressive resizing: early epochs train on downscaled batches
+    resize_cfg = train_cfg.get("progressive_resize") or {}
+
+    # uint8 batches are augmented on the prefetch thread, then normalized
+    # like uploads at serving time (not just divided by 255)
+    train_transform, eval_transform = build_transforms(train_cfg.get("augmentation"),
+                                                       ImageProcessor(target_size=image_size))
+    batch_size = int(train_cfg.get("batch_size", 32))
+    val_batches = BatchIterator(X_val, y_val, batch_size, shuffle=False, prefetch=1, transform=eval_transform)
+
     print()
-    print("For now, you can use the generic training command:")
-    print(f"  python -m src.cli.train --config {args.config}")
+    print("🚀 Training")
+    hist = train(model, optimizer, (X_train, y_train), val_batches,
+                 epochs=int(train_cfg.get("epochs", 50)),
+                 batch_size=batch_size,
+                 num_classes=num_classes,
+                 log_csv_path=log_csv_path,
+                 callbacks=cbs,
+                 scheduler=scheduler,
+                 resize_schedule=build_resize_schedule(resize_cfg),
+                 sampler=sampler,
+                 transform=train_transform)
+    if "target_acc" in resize_cfg:
+        target = float(resize_cfg["target_acc"])
+        t = time_to_accuracy(hist, target)
+        print(f"Time to val_acc >= {target:.3f}: " + (f"{t:.1f}s" if t is not None else "not reached"))
     print()
+    print("✓ Training done")
 
 
 if __name__ == "__main__":
@@ -5,10 +5,13 @@ Evaluate a trained model on the test set given a config and weights.
 
 from __future__ import annotations
 import argparse
+import time
 import yaml
-import numpy as np
 from ..models.convnet_small import lenet_mnist, vgg_tiny_cifar10
 from ..models.sequential import Sequential
+from ..layers.base import deferred_init
+from ..models.compiled import compile_model
+from ..models.checkpoint import load_checkpoint
 from ..core.utils import set_seed
 from ..core.metrics import accuracy, topk_accuracy
 from ..data.mnist import load_mnist
@@ -25,20 +28,21 @@ def build_model(name: str, num_classes: int) -> Sequential:
 
 
 def load_weights(model: Sequential, path: str) -> None:
-    data = np.load(path)
-    params = model.params()
-    # assign by matching keys
-    for k in params.keys():
-        if k in data:
-            params[k][...] = data[k]
-        else:
-            raise KeyError(f"Weight key {k} not found in checkpoint {path}")
+    # assign by matching keys; params are read-only views of the mapped checkpoint
+    arrays, _ = load_checkpoint(path)
+    try:
+        model.load_params(arrays)
+    except KeyError as e:
+        raise KeyError(f"{e.args[0]} ({path})")
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", type=str, required=True)
     parser.add_argument("--weights", type=str, required=True)
+    parser.add_argument("--compiled", action="store_true",
+                        help="Run the test set through the compiled inference engine")
+    parser.add_argument("--batch-size", type=int, default=256, help="Compiled engine batch size")
     args = parser.parse_args()
 
     with open(args.config, "r") as f:
@@ -55,11 +59,20 @@ def main():
     else:
         raise ValueError(f"Unknown dataset {dataset}")
 
-    model = build_model(model_name, num_classes)
+    # no random init: every param comes from the checkpoint
+    with deferred_init():
+        model = build_model(model_name, num_classes)
     load_weights(model, args.weights)
 
     model.eval()
-    logits = model.forward(X_test, training=False)
+    t0 = time.perf_counter()
+    if args.compiled:
+        engine = compile_model(model, X_test.shape[1:], batch_sizes=(args.batch_size,))
+        logits = engine(X_test)
+    else:
+        logits = model.forward(X_test, training=False)
+    print(f"Inference on {len(X_test)} samples: {time.perf_counter() - t0:.2f}s"
+          f"{' (compiled)' if args.compiled else ''}")
     acc = accuracy(logits, y_test)
     top5 = topk_accuracy(logits, y_test, k=5)
     print(f"Test accuracy: {acc:.4f}, Top-5: {top5:.4f}")
@@ -1,15 +1,17 @@
 """
 src/cli/export.py
-Export model weights to .npz and a simple JSON with meta info.
+Export model weights to a checkpoint (see models/checkpoint.py) and a simple
+JSON with meta info.
 """
 
 from __future__ import annotations
 import argparse
 import json
 import yaml
-import numpy as np
 from ..models.convnet_small import lenet_mnist, vgg_tiny_cifar10
 from ..models.sequential import Sequential
+from ..models.checkpoint import load_checkpoint, save_checkpoint
+from ..layers.base import deferred_init
 from ..core.utils import set_seed
 from ..data.mnist import load_mnist
 from ..data.cifar10 import load_cifar10
@@ -29,7 +31,7 @@ def main():
     parser.add_argument("--config", type=str, required=True)
     parser.add_argument("--weights", type=str, required=True)
     parser.add_argument("--arch_out", type=str, default="checkpoints/arch.json")
-    parser.add_argument("--weights_out", type=str, default="checkpoints/weights_exported.npz")
+    parser.add_argument("--weights_out", type=str, default="checkpoints/weights_exported.ckpt")
     args = parser.parse_args()
 
     with open(args.config, "r") as f:
@@ -46,22 +48,22 @@ def main():
     else:
         raise ValueError(f"Unknown dataset {dataset}")
 
-    model = build_model(model_name, num_classes)
+    with deferred_init():
+        model = build_model(model_name, num_classes)
 
-    # load weights from an existing checkpoint then re-save them in a clean file
-    ckpt = np.load(args.weights)
-    params = model.params()
-    for k in params.keys():
-        if k in ckpt:
-            params[k][...] = ckpt[k]
-        else:
-            raise KeyError(f"Key {k} not found in {args.weights}")
+    # load weights from an existing checkpoint (or legacy .npz) then re-save
+    # them in a clean file
+    arrays, _ = load_checkpoint(args.weights)
+    try:
+        model.load_params(arrays)
+    except KeyError as e:
+        raise KeyError(f"{e.args[0]} ({args.weights})")
 
     # Save architecture metadata and weights
     arch = {"model": model_name, "dataset": dataset, "num_classes": num_classes}
     with open(args.arch_out, "w") as f:
         json.dump(arch, f, indent=2)
-    np.savez(args.weights_out, **params)
+    save_checkpoint(args.weights_out, {**model.params(), **model.buffers()}, meta=arch)
     print(f"Exported arch to {args.arch_out} and weights to {args.weights_out}")
 
 
@@ -5,16 +5,23 @@ Train a preset model on MNIST or CIFAR-10 using YAML config.
 
 from __future__ import annotations
 import argparse
+import os
 import yaml
 import numpy as np
 from ..models.convnet_small import lenet_mnist, vgg_tiny_cifar10
 from ..models.sequential import Sequential
 from ..core.optim import SGD, Adam
 from ..core.utils import set_seed
-from ..train.loop import train
+from ..train.loop import train, evaluate, time_to_accuracy
+from ..train.parallel import train_data_parallel
+from ..train.hogwild import train_hogwild
+from ..train.feature_cache import train_head
+from ..train.distributed import DistributedOptimizer, ProcessGroup, shard_for_rank
 from ..train.callbacks import EarlyStopping, ModelCheckpoint, ReduceLROnPlateau
+from ..train.scheduler import build_resize_schedule
 from ..data.mnist import load_mnist
 from ..data.cifar10 import load_cifar10
+from ..data.sampler import build_sampler
 
 
 def build_model(name: str, num_classes: int) -> Sequential:
@@ -49,17 +56,30 @@ def main():
 
     dataset = cfg.get("dataset", "mnist").lower()
     if dataset == "mnist":
-        (X_train, y_train), (X_val, y_val), (X_test, y_test), num_classes = load_mnist()
+        (X_train, y_train), (X_val, y_val), (X_test, y_test), num_classes = load_mnist(mmap=True)
         model_name = cfg.get("model", "lenet_mnist")
     elif dataset == "cifar10":
-        (X_train, y_train), (X_val, y_val), (X_test, y_test), num_classes = load_cifar10()
+        (X_train, y_train), (X_val, y_val), (X_test, y_test), num_classes = load_cifar10(mmap=True)
         model_name = cfg.get("model", "vgg_tiny_cifar10")
     else:
         raise ValueError(f"Unknown dataset {dataset}")
 
     model = build_model(model_name, num_classes)
+    if cfg["train"].get("freeze_layers"):
+        # fine-tuning: keep the first N layers fixed, backward stops above them
+        model.freeze(stop=int(cfg["train"]["freeze_layers"]))
     optimizer = build_optimizer(cfg.get("train", {}))
 
+    # multi-node data parallel when launched with WORLD_SIZE > 1
+    group = None
+    if int(os.environ.get("WORLD_SIZE", 1)) > 1:
+        group = ProcessGroup.from_env()
+        group.broadcast_params(model)
+        X_train, y_train = shard_for_rank(X_train, y_train, group.rank, group.world_size)
+        bucket_mb = float((cfg.get("parallel") or {}).get("bucket_mb", 4.0))
+        optimizer = DistributedOptimizer(optimizer, model, group, bucket_mb=bucket_mb)
+    is_main = group is None or group.rank == 0
+
     cbs = []
     for item in (cfg.get("callbacks") or []):
         if "early_stopping" in item:
@@ -67,9 +87,9 @@ def main():
             cbs.append(EarlyStopping(monitor=p.get("monitor", "val_loss"),
                                      patience=int(p.get("patience", 5)),
                                      mode="min" if "loss" in p.get("monitor", "val_loss") else "max"))
-        if "checkpoint" in item:
+        if "checkpoint" in item and is_main:
             p = item["checkpoint"]
-            cbs.append(ModelCheckpoint(filepath=p.get("filepath", "checkpoints/best.npz"),
+            cbs.append(ModelCheckpoint(filepath=p.get("filepath", "checkpoints/best.ckpt"),
                                        monitor=p.get("monitor", "val_acc"),
                                        mode="max"))
         if "reduce_lr_on_plateau" in item:
@@ -80,17 +100,49 @@ def main():
                                          patience=int(p.get("patience", 3)),
                                          mode="min" if "loss" in p.get("monitor", "val_loss") else "max"))
 
-    hist = train(
-        model,
-        optimizer,
-        (X_train, y_train),
-        (X_val, y_val),
+    train_kwargs = dict(
         epochs=int(cfg["train"]["epochs"]),
         batch_size=int(cfg["train"]["batch_size"]),
         num_classes=num_classes,
-        log_csv_path="reports/results.csv",
+        log_csv_path="reports/results.csv" if is_main else None,
         callbacks=cbs,
     )
+    parallel = cfg.get("parallel") or {}
+    mode = str(parallel.get("mode", "none")).lower()
+    if group is not None and mode != "none":
+        raise ValueError(f"parallel.mode={mode} cannot be combined with multi-node training")
+    # MNIST/CIFAR-10 have no lesion ids: group_by_lesion is rejected by build_sampler
+    sampler = build_sampler(cfg["train"].get("sampler"), np.asarray(y_train), seed=int(cfg.get("seed", 42)))
+    if sampler is not None and (mode in ("data_parallel", "hogwild") or cfg["train"].get("feature_cache")):
+        where = f"parallel.mode={mode}" if mode != "none" else "train.feature_cache"
+        raise ValueError(f"train.sampler is not supported with {where}")
+    if mode == "data_parallel":
+        hist = train_data_parallel(model, optimizer, (X_train, y_train), (X_val, y_val),
+                                   num_workers=int(parallel.get("workers", 2)), **train_kwargs)
+    elif mode == "hogwild":
+        hist = train_hogwild(model, optimizer, (X_train, y_train), (X_val, y_val),
+                             num_workers=int(parallel.get("workers", 2)),
+                             seed=int(cfg.get("seed", 42)), **train_kwargs)
+        _, test_acc = evaluate(model, X_test, y_test, train_kwargs["batch_size"], num_classes)
+        print(f"Hogwild final test accuracy: {test_acc:.4f}")
+    elif mode == "none" and cfg["train"].get("feature_cache"):
+        # frozen backbone: compute its features once, then train only the head on them
+        hist = train_head(model, optimizer, (X_train, y_train), (X_val, y_val),
+                          str(cfg["train"]["feature_cache"]), **train_kwargs)
+    elif mode == "none":
+        resize_cfg = cfg["train"].get("progressive_resize") or {}
+        hist = train(model, optimizer, (X_train, y_train), (X_val, y_val),
+                     resize_schedule=build_resize_schedule(resize_cfg), sampler=sampler, **train_kwargs)
+        if "target_acc" in resize_cfg:
+            target = float(resize_cfg["target_acc"])
+            t = time_to_accuracy(hist, target)
+            print(f"Time to val_acc >= {target:.3f}: " + (f"{t:.1f}s" if t is not None else "not reached"))
+    else:
+        raise ValueError(f"Unknown parallel mode {mode}")
+
+    if group is not None:
+        optimizer.close()
+        group.close()
 
     # Optionally evaluate on test set here or via separate CLI
     print("Training done.")
@@ -87,6 +87,8 @@ class SGD(Optimizer):
 
         # Momentum update
         for k in params:
+            if k not in self._velocity:  # e.g. a layer unfrozen after the first step
+                self._velocity[k] = np.zeros_like(params[k])
             v = self._velocity[k]
             v *= self.momentum
             v += grads[k]
@@ -178,6 +180,9 @@ class Adam(Optimizer):
         b1, b2 = self.b1, self.b2
 
         for k in params:
+            if k not in self._m:  # e.g. a layer unfrozen after the first step
+                self._m[k] = np.zeros_like(params[k])
+                self._v[k] = np.zeros_like(params[k])
             g = grads[k]
             m = self._m[k] = b1 * self._m[k] + (1 - b1) * g
             v = self._v[k] = b2 * self._v[k] + (1 - b2) * (g * g)
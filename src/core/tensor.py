@@ -5,9 +5,11 @@ Lightweight helpers around NumPy arrays:
 - safety checks (finite)
 - channel order conversions
 - image normalization utilities
+- batched resizing
 """
 
 from __future__ import annotations
+import functools
 import numpy as np
 from typing import Iterable, Tuple
 
@@ -115,3 +117,31 @@ def pad2d(x: np.ndarray, pad: int) -> np.ndarray:
     if x.ndim != 4:
         raise ValueError(f"expected NCHW tensor, got shape {x.shape}")
     return np.pad(x, ((0, 0), (0, 0), (pad, pad), (pad, pad)), mode="constant")
+
+
+@functools.lru_cache(maxsize=64)
+def _resize_matrix(n_in: int, n_out: int) -> np.ndarray:
+    """(n_out, n_in) linear interpolation weights, antialiased (triangle filter) when shrinking."""
+    scale = n_in / n_out
+    support = max(scale, 1.0)
+    centers = (np.arange(n_out) + 0.5) * scale - 0.5
+    w = 1.0 - np.abs(np.arange(n_in)[None, :] - centers[:, None]) / support
+    np.maximum(w, 0.0, out=w)
+    w /= w.sum(axis=1, keepdims=True)
+    return w.astype(DEFAULT_DTYPE)
+
+
+def resize_nchw(x: np.ndarray, size: Tuple[int, int] | int) -> np.ndarray:
+    """
+    Bilinear resize of a whole (N, C, H, W) batch to size=(H_out, W_out).
+    Separable: two matrix products with cached interpolation weights, so the
+    work runs in BLAS. Returns x unchanged if it already has that size.
+    """
+    if isinstance(size, int):
+        size = (size, size)
+    H, W = x.shape[2], x.shape[3]
+    if (H, W) == tuple(size):
+        return x
+    x = as_farray(x)
+    out = np.matmul(x, _resize_matrix(W, size[1]).T)   # (N, C, H, W_out)
+    return np.matmul(_resize_matrix(H, size[0]), out)  # (N, C, H_out, W_out)
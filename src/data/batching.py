@@ -0,0 +1,245 @@
+"""
+src/data/batching.py
+Mini-batch iteration over in-memory (or memory-mapped) arrays.
+
+BatchIterator shuffles an index array instead of the dataset, gathers each
+batch with np.take into a small ring of preallocated buffers that are reused
+across batches and epochs, and runs the gathering on a background thread so
+the next batches are ready while the current forward/backward runs
+(np.take releases the GIL on large copies).
+
+Yielded arrays are views into the ring: they stay valid only until the next
+batch is requested (the producer may then refill that slot), which covers
+the usual forward/backward/update step. Copy a batch to keep it longer.
+
+With a `sampler` (see src.data.sampler) the epoch's indices are drawn from
+it instead of permuted, e.g. class-balanced sampling with replacement.
+
+uint8 sources (the memory-mapped caches of src.data.cache) are normalized to
+float32 in [0, 1] per batch, straight into the float ring buffers. X may also
+be an IndexedView: batches are then gathered through the view's indices.
+A `transform(xb, rng)` (e.g. batch augmentation) runs on each raw gathered
+batch before normalization, on the prefetch thread; it must keep the shape.
+
+BlockShuffleIterator is the out-of-core variant for datasets larger than RAM
+(e.g. the HAM10000 tensor store): it reads contiguous blocks in random order
+and shuffles inside a bounded window of blocks, so disk reads stay mostly
+sequential and memory stays at about `buffer_blocks * block_size` samples.
+Its source follows the block dataset protocol: len(ds) and
+ds.read(start, stop) -> (X, y) for a contiguous range.
+"""
+
+from __future__ import annotations
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, Tuple
+import numpy as np
+
+from ..core.utils import make_batches
+from .cache import to_float
+
+
+_DONE = object()
+
+
+def prefetched(items: Iterable, prefetch: int) -> Iterator:
+    """
+    Iterate `items` on a background thread, keeping up to `prefetch` results
+    queued. Producer exceptions are re-raised in the consumer; leaving the
+    loop early stops the producer.
+    """
+    if prefetch == 0:
+        yield from items
+        return
+
+    q: queue.Queue = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:  # surface producer errors in the consumer
+            put(e)
+
+    t = threading.Thread(target=produce, daemon=True)
+    t.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        t.join()
+
+
+class BatchIterator:
+    def __init__(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        batch_size: int = 128,
+        shuffle: bool = True,
+        prefetch: int = 2,
+        drop_last: bool = False,
+        sampler=None,
+        transform: Callable[[np.ndarray, np.random.Generator], np.ndarray] | None = None,
+    ) -> None:
+        assert X.shape[0] == y.shape[0], "X and y must have the same length"
+        assert batch_size > 0 and prefetch >= 0
+        self.X = X
+        self.y = y
+        self.sampler = sampler
+        self.transform = transform
+        self.epoch = 0
+        self.batch_size = int(batch_size)
+        self.shuffle = bool(shuffle)
+        self.prefetch = int(prefetch)
+        self.drop_last = bool(drop_last)
+        self._xbufs: list[np.ndarray] = []
+        self._ybufs: list[np.ndarray] = []
+
+    def __len__(self) -> int:
+        N = len(self.sampler) if self.sampler is not None else self.X.shape[0]
+        return N // self.batch_size if self.drop_last else -(-N // self.batch_size)
+
+    def _buffers(self) -> None:
+        slots = self.prefetch + 2  # queued + being consumed + being filled
+        if len(self._xbufs) != slots:
+            B = self.batch_size
+            x_dtype = np.float32 if self.X.dtype == np.uint8 else self.X.dtype
+            self._xbufs = [np.empty((B,) + self.X.shape[1:], dtype=x_dtype) for _ in range(slots)]
+            self._ybufs = [np.empty((B,) + self.y.shape[1:], dtype=self.y.dtype) for _ in range(slots)]
+
+    def _gather(self, k: int, idx: np.ndarray, rng: np.random.Generator | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        slot = k % len(self._xbufs)
+        n = idx.size
+        xb = self._xbufs[slot][:n]
+        yb = self._ybufs[slot][:n]
+        idx = np.sort(idx)  # order inside a batch is irrelevant, sorted reads are cheaper
+        if self.transform is not None:
+            raw = self.transform(np.asarray(self.X[idx]), rng)
+            if raw.shape != xb.shape:
+                raise ValueError(f"transform changed the batch shape {xb.shape} to {raw.shape}")
+            if raw.dtype == np.uint8:
+                np.divide(raw, 255.0, out=xb, dtype=np.float32)
+            else:
+                xb[...] = raw
+        elif isinstance(self.X, np.ndarray) and self.X.dtype == xb.dtype:
+            np.take(self.X, idx, axis=0, out=xb)
+        elif self.X.dtype == np.uint8:
+            np.divide(self.X[idx], 255.0, out=xb, dtype=np.float32)
+        else:
+            xb[...] = self.X[idx]
+        np.take(self.y, idx, axis=0, out=yb)
+        return xb, yb
+
+    def _index_batches(self) -> list[np.ndarray]:
+        self.epoch += 1
+        if self.sampler is not None:
+            order = self.sampler.indices(self.epoch)
+            N = order.size
+        else:
+            N = self.X.shape[0]
+            order = np.random.permutation(N) if self.shuffle else np.arange(N)
+        out = [order[s:e] for s, e in make_batches(N, self.batch_size)]
+        if self.drop_last and out and out[-1].size < self.batch_size:
+            out.pop()
+        return out
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        self._buffers()
+        batches = self._index_batches()
+        # seeded from the global RNG, so set_seed() makes augmentation reproducible
+        rng = np.random.default_rng(np.random.randint(2**31)) if self.transform is not None else None
+        yield from prefetched((self._gather(k, idx, rng) for k, idx in enumerate(batches)), self.prefetch)
+
+
+class BlockShuffleIterator:
+    """
+    Two-level shuffle over a block dataset: random block order, then a random
+    permutation of each window of `buffer_blocks` blocks (plus the rows left
+    over from the previous window). Every sample is seen once per epoch, and
+    epoch e is shuffled with default_rng([seed, e]).
+
+    `transform(xb, rng)` is applied to each raw (e.g. uint8) batch on the
+    prefetch thread before normalization, e.g. a batch augmentation stage.
+    """
+
+    def __init__(
+        self,
+        dataset,
+        batch_size: int = 128,
+        block_size: int = 1024,
+        buffer_blocks: int = 8,
+        shuffle: bool = True,
+        prefetch: int = 2,
+        drop_last: bool = False,
+        seed: int = 0,
+        transform: Callable[[np.ndarray, np.random.Generator], np.ndarray] | None = None,
+    ) -> None:
+        assert batch_size > 0 and block_size > 0 and buffer_blocks >= 1 and prefetch >= 0
+        self.dataset = dataset
+        self.batch_size = int(batch_size)
+        self.block_size = int(block_size)
+        self.buffer_blocks = int(buffer_blocks)
+        self.shuffle = bool(shuffle)
+        self.prefetch = int(prefetch)
+        self.drop_last = bool(drop_last)
+        self.seed = int(seed)
+        self.transform = transform
+        self.epoch = 0
+
+    def __len__(self) -> int:
+        N = len(self.dataset)
+        return N // self.batch_size if self.drop_last else -(-N // self.batch_size)
+
+    def _batches(self, rng: np.random.Generator | None,
+                 aug_rng: np.random.Generator) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        B = self.batch_size
+        blocks = list(make_batches(len(self.dataset), self.block_size))
+        if rng is not None:
+            blocks = [blocks[i] for i in rng.permutation(len(blocks))]
+        carry_x = carry_y = None
+        for w in range(0, len(blocks), self.buffer_blocks):
+            parts = [self.dataset.read(s, e) for s, e in blocks[w:w + self.buffer_blocks]]
+            xs = [np.asarray(p[0]) for p in parts]
+            ys = [np.asarray(p[1]) for p in parts]
+            if carry_x is not None:
+                xs.append(carry_x)
+                ys.append(carry_y)
+            X, y = np.concatenate(xs), np.concatenate(ys)
+            n = y.shape[0]
+            order = rng.permutation(n) if rng is not None else np.arange(n)
+            last = w + self.buffer_blocks >= len(blocks)
+            full = n if last else n // B * B
+            for s in range(0, full, B):
+                idx = order[s:s + B]
+                if last and self.drop_last and idx.size < B:
+                    break
+                xb = X[idx]
+                if self.transform is not None:
+                    xb = self.transform(xb, aug_rng)
+                yield to_float(xb), y[idx]
+            carry_x, carry_y = X[order[full:]], y[order[full:]]
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        self.epoch += 1
+        rng = np.random.default_rng([self.seed, self.epoch]) if self.shuffle else None
+        aug_rng = np.random.default_rng([self.seed, self.epoch, 1])
+        yield from prefetched(self._batches(rng, aug_rng), self.prefetch)
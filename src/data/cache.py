@@ -0,0 +1,91 @@
+"""
+src/data/cache.py
+One-time conversion of datasets to raw uint8 .npy files, memory-mapped on
+later loads.
+
+Images stay uint8 on disk and in memory (4x smaller than float32) and are
+normalized per batch at iteration time (see src.data.batching). Train/val
+splits are lazy IndexedView objects over the memory map, so no copy of the
+dataset is made at load time.
+"""
+
+from __future__ import annotations
+import os
+from typing import Callable, Dict, Iterable, Tuple
+import numpy as np
+
+
+def load_or_build(
+    cache_dir: str,
+    names: Iterable[str],
+    build: Callable[[], Dict[str, np.ndarray]],
+) -> Dict[str, np.ndarray]:
+    """
+    Return {name: read-only memmap of cache_dir/name.npy}. If any file is
+    missing, call build() once and write every array atomically first.
+    """
+    names = list(names)
+    paths = {n: os.path.join(cache_dir, f"{n}.npy") for n in names}
+    if not all(os.path.exists(p) for p in paths.values()):
+        os.makedirs(cache_dir, exist_ok=True)
+        arrays = build()
+        for n in names:
+            tmp = paths[n] + ".tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, np.ascontiguousarray(arrays[n]))
+            os.replace(tmp, paths[n])
+    return {n: np.load(p, mmap_mode="r") for n, p in paths.items()}
+
+
+class IndexedView:
+    """
+    Lazy row subset base[indices] of an array or memmap.
+
+    Slicing returns another view; integer-array indexing gathers rows.
+    Converting with np.asarray materializes the subset.
+    """
+
+    def __init__(self, base: np.ndarray, indices: np.ndarray) -> None:
+        self.base = base
+        self.indices = np.asarray(indices, dtype=np.int64)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return (self.indices.size,) + tuple(self.base.shape[1:])
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.base.dtype
+
+    @property
+    def ndim(self) -> int:
+        return self.base.ndim
+
+    def __len__(self) -> int:
+        return self.indices.size
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return IndexedView(self.base, self.indices[key])
+        return self.base[self.indices[key]]
+
+    def __array__(self, dtype=None, copy=None):
+        out = self.base[self.indices]
+        return out if dtype is None else out.astype(dtype, copy=False)
+
+
+def split_indices(n: int, val_ratio: float, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Shuffled (train_idx, val_idx) split used by the dataset loaders."""
+    rng = np.random.default_rng(seed)
+    idx = np.arange(n)
+    rng.shuffle(idx)
+    n_val = int(n * val_ratio)
+    return idx[n_val:], idx[:n_val]
+
+
+def to_float(x: np.ndarray) -> np.ndarray:
+    """uint8 images -> float32 in [0, 1]; other dtypes are returned unchanged."""
+    x = np.asarray(x)
+    if x.dtype == np.uint8:
+        return np.divide(x, 255.0, dtype=np.float32)
+    return x
@@ -1,71 +1,78 @@
 """
 src/data/cifar10.py
-Download and load CIFAR-10 as NCHW float32 in [0,1], with train/val/test splits.
+Download and load CIFAR-10 as NCHW float32 in [0,1] (or uint8 memory maps),
+with train/val/test splits.
 """
 
 from __future__ import annotations
 import os
 import tarfile
 import pickle
-import urllib.request
 from typing import Tuple
 import numpy as np
 
-CIFAR10_URL = "https://www.cs.toronto.edu/~kriz/cifar-10-python.tar.gz"
+from .cache import IndexedView, load_or_build, split_indices, to_float
+from .fetch import fetch
 
-def _download(url: str, path: str) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    if os.path.exists(path):
-        return
-    tmp = path + ".tmp"
-    urllib.request.urlretrieve(url, tmp)
-    os.rename(tmp, path)
+CIFAR10_URL = "https://www.cs.toronto.edu/~kriz/cifar-10-python.tar.gz"
+CIFAR10_MD5 = "c58f30108f718f92721af3b95e74349a"
 
-def _load_batch(path: str) -> tuple[np.ndarray, np.ndarray]:
-    with open(path, "rb") as f:
-        d = pickle.load(f, encoding="latin1")
-    X = d["data"].reshape(-1, 3, 32, 32).astype(np.float32) / 255.0  # NCHW
+def _parse_batch(f) -> tuple[np.ndarray, np.ndarray]:
+    d = pickle.load(f, encoding="latin1")
+    X = np.asarray(d["data"], dtype=np.uint8).reshape(-1, 3, 32, 32)  # NCHW uint8
     y = np.array(d["labels"], dtype=np.int64)
     return X, y
 
-def load_cifar10(data_dir: str = "data", val_ratio: float = 0.1, seed: int = 42) -> Tuple[
+def _read_tar_batches(tgz: str) -> dict:
+    """Parse the pickled batches straight from the tarball (single streaming pass, nothing extracted)."""
+    batches = {}
+    with tarfile.open(tgz, "r|gz") as tar:
+        for member in tar:
+            name = os.path.basename(member.name)
+            if member.isfile() and (name.startswith("data_batch_") or name == "test_batch"):
+                batches[name] = _parse_batch(tar.extractfile(member))
+    return batches
+
+def _build_cache(root: str) -> dict:
+    tgz = fetch(CIFAR10_URL, os.path.join(root, "cifar-10-python.tar.gz"), md5=CIFAR10_MD5)
+    batches = _read_tar_batches(tgz)
+    X_list, y_list = zip(*(batches[f"data_batch_{i}"] for i in range(1, 6)))
+    X_test, y_test = batches["test_batch"]
+    return {
+        "X_train": np.concatenate(X_list, axis=0),
+        "y_train": np.concatenate(y_list, axis=0),
+        "X_test": X_test,
+        "y_test": y_test,
+    }
+
+def load_cifar10(data_dir: str = "data", val_ratio: float = 0.1, seed: int = 42, mmap: bool = False) -> Tuple[
     Tuple[np.ndarray, np.ndarray],
     Tuple[np.ndarray, np.ndarray],
     Tuple[np.ndarray, np.ndarray],
     int,
 ]:
+    """
+    The pickled batches are converted once to uint8 .npy files under <root>/cache.
+    mmap=False: float32 arrays in [0,1] as before.
+    mmap=True: uint8 memory maps (train/val as lazy IndexedView); batches are
+    normalized at iteration time by BatchIterator / evaluate.
+    """
     root = os.path.join(data_dir, "cifar10")
     os.makedirs(root, exist_ok=True)
-    tgz = os.path.join(root, "cifar-10-python.tar.gz")
-    _download(CIFAR10_URL, tgz)
-
-    extract_dir = os.path.join(root, "cifar-10-batches-py")
-    if not os.path.exists(extract_dir):
-        with tarfile.open(tgz, "r:gz") as tar:
-            tar.extractall(path=root)
-
-    # load train batches
-    X_list, y_list = [], []
-    for i in range(1, 6):
-        Xb, yb = _load_batch(os.path.join(extract_dir, f"data_batch_{i}"))
-        X_list.append(Xb)
-        y_list.append(yb)
-    X_train = np.concatenate(X_list, axis=0)
-    y_train = np.concatenate(y_list, axis=0)
-    # test
-    X_test, y_test = _load_batch(os.path.join(extract_dir, "test_batch"))
+    arrays = load_or_build(os.path.join(root, "cache"), ["X_train", "y_train", "X_test", "y_test"],
+                           lambda: _build_cache(root))
+    X_all, y_all = arrays["X_train"], arrays["y_train"]
 
     # train/val split
-    rng = np.random.default_rng(seed)
-    N = X_train.shape[0]
-    idx = np.arange(N)
-    rng.shuffle(idx)
-    n_val = int(N * val_ratio)
-    val_idx = idx[:n_val]
-    train_idx = idx[n_val:]
-
-    X_val, y_val = X_train[val_idx], y_train[val_idx]
-    X_train, y_train = X_train[train_idx], y_train[train_idx]
+    train_idx, val_idx = split_indices(X_all.shape[0], val_ratio, seed)
+    y_train, y_val = y_all[train_idx], y_all[val_idx]
+    y_test = np.asarray(arrays["y_test"])
 
     num_classes = 10
+    if mmap:
+        X_train, X_val = IndexedView(X_all, train_idx), IndexedView(X_all, val_idx)
+        return (X_train, y_train), (X_val, y_val), (arrays["X_test"], y_test), num_classes
+
+    X_train, X_val = to_float(X_all[train_idx]), to_float(X_all[val_idx])
+    X_test = to_float(arrays["X_test"])
     return (X_train, y_train), (X_val, y_val), (X_test, y_test), num_classes
@@ -0,0 +1,125 @@
+"""
+src/data/fetch.py
+Dataset downloads shared by the MNIST and CIFAR-10 loaders.
+
+- streaming: the response is copied in chunks and hashed while it is written,
+  so a file is never held in memory nor read back to verify it;
+- resume: bytes go to <path>.part and a retry continues from its size with an
+  HTTP Range request (servers that ignore Range restart from scratch);
+- mirrors and retries: each URL is tried `retries` times before the next;
+- parallel: fetch_all downloads several files on a thread pool.
+"""
+
+from __future__ import annotations
+import hashlib
+import http.client
+import os
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Sequence, Tuple
+
+CHUNK_SIZE = 1 << 20
+USER_AGENT = "Mozilla/5.0"  # some mirrors block urllib's default agent
+
+
+def _hash_existing(path: str, h) -> int:
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            h.update(chunk)
+            size += len(chunk)
+    return size
+
+
+def _stream(url: str, part: str, h, offset: int, timeout: float):
+    """
+    Write url's bytes from `offset` on to `part`, updating hash h. Returns the
+    hash of the full content (a fresh one if the server ignored the Range).
+    """
+    headers = {"User-Agent": USER_AGENT}
+    if offset > 0:
+        headers["Range"] = f"bytes={offset}-"
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        resp = urllib.request.urlopen(req, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 416 and offset > 0:
+            return h  # nothing left to fetch: .part is already complete
+        raise
+    with resp:
+        mode = "ab"
+        if offset > 0 and resp.status != 206:
+            # Range ignored: the body is the whole file again
+            h = hashlib.md5()
+            mode = "wb"
+        expected = resp.headers.get("Content-Length")
+        written = 0
+        with open(part, mode) as out:
+            while True:
+                try:
+                    chunk = resp.read(CHUNK_SIZE)
+                except http.client.IncompleteRead as e:
+                    # keep what arrived before the connection dropped; the retry resumes after it
+                    h.update(e.partial)
+                    out.write(e.partial)
+                    raise
+                if not chunk:
+                    break
+                h.update(chunk)
+                out.write(chunk)
+                written += len(chunk)
+        if expected is not None and written < int(expected):
+            raise ConnectionError(f"{url}: connection closed after {written} of {expected} bytes")
+    return h
+
+
+def fetch(
+    urls: str | Sequence[str],
+    path: str,
+    md5: str | None = None,
+    retries: int = 3,
+    sleep: float = 1.0,
+    timeout: float = 30.0,
+) -> str:
+    """
+    Download `path` from the first working mirror in `urls` (no-op if it
+    already exists). With md5 the content is verified; a mismatch discards
+    the partial file. Returns path.
+    """
+    if isinstance(urls, str):
+        urls = [urls]
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    part = path + ".part"
+    last_err: Exception | None = None
+    for url in urls:
+        for attempt in range(1, retries + 1):
+            h = hashlib.md5()
+            offset = _hash_existing(part, h) if os.path.exists(part) else 0
+            try:
+                h = _stream(url, part, h, offset, timeout)
+                if md5 is not None and h.hexdigest() != md5:
+                    os.remove(part)
+                    raise RuntimeError(f"MD5 mismatch for {url}")
+                os.replace(part, path)
+                return path
+            except Exception as e:
+                last_err = e
+                if attempt < retries:
+                    time.sleep(sleep)
+    raise RuntimeError(f"Failed to download {os.path.basename(path)} from all mirrors. Last error: {last_err}")
+
+
+def fetch_all(
+    jobs: Iterable[Tuple[str | Sequence[str], str, str | None]],
+    workers: int = 4,
+    **kwargs,
+) -> List[str]:
+    """fetch() every (urls, path, md5) job on `workers` threads; re-raises the first failure."""
+    jobs = list(jobs)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+        futures = [pool.submit(fetch, urls, path, md5, **kwargs) for urls, path, md5 in jobs]
+        return [f.result() for f in futures]
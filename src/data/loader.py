@@ -0,0 +1,239 @@
+"""
+src/data/loader.py
+Multi-process data loading for CPU-heavy per-sample work (decode, resize,
+augmentation) that cannot scale on threads because of the GIL.
+
+DataLoader runs `num_workers` persistent processes. Batch k of an epoch is
+built by worker k % num_workers directly into slot k % num_slots of a fixed
+ring of shared memory buffers, and the trainer receives zero-copy views of
+that slot. Guarantees:
+
+- ordering: batches are yielded in index order whatever the worker timing;
+- determinism: the shuffle of epoch e uses default_rng([seed, e]) (or
+  sampler.indices(e) with a sampler, see src.data.sampler) and the
+  transform of batch k gets default_rng([seed, e, k]), so results do not
+  depend on the number of workers;
+- shutdown: close() (or leaving a `with` block) stops and joins the
+  workers and releases the shared memory.
+
+A yielded batch stays valid until the next batch is requested.
+
+uint8 samples (after the transform, if any) are normalized to float32 in
+[0, 1] straight into the ring, like src.data.batching.BatchIterator does,
+so both sources yield the same batches for train.loop.train.
+
+Dataset protocol: len(dataset) and dataset[i] -> (x: np.ndarray, label: int).
+"""
+
+from __future__ import annotations
+import multiprocessing as mp
+import queue
+import traceback
+from typing import Callable, Iterator, Tuple
+import numpy as np
+
+from ..core.utils import make_batches
+from ..train.shared import SharedArrays, Spec
+
+
+Transform = Callable[[np.ndarray, np.random.Generator], np.ndarray]
+
+
+class ArrayDataset:
+    """Dataset view over in-memory (or memory-mapped) arrays."""
+
+    def __init__(self, X: np.ndarray, y: np.ndarray) -> None:
+        assert X.shape[0] == y.shape[0], "X and y must have the same length"
+        self.X = X
+        self.y = y
+
+    def __len__(self) -> int:
+        return self.X.shape[0]
+
+    def __getitem__(self, i: int) -> Tuple[np.ndarray, int]:
+        return self.X[i], int(self.y[i])
+
+    def read(self, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Contiguous rows [start, stop) (block dataset protocol of src.data.batching)."""
+        return self.X[start:stop], self.y[start:stop]
+
+
+def _worker(rank: int, dataset, transform: Transform | None, seed: int,
+            spec: Spec, name: str, tasks, results) -> None:
+    np.random.seed((seed + rank) % 2**32)
+    ring = SharedArrays(spec, name=name)
+    X, Y = ring["X"], ring["y"]
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            epoch, k, slot, idx = task
+            try:
+                rng = np.random.default_rng([seed, epoch, k])
+                for j, i in enumerate(idx):
+                    x, label = dataset[int(i)]
+                    if transform is not None:
+                        x = transform(x, rng)
+                    x = np.asarray(x)
+                    if x.dtype == np.uint8:
+                        np.divide(x, 255.0, out=X[slot, j], dtype=np.float32)
+                    else:
+                        X[slot, j] = x
+                    Y[slot, j] = label
+                results.put((epoch, k, None))
+            except Exception:
+                results.put((epoch, k, traceback.format_exc()))
+    finally:
+        del X, Y
+        ring.close()
+
+
+class DataLoader:
+    def __init__(
+        self,
+        dataset,
+        batch_size: int = 128,
+        shuffle: bool = True,
+        num_workers: int = 2,
+        prefetch: int = 2,
+        transform: Transform | None = None,
+        seed: int = 0,
+        drop_last: bool = False,
+        timeout: float = 120.0,
+        sampler=None,
+    ) -> None:
+        assert batch_size > 0 and num_workers >= 1 and prefetch >= 1
+        self.dataset = dataset
+        self.batch_size = int(batch_size)
+        self.shuffle = bool(shuffle)
+        self.num_workers = int(num_workers)
+        self.num_slots = self.num_workers * int(prefetch)
+        self.transform = transform
+        self.seed = int(seed)
+        self.drop_last = bool(drop_last)
+        self.timeout = float(timeout)
+        self.sampler = sampler
+        self.epoch = 0
+        self._ring: SharedArrays | None = None
+        self._procs: list = []
+        self._tasks: list = []
+        self._results = None
+
+    def __len__(self) -> int:
+        N = len(self.sampler) if self.sampler is not None else len(self.dataset)
+        return N // self.batch_size if self.drop_last else -(-N // self.batch_size)
+
+    # -------- lifecycle --------
+    def _start(self) -> None:
+        x0, _ = self.dataset[0]
+        if self.transform is not None:
+            x0 = self.transform(np.asarray(x0), np.random.default_rng(self.seed))
+        x0 = np.asarray(x0)
+        x_dtype = np.dtype(np.float32) if x0.dtype == np.uint8 else x0.dtype
+        S, B = self.num_slots, self.batch_size
+        self._ring = SharedArrays({
+            "X": ((S, B) + x0.shape, x_dtype.str),
+            "y": ((S, B), "<i8"),
+        })
+        ctx = mp.get_context()
+        self._results = ctx.Queue()
+        for r in range(self.num_workers):
+            tasks = ctx.Queue()
+            p = ctx.Process(target=_worker, daemon=True,
+                            args=(r, self.dataset, self.transform, self.seed,
+                                  self._ring.spec, self._ring.name, tasks, self._results))
+            p.start()
+            self._tasks.append(tasks)
+            self._procs.append(p)
+
+    def close(self) -> None:
+        for tasks in self._tasks:
+            try:
+                tasks.put(None)
+            except (OSError, ValueError):
+                pass
+        for p in self._procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+                p.join()
+        self._procs, self._tasks = [], []
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+
+    def __enter__(self) -> "DataLoader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    # -------- iteration --------
+    def _wait(self, epoch: int) -> Tuple[int, str | None]:
+        waited = 0.0
+        while True:
+            try:
+                e, k, err = self._results.get(timeout=1.0)
+            except queue.Empty:
+                dead = [p.pid for p in self._procs if not p.is_alive()]
+                if dead:
+                    raise RuntimeError(f"DataLoader worker(s) {dead} exited unexpectedly")
+                waited += 1.0
+                if waited >= self.timeout:
+                    raise TimeoutError(f"DataLoader: no batch ready after {self.timeout:.0f}s")
+                continue
+            if e == epoch:
+                return k, err
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        if self._ring is None:
+            self._start()
+        self.epoch += 1
+        epoch = self.epoch
+        if self.sampler is not None:
+            order = self.sampler.indices(epoch)
+        else:
+            N = len(self.dataset)
+            order = np.random.default_rng([self.seed, epoch]).permutation(N) if self.shuffle else np.arange(N)
+        N = order.size
+        batches = [order[s:e] for s, e in make_batches(N, self.batch_size)]
+        if self.drop_last and batches and batches[-1].size < self.batch_size:
+            batches.pop()
+
+        X, Y = self._ring["X"], self._ring["y"]
+        pending = 0
+
+        def dispatch(k: int) -> None:
+            nonlocal pending
+            self._tasks[k % self.num_workers].put((epoch, k, k % self.num_slots, batches[k]))
+            pending += 1
+
+        for k in range(min(self.num_slots, len(batches))):
+            dispatch(k)
+        done: dict[int, str | None] = {}
+        try:
+            for k in range(len(batches)):
+                while k not in done:
+                    kk, err = self._wait(epoch)
+                    pending -= 1
+                    done[kk] = err
+                err = done.pop(k)
+                if err is not None:
+                    raise RuntimeError(f"DataLoader worker failed on batch {k}:\n{err}")
+                slot, n = k % self.num_slots, batches[k].size
+                yield X[slot, :n], Y[slot, :n]
+                # the consumer is back for the next batch, so this slot is free again
+                if k + self.num_slots < len(batches):
+                    dispatch(k + self.num_slots)
+        finally:
+            # never leave workers writing into the ring after an early exit
+            while pending > 0 and all(p.is_alive() for p in self._procs):
+                self._wait(epoch)
+                pending -= 1
@@ -4,12 +4,12 @@
 from __future__ import annotations
 import os
 import gzip
-import hashlib
-import time
-import urllib.request
-from typing import Tuple, List
+from typing import Tuple
 import numpy as np
 
+from .cache import IndexedView, load_or_build, split_indices, to_float
+from .fetch import fetch_all
+
 # Miroirs (ordre de préférence). MD5 officiels conservés.
 MNIST_MIRRORS = [
     "https://storage.googleapis.com/cvdf-datasets/mnist",      # Google (HTTPS)
@@ -22,47 +22,12 @@ MNIST_FILES = {
     "test_labels":  ("t10k-labels-idx1-ubyte.gz",  "ec29112dd5afa0611ce80d1b7f02629c"),
 }
 
-def _download_with_retries(urls: List[str], path: str, md5: str | None = None, retries: int = 3, sleep: float = 1.0) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    if os.path.exists(path):
-        return
-    last_err = None
-    for url in urls:
-        for attempt in range(1, retries + 1):
-            try:
-                tmp = path + ".tmp"
-                # User-Agent pour éviter certains blocages
-                req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-                with urllib.request.urlopen(req, timeout=30) as resp, open(tmp, "wb") as out:
-                    out.write(resp.read())
-                if md5 is not None:
-                    with open(tmp, "rb") as f:
-                        data = f.read()
-                    if hashlib.md5(data).hexdigest() != md5:
-                        os.remove(tmp)
-                        raise RuntimeError(f"MD5 mismatch for {url}")
-                os.rename(tmp, path)
-                return
-            except Exception as e:
-                last_err = e
-                if os.path.exists(tmp := path + ".tmp"):
-                    try:
-                        os.remove(tmp)
-                    except Exception:
-                        pass
-                if attempt < retries:
-                    time.sleep(sleep)
-                else:
-                    # essaie prochain miroir
-                    break
-    raise RuntimeError(f"Failed to download after trying all mirrors. Last error: {last_err}")
-
 def _download_all(root: str) -> None:
-    for key, (fname, md5) in MNIST_FILES.items():
-        urls = [f"{base}/{fname}" for base in MNIST_MIRRORS]
-        _download_with_retries(urls, os.path.join(root, fname), md5)
+    # les 4 fichiers en parallèle, reprise et MD5 en streaming (voir fetch.py)
+    fetch_all(([f"{base}/{fname}" for base in MNIST_MIRRORS], os.path.join(root, fname), md5)
+              for fname, md5 in MNIST_FILES.values())
 
-def _load_idx_images(path_gz: str) -> np.ndarray:
+def _read_idx_images(path_gz: str) -> np.ndarray:
     with gzip.open(path_gz, "rb") as f:
         data = f.read()
     magic = int.from_bytes(data[0:4], "big")
@@ -71,11 +36,8 @@ def _load_idx_images(path_gz: str) -> np.ndarray:
     N = int.from_bytes(data[4:8], "big")
     H = int.from_bytes(data[8:12], "big")
     W = int.from_bytes(data[12:16], "big")
-    arr = np.frombuffer(data, dtype=np.uint8, offset=16).reshape(N, H, W)
-    # to NCHW float32 in [0,1]
-    arr = arr.astype(np.float32) / 255.0
-    arr = arr[:, None, :, :]
-    return arr
+    # raw uint8, NCHW
+    return np.frombuffer(data, dtype=np.uint8, offset=16).reshape(N, 1, H, W)
 
 def _load_idx_labels(path_gz: str) -> np.ndarray:
     with gzip.open(path_gz, "rb") as f:
@@ -87,35 +49,47 @@ def _load_idx_labels(path_gz: str) -> np.ndarray:
     arr = np.frombuffer(data, dtype=np.uint8, offset=8).reshape(N,)
     return arr.astype(np.int64)
 
-def load_mnist(data_dir: str = "data", val_ratio: float = 0.1, seed: int = 42) -> Tuple[
+def _build_cache(root: str) -> dict:
+    return {
+        "X_train": _read_idx_images(os.path.join(root, "train-images-idx3-ubyte.gz")),
+        "y_train": _load_idx_labels(os.path.join(root, "train-labels-idx1-ubyte.gz")),
+        "X_test": _read_idx_images(os.path.join(root, "t10k-images-idx3-ubyte.gz")),
+        "y_test": _load_idx_labels(os.path.join(root, "t10k-labels-idx1-ubyte.gz")),
+    }
+
+def load_mnist(data_dir: str = "data", val_ratio: float = 0.1, seed: int = 42, mmap: bool = False) -> Tuple[
     Tuple[np.ndarray, np.ndarray],
     Tuple[np.ndarray, np.ndarray],
     Tuple[np.ndarray, np.ndarray],
     int,
 ]:
+    """
+    The IDX files are converted once to uint8 .npy files under <root>/cache.
+    mmap=False: float32 arrays in [0,1] as before.
+    mmap=True: uint8 memory maps (train/val as lazy IndexedView); batches are
+    normalized at iteration time by BatchIterator / evaluate.
+    """
     root = os.path.join(data_dir, "mnist")
     os.makedirs(root, exist_ok=True)
 
-    # Téléchargement unique via les miroirs
-    _download_all(root)
+    def build() -> dict:
+        # Téléchargement unique via les miroirs
+        _download_all(root)
+        return _build_cache(root)
 
-    # Lecture des fichiers gz
-    X_train = _load_idx_images(os.path.join(root, "train-images-idx3-ubyte.gz"))
-    y_train = _load_idx_labels(os.path.join(root, "train-labels-idx1-ubyte.gz"))
-    X_test  = _load_idx_images(os.path.join(root, "t10k-images-idx3-ubyte.gz"))
-    y_test  = _load_idx_labels(os.path.join(root, "t10k-labels-idx1-ubyte.gz"))
+    arrays = load_or_build(os.path.join(root, "cache"), ["X_train", "y_train", "X_test", "y_test"], build)
+    X_all, y_all = arrays["X_train"], arrays["y_train"]
 
     # Split train/val
-    rng = np.random.default_rng(seed)
-    N = X_train.shape[0]
-    idx = np.arange(N)
-    rng.shuffle(idx)
-    n_val = int(N * val_ratio)
-    val_idx = idx[:n_val]
-    train_idx = idx[n_val:]
-
-    X_val, y_val = X_train[val_idx], y_train[val_idx]
-    X_train, y_train = X_train[train_idx], y_train[train_idx]
+    train_idx, val_idx = split_indices(X_all.shape[0], val_ratio, seed)
+    y_train, y_val = y_all[train_idx], y_all[val_idx]
+    y_test = np.asarray(arrays["y_test"])
 
     num_classes = 10
+    if mmap:
+        X_train, X_val = IndexedView(X_all, train_idx), IndexedView(X_all, val_idx)
+        return (X_train, y_train), (X_val, y_val), (arrays["X_test"], y_test), num_classes
+
+    X_train, X_val = to_float(X_all[train_idx]), to_float(X_all[val_idx])
+    X_test = to_float(arrays["X_test"])
     return (X_train, y_train), (X_val, y_val), (X_test, y_test), num_classes
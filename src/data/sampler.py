@@ -0,0 +1,150 @@
+"""
+src/data/sampler.py
+Weighted sampling of training indices for imbalanced datasets.
+
+AliasTable implements Walker's alias method (Vose's O(n) construction):
+after building the table once, every draw costs O(1) and a whole epoch of
+indices is drawn in one vectorized pass.
+
+WeightedSampler turns labels into per-sample weights:
+- "balanced": every class gets the same total probability;
+- "inverse_freq": class probability proportional to count**(1 - power),
+  i.e. power=1 is balanced, power=0 uniform, 0.5 a square-root compromise;
+- "custom": class probability proportional to `class_weights`, or explicit
+  per-sample `sample_weights`.
+With `groups` (e.g. HAM10000 lesion ids) a class's probability is split
+equally over its groups first and then over the images of each group, so a
+lesion photographed many times is not oversampled.
+
+Samplers draw with replacement; num_samples sets the epoch length.
+"""
+
+from __future__ import annotations
+from typing import Dict
+import numpy as np
+
+
+class AliasTable:
+    def __init__(self, weights: np.ndarray) -> None:
+        w = np.asarray(weights, dtype=np.float64)
+        if w.ndim != 1 or w.size == 0:
+            raise ValueError("weights must be a non-empty 1D array")
+        if np.any(w < 0) or not np.isfinite(w).all() or w.sum() <= 0:
+            raise ValueError("weights must be finite, non-negative and not all zero")
+        n = w.size
+        scaled = w * (n / w.sum())
+        prob = np.ones(n, dtype=np.float64)
+        alias = np.arange(n, dtype=np.int64)
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # whatever is left has probability 1 up to rounding
+        self.prob = prob
+        self.alias = alias
+
+    def __len__(self) -> int:
+        return self.prob.size
+
+    def draw(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        """`size` indices distributed proportionally to the weights."""
+        i = rng.integers(0, self.prob.size, size=size)
+        return np.where(rng.random(size) < self.prob[i], i, self.alias[i])
+
+
+class WeightedSampler:
+    def __init__(
+        self,
+        labels: np.ndarray,
+        mode: str = "balanced",
+        power: float = 1.0,
+        class_weights: np.ndarray | None = None,
+        sample_weights: np.ndarray | None = None,
+        groups: np.ndarray | None = None,
+        num_samples: int | None = None,
+        seed: int = 0,
+    ) -> None:
+        labels = np.asarray(labels).astype(np.int64, copy=False)
+        self.num_samples = int(num_samples) if num_samples is not None else labels.size
+        assert self.num_samples > 0, "num_samples must be > 0"
+        self.seed = int(seed)
+
+        if sample_weights is not None:
+            w = np.asarray(sample_weights, dtype=np.float64)
+            if w.shape != labels.shape:
+                raise ValueError("sample_weights must have one weight per sample")
+        else:
+            classes, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+            inverse = inverse.reshape(-1)
+            mode = mode.lower()
+            if mode == "balanced":
+                class_mass = np.ones(classes.size)
+            elif mode == "inverse_freq":
+                class_mass = counts.astype(np.float64) ** (1.0 - float(power))
+            elif mode == "custom":
+                if class_weights is None:
+                    raise ValueError("mode='custom' needs class_weights or sample_weights")
+                class_mass = np.asarray(class_weights, dtype=np.float64)[classes]
+            else:
+                raise ValueError(f"Unknown sampler mode {mode}")
+            if groups is not None:
+                w = self._group_weights(inverse, class_mass, np.asarray(groups))
+            else:
+                w = (class_mass / counts)[inverse]
+        self.weights = w / w.sum()
+        self.table = AliasTable(self.weights)
+
+    @staticmethod
+    def _group_weights(inverse: np.ndarray, class_mass: np.ndarray, groups: np.ndarray) -> np.ndarray:
+        if groups.shape != inverse.shape:
+            raise ValueError("groups must have one entry per sample")
+        # one id per (class, group) pair, then images per pair and pairs per class
+        group_ids = np.unique(groups, return_inverse=True)[1].reshape(-1)
+        pair = np.unique(inverse * (group_ids.max() + 1) + group_ids, return_inverse=True)[1].reshape(-1)
+        images_per_pair = np.bincount(pair)
+        pair_class = np.zeros(images_per_pair.size, dtype=np.int64)
+        pair_class[pair] = inverse
+        groups_per_class = np.bincount(pair_class, minlength=class_mass.size)
+        return class_mass[inverse] / groups_per_class[inverse] / images_per_pair[pair]
+
+    def __len__(self) -> int:
+        return self.num_samples
+
+    def indices(self, epoch: int) -> np.ndarray:
+        """Sample indices for `epoch`, deterministic given (seed, epoch)."""
+        return self.table.draw(self.num_samples, np.random.default_rng([self.seed, int(epoch)]))
+
+    def class_distribution(self, labels: np.ndarray) -> Dict[int, float]:
+        """Expected fraction of draws per class."""
+        labels = np.asarray(labels)
+        return {int(c): float(self.weights[labels == c].sum()) for c in np.unique(labels)}
+
+
+def build_sampler(cfg: dict | None, labels: np.ndarray, groups: np.ndarray | None = None,
+                  seed: int = 0) -> WeightedSampler | None:
+    """
+    Factory. cfg example:
+        {"mode": "balanced", "num_samples": 20000, "group_by_lesion": true}
+        {"mode": "inverse_freq", "power": 0.5}
+        {"mode": "custom", "class_weights": [1, 1, 1, 1, 4, 1, 1]}
+
+    Returns a WeightedSampler or None if cfg is empty or mode is "uniform".
+    group_by_lesion needs `groups` (one group id per sample, e.g. lesion ids).
+    """
+    if not cfg or str(cfg.get("mode", "uniform")).lower() == "uniform":
+        return None
+    if cfg.get("group_by_lesion", False) and groups is None:
+        raise ValueError("sampler.group_by_lesion needs per-sample group ids, none are available for this dataset")
+    return WeightedSampler(
+        labels,
+        mode=str(cfg["mode"]),
+        power=float(cfg.get("power", 1.0)),
+        class_weights=cfg.get("class_weights"),
+        groups=groups if cfg.get("group_by_lesion", False) else None,
+        num_samples=cfg.get("num_samples"),
+        seed=seed,
+    )
@@ -25,7 +25,7 @@ class ReLU(Layer):
         self._mask = x > 0
         return x * self._mask
 
-    def backward(self, grad_out: np.ndarray) -> np.ndarray:
+    def backward(self, grad_out: np.ndarray, need_input_grad: bool = True) -> np.ndarray:
         if self._mask is None:
             raise RuntimeError("ReLU.backward called before forward.")
         return grad_out * self._mask
@@ -43,7 +43,7 @@ class LeakyReLU(Layer):
         self._x = x
         return np.where(x > 0, x, self.negative_slope * x)
 
-    def backward(self, grad_out: np.ndarray) -> np.ndarray:
+    def backward(self, grad_out: np.ndarray, need_input_grad: bool = True) -> np.ndarray:
         if self._x is None:
             raise RuntimeError("LeakyReLU.backward called before forward.")
         dx = np.ones_like(self._x)
@@ -63,7 +63,7 @@ class Tanh(Layer):
         self._y = y
         return y
 
-    def backward(self, grad_out: np.ndarray) -> np.ndarray:
+    def backward(self, grad_out: np.ndarray, need_input_grad: bool = True) -> np.ndarray:
         if self._y is None:
             raise RuntimeError("Tanh.backward called before forward.")
         # d/dx tanh(x) = 1 - tanh(x)^2
@@ -90,7 +90,7 @@ class Softmax(Layer):
         self._out = out
         return out
 
-    def backward(self, grad_out: np.ndarray) -> np.ndarray:
+    def backward(self, grad_out: np.ndarray, need_input_grad: bool = True) -> np.ndarray:
         """
         Generic softmax backward is O(C^2). Rarely used since CE backward is simpler.
         Implements: dY = J_softmax * grad_out
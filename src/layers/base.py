@@ -4,28 +4,57 @@ Abstract base for all layers.
 
 Each layer must implement:
 - forward(x, training=True) -> np.ndarray
-- backward(grad_out) -> np.ndarray
+- backward(grad_out, need_input_grad=True) -> np.ndarray | None
 - params() -> dict[str, np.ndarray]
 - grads()  -> dict[str, np.ndarray]
+- buffers() -> dict[str, np.ndarray] for non-learnable state (optional)
 - train() / eval() to switch behavior (e.g., Dropout, BatchNorm)
+- freeze() / unfreeze() to toggle requires_grad: a frozen layer keeps its
+  params fixed and skips its param-gradient work in backward (grads() then
+  returns stale values and must not be used for updates)
 
 Conventions:
 - Inputs are np.ndarray
 - Forward caches any intermediates required for backward
-- Backward returns grad wrt input with same shape as input
+- Backward returns grad wrt input with same shape as input; with
+  need_input_grad=False (nothing below consumes it, e.g. the first layer) a
+  layer may skip that work and return None, but still fills its param grads
+
+Deferred initialization:
+- Layers built inside `with deferred_init():` record the shape, dtype and
+  initializer of their randomly initialized params instead of drawing them.
+  A deferred param is drawn on first access, unless it was bound or loaded
+  from a checkpoint before (Sequential.bind_params / load_params), in which
+  case it is never drawn. param_specs() gives shapes without drawing.
 """
 
 from __future__ import annotations
 import numpy as np
-from typing import Dict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Tuple
 
 
 ParamDict = Dict[str, np.ndarray]
+ParamSpec = Tuple[Tuple[int, ...], np.dtype]
+
+_defer_init = False
+
+
+@contextmanager
+def deferred_init() -> Iterator[None]:
+    """Layers created in this block draw their random params on first access."""
+    global _defer_init
+    previous, _defer_init = _defer_init, True
+    try:
+        yield
+    finally:
+        _defer_init = previous
 
 
 class Layer:
     def __init__(self) -> None:
         self.training: bool = True  # default in training mode
+        self.requires_grad: bool = True  # False: params are frozen
 
     # -------- lifecycle --------
     def train(self) -> None:
@@ -36,6 +65,50 @@ class Layer:
         """Switch to eval/inference mode."""
         self.training = False
 
+    def freeze(self) -> None:
+        """Stop training this layer's params (backward skips their gradients)."""
+        self.requires_grad = False
+
+    def unfreeze(self) -> None:
+        self.requires_grad = True
+
+    # -------- deferred initialization --------
+    def _init_param(self, name: str, shape: Tuple[int, ...], dtype: np.dtype,
+                    init: Callable[[], np.ndarray]) -> None:
+        """Set param `name` to init(), or record it if inside deferred_init().
+        init must be picklable (e.g. a functools.partial of an initializer)."""
+        if _defer_init:
+            self.__dict__.setdefault("_deferred", {})[name] = (tuple(shape), np.dtype(dtype), init)
+        else:
+            setattr(self, name, init())
+
+    def __getattr__(self, name: str):
+        # Only reached when normal lookup fails, i.e. for params not drawn yet
+        deferred = self.__dict__.get("_deferred")
+        if deferred is None or name not in deferred:
+            raise AttributeError(f"{self.__class__.__name__!r} object has no attribute {name!r}")
+        shape, dtype, init = deferred[name]
+        if self.__dict__.get("_peek"):
+            # param_specs(): a zero-byte placeholder with the right shape/dtype
+            return np.broadcast_to(np.zeros((), dtype=dtype), shape)
+        value = init()
+        setattr(self, name, value)
+        del deferred[name]
+        return value
+
+    def set_param(self, name: str, value: np.ndarray) -> None:
+        """Replace a param or buffer array (a deferred one is then never drawn)."""
+        setattr(self, name, value)
+        self.__dict__.get("_deferred", {}).pop(name, None)
+
+    def param_specs(self) -> Dict[str, ParamSpec]:
+        """(shape, dtype) of each params() entry, without drawing deferred params."""
+        self.__dict__["_peek"] = True
+        try:
+            return {k: (v.shape, v.dtype) for k, v in self.params().items()}
+        finally:
+            del self.__dict__["_peek"]
+
     # -------- API to implement --------
     def forward(self, x: np.ndarray, training: bool | None = None) -> np.ndarray:
         """
@@ -44,10 +117,11 @@ class Layer:
         """
         raise NotImplementedError
 
-    def backward(self, grad_out: np.ndarray) -> np.ndarray:
+    def backward(self, grad_out: np.ndarray, need_input_grad: bool = True) -> np.ndarray | None:
         """
         Backpropagate gradient from next layer to this layer's input.
         Must fill internal grad buffers for params, accessible via grads().
+        need_input_grad=False allows returning None instead of the input grad.
         """
         raise NotImplementedError
 
@@ -60,6 +134,10 @@ class Layer:
         """Return gradients wrt params with same keys/shapes as params()."""
         return {}
 
+    def buffers(self) -> ParamDict:
+        """Return non-learnable state (e.g. BatchNorm running stats). Empty if none."""
+        return {}
+
     # -------- utility checks --------
     @staticmethod
     def _assert_same_shape(a: np.ndarray, b: np.ndarray, msg: str = "") -> None:
@@ -4,9 +4,14 @@ Batch Normalization for 2D feature maps (N, C, H, W).
 - Per-channel mean/var computed over N*H*W in training
 - Running stats used in eval
 - Learnable gamma (scale) and beta (shift)
+- Optional `sync` hook (SyncBN): sync(kind, local) returns the sum of the
+  per-channel vector `local` over all replicas of a data-parallel step
+  (see src.train.parallel), so the training batch statistics and the
+  backward mean-of-grad terms cover the full batch, not one shard
 """
 
 from __future__ import annotations
+from typing import Callable
 import numpy as np
 from .base import Layer, ParamDict
 
@@ -31,6 +36,14 @@ class BatchNorm2D(Layer):
         self._dgamma = np.zeros_like(self.gamma)
         self._dbeta = np.zeros_like(self.beta)
 
+        # Statistics of the last training batch (see last_batch_stats)
+        self._batch_mean: np.ndarray | None = None
+        self._batch_var: np.ndarray | None = None
+
+        # Cross-replica reduction (SyncBN), None for local statistics
+        self.sync: Callable[[str, np.ndarray], np.ndarray] | None = None
+        self._count = 0.0
+
         # Cache
         self._x_centered: np.ndarray | None = None
         self._inv_std: np.ndarray | None = None
@@ -46,8 +59,17 @@ class BatchNorm2D(Layer):
             # Compute per-channel mean/var over N*H*W
             N, C, H, W = x.shape
             x_resh = x.transpose(1, 0, 2, 3).reshape(C, -1)  # (C, N*H*W)
-            mean = x_resh.mean(axis=1)                       # (C,)
-            var = x_resh.var(axis=1, ddof=0)                 # (C,)
+            if self.sync is None:
+                mean = x_resh.mean(axis=1)                   # (C,)
+                var = x_resh.var(axis=1, ddof=0)             # (C,)
+            else:
+                # (count, sum, sum of squares) summed over all replicas
+                x64 = x_resh.astype(np.float64, copy=False)
+                local = np.concatenate([[x64.shape[1]], x64.sum(axis=1), np.einsum("ij,ij->i", x64, x64)])
+                total = self.sync("forward", local)
+                self._count = float(total[0])
+                mean = total[1:C + 1] / self._count
+                var = np.maximum(total[C + 1:] / self._count - mean * mean, 0.0)
 
             # Normalize
             x_centered = (x - mean[None, :, None, None])
@@ -55,8 +77,9 @@ class BatchNorm2D(Layer):
             x_hat = x_centered * inv_std[None, :, None, None]
 
             # Update running stats
-            self.running_mean = self.momentum * self.running_mean + (1 - self.momentum) * mean
-            self.running_var = self.momentum * self.running_var + (1 - self.momentum) * var
+            self._batch_mean = mean
+            self._batch_var = var
+            self.update_running_stats(mean, var)
 
             # Cache for backward
             self._x_centered = x_centered
@@ -72,7 +95,7 @@ class BatchNorm2D(Layer):
             y = self.gamma[None, :, None, None] * x_hat + self.beta[None, :, None, None]
             return y.astype(x.dtype)
 
-    def backward(self, grad_out: np.ndarray) -> np.ndarray:
+    def backward(self, grad_out: np.ndarray, need_input_grad: bool = True) -> np.ndarray | None:
         if self._x_centered is None or self._inv_std is None or self._x_hat is None:
             raise RuntimeError("BatchNorm2D.backward called before forward in training mode.")
 
@@ -81,25 +104,48 @@ class BatchNorm2D(Layer):
         axes = (0, 2, 3)  # reduction over N,H,W
 
         # grads w.r.t. scale/shift
-        self._dgamma = np.sum(grad_out * self._x_hat, axis=axes)
-        self._dbeta  = np.sum(grad_out,               axis=axes)
+        if self.requires_grad:
+            self._dgamma = np.sum(grad_out * self._x_hat, axis=axes)
+            self._dbeta  = np.sum(grad_out,               axis=axes)
 
+        if not need_input_grad:
+            return None
         # compact, numerically stable formula for dx
         gamma = self.gamma[None, :, None, None].astype(grad_out.dtype, copy=False)
         inv_std = self._inv_std[None, :, None, None].astype(grad_out.dtype, copy=False)
         x_hat = self._x_hat.astype(grad_out.dtype, copy=False)
         dy = grad_out.astype(grad_out.dtype, copy=False)
 
-        # per-channel means across N,H,W
-        mean_dy = np.mean(dy, axis=axes, keepdims=True)
-        mean_dy_xhat = np.mean(dy * x_hat, axis=axes, keepdims=True)
+        # per-channel means across N,H,W (of every replica with sync; each
+        # replica's grad_out is then its part of the full-batch loss gradient)
+        if self.sync is None:
+            mean_dy = np.mean(dy, axis=axes, keepdims=True)
+            mean_dy_xhat = np.mean(dy * x_hat, axis=axes, keepdims=True)
+        else:
+            local = np.concatenate([np.sum(dy, axis=axes), np.sum(dy * x_hat, axis=axes)]).astype(np.float64)
+            total = self.sync("backward", local) / self._count
+            mean_dy = total[:C].astype(dy.dtype)[None, :, None, None]
+            mean_dy_xhat = total[C:].astype(dy.dtype)[None, :, None, None]
 
         dx = (gamma * inv_std) * (dy - mean_dy - x_hat * mean_dy_xhat)
         return dx
 
+    def update_running_stats(self, mean: np.ndarray, var: np.ndarray) -> None:
+        """Fold one batch's per-channel mean/var into the running statistics."""
+        self.running_mean = self.momentum * self.running_mean + (1 - self.momentum) * mean
+        self.running_var = self.momentum * self.running_var + (1 - self.momentum) * var
+
+    def last_batch_stats(self) -> tuple[np.ndarray, np.ndarray]:
+        """Per-channel (mean, var) of the last training-mode batch."""
+        if self._batch_mean is None or self._batch_var is None:
+            raise RuntimeError("BatchNorm2D.last_batch_stats called before a training forward.")
+        return self._batch_mean, self._batch_var
 
     def params(self) -> ParamDict:
         return {"gamma": self.gamma, "beta": self.beta}
 
     def grads(self) -> ParamDict:
         return {"gamma": self._dgamma, "beta": self._dbeta}
+
+    def buffers(self) -> ParamDict:
+        return {"running_mean": self.running_mean, "running_var": self.running_var}
@@ -20,7 +20,8 @@ Notes:
 
 from __future__ import annotations
 import numpy as np
-from typing import Dict, Tuple, Literal
+from functools import partial
+from typing import Tuple, Literal
 
 from .base import Layer, ParamDict
 from ..core.utils import im2col, col2im
@@ -63,16 +64,17 @@ class Conv2D(Layer):
         # Parameters
         W_shape = (self.out_channels, self.in_channels, KH, KW)
         if weight_init == "he_normal":
-            self.W = he_normal(W_shape, rng=rng, dtype=dtype)
+            init = partial(he_normal, W_shape, rng=rng, dtype=dtype)
         elif weight_init == "xavier_uniform":
-            self.W = xavier_uniform(W_shape, rng=rng, dtype=dtype)
+            init = partial(xavier_uniform, W_shape, rng=rng, dtype=dtype)
         else:
             raise ValueError(f"Unknown weight_init: {weight_init}")
+        self._init_param("W", W_shape, dtype, init)  # drawn lazily under deferred_init()
 
         self.b = bias_zeros((self.out_channels,), dtype=dtype) if self.use_bias else None
 
         # Grad buffers
-        self._dW = np.zeros_like(self.W, dtype=dtype)
+        self._dW = np.zeros(W_shape, dtype=dtype)
         self._db = np.zeros_like(self.b, dtype=dtype) if self.use_bias else None
 
         # Cache for backward
@@ -117,7 +119,7 @@ class Conv2D(Layer):
         out = out.reshape(N, H_out, W_out, self.out_channels).transpose(0, 3, 1, 2)
         return out
 
-    def backward(self, grad_out: np.ndarray) -> np.ndarray:
+    def backward(self, grad_out: np.ndarray, need_input_grad: bool = True) -> np.ndarray | None:
         if self._x_shape is None or self._x_cols is None or self._out_hw is None:
             raise RuntimeError("Conv2D.backward called before forward or cache cleared.")
 
@@ -135,12 +137,16 @@ class Conv2D(Layer):
 
         grad_cols_out = grad_out.transpose(0, 2, 3, 1).reshape(N * H_out * W_out, self.out_channels)
 
-        dW_row = grad_cols_out.T @ self._x_cols
-        self._dW = dW_row.reshape(self.out_channels, C_in, KH, KW)
+        if self.requires_grad:
+            dW_row = grad_cols_out.T @ self._x_cols
+            self._dW = dW_row.reshape(self.out_channels, C_in, KH, KW)
 
-        if self.use_bias and self.b is not None:
-            self._db = np.sum(grad_cols_out, axis=0)
+            if self.use_bias and self.b is not None:
+                self._db = np.sum(grad_cols_out, axis=0)
 
+        if not need_input_grad:
+            # e.g. the first layer: skip the dX GEMM and the col2im scatter
+            return None
         W_row = self.W.reshape(self.out_channels, -1)
         dX_cols = grad_cols_out @ W_row
 
@@ -14,7 +14,8 @@ Notes:
 
 from __future__ import annotations
 import numpy as np
-from typing import Tuple, Dict
+from functools import partial
+from typing import Tuple
 
 from .base import Layer, ParamDict
 from ..core.initializers import xavier_uniform, he_normal, bias_zeros
@@ -37,17 +38,19 @@ class Dense(Layer):
         self.use_bias = bool(bias)
         self.dtype = dtype
 
+        W_shape = (self.out_features, self.in_features)
         if weight_init == "xavier_uniform":
-            self.W = xavier_uniform((out_features, in_features), rng=rng, dtype=dtype)
+            init = partial(xavier_uniform, W_shape, rng=rng, dtype=dtype)
         elif weight_init == "he_normal":
-            self.W = he_normal((out_features, in_features), rng=rng, dtype=dtype)
+            init = partial(he_normal, W_shape, rng=rng, dtype=dtype)
         else:
             raise ValueError(f"Unknown weight_init {weight_init}")
+        self._init_param("W", W_shape, dtype, init)  # drawn lazily under deferred_init()
 
         self.b = bias_zeros((out_features,), dtype=dtype) if self.use_bias else None
 
         # grad buffers
-        self._dW = np.zeros_like(self.W, dtype=dtype)
+        self._dW = np.zeros(W_shape, dtype=dtype)
         self._db = np.zeros_like(self.b, dtype=dtype) if self.use_bias else None
 
         # cache
@@ -68,16 +71,19 @@ class Dense(Layer):
             y += self.b
         return y
 
-    def backward(self, grad_out: np.ndarray) -> np.ndarray:
+    def backward(self, grad_out: np.ndarray, need_input_grad: bool = True) -> np.ndarray | None:
         if self._x_2d is None or self._x_shape is None:
             raise RuntimeError("Dense.backward called before forward.")
         grad_out = grad_out.astype(self.dtype, copy=False)
 
-        # dW = grad_out^T @ x
-        self._dW = grad_out.T @ self._x_2d
-        if self.use_bias and self._db is not None:
-            self._db = np.sum(grad_out, axis=0)
+        if self.requires_grad:
+            # dW = grad_out^T @ x
+            self._dW = grad_out.T @ self._x_2d
+            if self.use_bias and self._db is not None:
+                self._db = np.sum(grad_out, axis=0)
 
+        if not need_input_grad:
+            return None
         # dX = grad_out @ W
         grad_x_2d = grad_out @ self.W
         if len(self._x_shape) > 2:
@@ -30,7 +30,7 @@ class Dropout(Layer):
         self._mask = mask
         return (x * mask) * self._scale
 
-    def backward(self, grad_out: np.ndarray) -> np.ndarray:
+    def backward(self, grad_out: np.ndarray, need_input_grad: bool = True) -> np.ndarray:
         if self._mask is None:
             # eval mode -> identity
             return grad_out
@@ -1,6 +1,6 @@
 """
 src/layers/pooling.py
-Pooling layers: MaxPool2D and AvgPool2D.
+Pooling layers: MaxPool2D, AvgPool2D and AdaptiveAvgPool2D.
 
 Input / Output conventions:
 - Input  x: (N, C, H, W)
@@ -12,6 +12,9 @@ Input / Output conventions:
 Notes:
 - MaxPool caches argmax indices for backward.
 - AvgPool distributes gradient equally.
+- AdaptiveAvgPool2D has a fixed output size for any input size (bin i covers
+  rows floor(i*H/OH) .. ceil((i+1)*H/OH)), which makes the following Dense
+  head independent of the input resolution.
 """
 
 from __future__ import annotations
@@ -61,7 +64,7 @@ class MaxPool2D(Layer):
         self._mask = mask
         return out
 
-    def backward(self, grad_out: np.ndarray) -> np.ndarray:
+    def backward(self, grad_out: np.ndarray, need_input_grad: bool = True) -> np.ndarray:
         if self._x_shape is None or self._mask is None:
             raise RuntimeError("MaxPool2D.backward called before forward.")
 
@@ -115,7 +118,7 @@ class AvgPool2D(Layer):
         self._x_shape = x.shape
         return out
 
-    def backward(self, grad_out: np.ndarray) -> np.ndarray:
+    def backward(self, grad_out: np.ndarray, need_input_grad: bool = True) -> np.ndarray:
         if self._x_shape is None:
             raise RuntimeError("AvgPool2D.backward called before forward.")
 
@@ -134,3 +137,53 @@ class AvgPool2D(Layer):
                 grad_x[:, :, h_start:h_end, w_start:w_end] += grad_slice
 
         return grad_x
+
+
+class AdaptiveAvgPool2D(Layer):
+    def __init__(self, output_size: Tuple[int, int] | int) -> None:
+        super().__init__()
+        if isinstance(output_size, int):
+            output_size = (output_size, output_size)
+        self.output_size = output_size
+
+        self._x_shape: Tuple[int, int, int, int] | None = None
+
+    @staticmethod
+    def _bins(n_in: int, n_out: int) -> list[Tuple[int, int]]:
+        return [((i * n_in) // n_out, -(-((i + 1) * n_in) // n_out)) for i in range(n_out)]
+
+    def forward(self, x: np.ndarray, training: bool | None = None) -> np.ndarray:
+        if training is not None:
+            self.training = training
+        N, C, H, W = x.shape
+        OH, OW = self.output_size
+        self._x_shape = x.shape
+
+        if H % OH == 0 and W % OW == 0:
+            # evenly divisible: plain reshape + mean
+            return x.reshape(N, C, OH, H // OH, OW, W // OW).mean(axis=(3, 5))
+
+        out = np.zeros((N, C, OH, OW), dtype=x.dtype)
+        for i, (h0, h1) in enumerate(self._bins(H, OH)):
+            for j, (w0, w1) in enumerate(self._bins(W, OW)):
+                out[:, :, i, j] = np.mean(x[:, :, h0:h1, w0:w1], axis=(2, 3))
+        return out
+
+    def backward(self, grad_out: np.ndarray, need_input_grad: bool = True) -> np.ndarray:
+        if self._x_shape is None:
+            raise RuntimeError("AdaptiveAvgPool2D.backward called before forward.")
+
+        N, C, H, W = self._x_shape
+        OH, OW = self.output_size
+
+        if H % OH == 0 and W % OW == 0:
+            kh, kw = H // OH, W // OW
+            grad = np.broadcast_to(grad_out[:, :, :, None, :, None] / (kh * kw), (N, C, OH, kh, OW, kw))
+            return grad.reshape(N, C, H, W).astype(grad_out.dtype, copy=True)
+
+        grad_x = np.zeros((N, C, H, W), dtype=grad_out.dtype)
+        for i, (h0, h1) in enumerate(self._bins(H, OH)):
+            for j, (w0, w1) in enumerate(self._bins(W, OW)):
+                area = (h1 - h0) * (w1 - w0)
+                grad_x[:, :, h0:h1, w0:w1] += grad_out[:, :, i, j][:, :, None, None] / area
+        return grad_x
@@ -0,0 +1,118 @@
+"""
+src/models/checkpoint.py
+Checkpoint format: named arrays in one flat file, mapped with zero copy.
+
+Layout: an 8-byte magic, a little-endian uint64 header length, a JSON header
+({"arrays": {name: [offset, shape, dtype]}, "meta": {...}}) and the raw array
+bytes, each array starting on a 64-byte boundary (cache line / SIMD aligned).
+Files are written to a temporary name, fsynced and renamed, so a reader never
+sees a partial checkpoint.
+
+load_checkpoint() maps the file once with np.memmap(mode="r") and returns
+read-only views: nothing is read until an array is touched, `names` restricts
+loading to a subset, and every process mapping the same file shares one
+physical copy through the page cache. With Sequential.bind_params or
+load_params the model computes directly on those pages. mmap=False reads the
+requested arrays into owned, writable arrays instead (e.g. to resume
+training). Legacy .npz files are still accepted by load_checkpoint (copied).
+"""
+
+from __future__ import annotations
+import json
+import os
+import struct
+from typing import Any, Dict, Iterable, Tuple
+import numpy as np
+
+from ..layers.base import ParamDict
+
+MAGIC = b"NPFLAT01"
+ALIGN = 64
+
+
+def _align(pos: int) -> int:
+    return (pos + ALIGN - 1) // ALIGN * ALIGN
+
+
+def save_checkpoint(path: str, arrays: ParamDict, meta: Dict[str, Any] | None = None) -> str:
+    """Write `arrays` (and JSON-serializable `meta`) to `path` atomically. Returns path."""
+    arrays = {k: np.ascontiguousarray(v) for k, v in arrays.items()}
+    # offsets depend on the header size, which depends on the offsets: lay out
+    # the data after a header size estimate and grow it until the header fits
+    reserve = 4096
+    while True:
+        entries = {}
+        pos = reserve
+        for k, v in arrays.items():
+            entries[k] = [pos, list(v.shape), v.dtype.str]
+            pos = _align(pos + v.nbytes)
+        header = json.dumps({"arrays": entries, "meta": meta or {}}).encode()
+        if len(MAGIC) + 8 + len(header) <= reserve:
+            break
+        reserve = _align(len(MAGIC) + 8 + len(header))
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        for k, v in arrays.items():
+            f.seek(entries[k][0])
+            f.write(v.reshape(-1).view(np.uint8))
+        f.truncate(max(pos, reserve))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def is_checkpoint(path: str) -> bool:
+    """True if `path` is in the checkpoint format (not e.g. a legacy .npz)."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    """The JSON header: {"arrays": {name: [offset, shape, dtype]}, "meta": {...}}."""
+    with open(path, "rb") as f:
+        head = f.read(len(MAGIC) + 8)
+        if head[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a checkpoint file")
+        (n,) = struct.unpack("<Q", head[len(MAGIC):])
+        return json.loads(f.read(n))
+
+
+def load_checkpoint(
+    path: str, names: Iterable[str] | None = None, mmap: bool = True
+) -> Tuple[ParamDict, Dict[str, Any]]:
+    """
+    Load `path` (all arrays, or only `names`). Returns ({name: array}, meta).
+    mmap=True: read-only views of one shared mapping, paged in on first use.
+    mmap=False: owned, writable copies of just the requested arrays.
+    """
+    names = None if names is None else list(names)
+    if not is_checkpoint(path):
+        with np.load(path, allow_pickle=False) as data:
+            keys = data.files if names is None else names
+            return {k: data[k] for k in keys}, {}
+
+    header = read_header(path)
+    entries = header["arrays"]
+    if names is not None:
+        missing = [k for k in names if k not in entries]
+        if missing:
+            raise KeyError(f"Arrays {missing} not found in checkpoint {path}")
+        entries = {k: entries[k] for k in names}
+
+    arrays: ParamDict = {}
+    if mmap:
+        buf = np.memmap(path, dtype=np.uint8, mode="r")
+        for k, (offset, shape, dtype) in entries.items():
+            arrays[k] = np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=buf, offset=int(offset))
+    else:
+        with open(path, "rb") as f:
+            for k, (offset, shape, dtype) in entries.items():
+                arr = np.empty(tuple(shape), dtype=np.dtype(dtype))
+                f.seek(int(offset))
+                f.readinto(arr.reshape(-1).view(np.uint8))
+                arrays[k] = arr
+    return arrays, header["meta"]
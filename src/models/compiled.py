@@ -0,0 +1,387 @@
+"""
+src/models/compiled.py
+Ahead-of-time compiled inference for eval-mode Sequential models.
+
+compile_model() walks the layers once and turns them into a flat list of
+fused kernels with fixed shapes:
+- Conv2D [+ BatchNorm2D] [+ ReLU]: BN folded into the conv weights and bias,
+  im2col + one GEMM + bias + in-place ReLU;
+- MaxPool2D / AvgPool2D: vectorized, one strided max/add per window offset
+  instead of a Python loop over output pixels;
+- Dense [+ ReLU | Softmax]: one GEMM with the activation applied in place;
+- Dropout is dropped, standalone BatchNorm2D becomes a per-channel affine.
+
+Activations are kept in NHWC internally, so a conv's GEMM output is already
+the next layer's input and no transposes are needed between layers (one at
+the input, one before the first Dense to restore the (C, H, W) flatten
+order). All buffers, including im2col columns and zero-padded inputs, are
+allocated at compile time for each batch size in `batch_sizes`, and a call
+only copies the input in and the output out.
+
+Weights that need no transformation (Dense with the compile dtype) are used
+as they are, so memory-mapped weights stay shared. A CompiledModel reuses
+its buffers: one call at a time per instance (like the layers themselves).
+"""
+
+from __future__ import annotations
+from typing import Callable, Dict, List, Sequence, Tuple
+import numpy as np
+
+from ..layers.base import Layer
+from ..layers.conv2d import Conv2D
+from ..layers.batchnorm import BatchNorm2D
+from ..layers.dense import Dense
+from ..layers.dropout import Dropout
+from ..layers.activations import LeakyReLU, ReLU, Softmax, Tanh
+from ..layers.pooling import AdaptiveAvgPool2D, AvgPool2D, MaxPool2D
+from .sequential import Sequential
+
+
+Run = Callable[[], None]
+
+
+def _apply_activation(x: np.ndarray, act: str | None, slope: float = 0.0) -> None:
+    """In-place activation on a 2D (rows, features) view."""
+    if act == "relu":
+        np.maximum(x, 0, out=x)
+    elif act == "leaky_relu":
+        np.maximum(x, x * slope, out=x)
+    elif act == "tanh":
+        np.tanh(x, out=x)
+    elif act == "softmax":
+        x -= x.max(axis=1, keepdims=True)
+        np.exp(x, out=x)
+        x /= x.sum(axis=1, keepdims=True)
+
+
+class _Kernel:
+    """A fused op with fixed shapes; bind() allocates its buffers for one batch size."""
+
+    act: str | None = None
+    slope: float = 0.0
+
+    def out_shape(self, in_shape: Tuple[int, ...]) -> Tuple[int, ...]:
+        raise NotImplementedError
+
+    def bind(self, x: np.ndarray) -> Tuple[Run, np.ndarray]:
+        raise NotImplementedError
+
+
+class _Conv(_Kernel):
+    def __init__(self, conv: Conv2D, bn: BatchNorm2D | None, dtype: np.dtype) -> None:
+        W = conv.W.astype(np.float64)
+        b = conv.b.astype(np.float64) if conv.use_bias and conv.b is not None else np.zeros(conv.out_channels)
+        if bn is not None:
+            scale = bn.gamma / np.sqrt(bn.running_var.astype(np.float64) + bn.eps)
+            W = W * scale[:, None, None, None]
+            b = (b - bn.running_mean) * scale + bn.beta
+        # (C_out, C_in, KH, KW) -> (KH * KW * C_in, C_out), matching NHWC im2col columns
+        self.W = np.ascontiguousarray(W.transpose(2, 3, 1, 0).reshape(-1, conv.out_channels), dtype=dtype)
+        self.b = b.astype(dtype)
+        self.kernel_size = conv.kernel_size
+        self.stride = conv.stride
+        self.pad = conv.padding
+        self.c_out = conv.out_channels
+
+    def out_shape(self, in_shape):
+        H, W, _ = in_shape
+        (KH, KW), S, P = self.kernel_size, self.stride, self.pad
+        return ((H + 2 * P - KH) // S + 1, (W + 2 * P - KW) // S + 1, self.c_out)
+
+    def bind(self, x):
+        N, H, W, C = x.shape
+        (KH, KW), S, P = self.kernel_size, self.stride, self.pad
+        Ho, Wo, _ = self.out_shape((H, W, C))
+        out = np.empty((N, Ho, Wo, self.c_out), dtype=x.dtype)
+        out2d = out.reshape(-1, self.c_out)
+        steps: List[Run] = []
+
+        if P > 0:
+            # borders are zeroed once; each call only rewrites the interior
+            src = np.zeros((N, H + 2 * P, W + 2 * P, C), dtype=x.dtype)
+            interior = src[:, P:P + H, P:P + W, :]
+            steps.append(lambda: np.copyto(interior, x))
+        else:
+            src = x
+
+        if (KH, KW, S) == (1, 1, 1):
+            cols2d = src.reshape(-1, C)
+        else:
+            cols = np.empty((N, Ho, Wo, KH, KW, C), dtype=x.dtype)
+            cols2d = cols.reshape(N * Ho * Wo, -1)
+            windows = [(cols[:, :, :, i, j, :], src[:, i:i + S * Ho:S, j:j + S * Wo:S, :])
+                       for i in range(KH) for j in range(KW)]
+
+            def im2col() -> None:
+                for dst, view in windows:
+                    np.copyto(dst, view)
+            steps.append(im2col)
+
+        W_mat, b, act, slope = self.W, self.b, self.act, self.slope
+
+        def gemm() -> None:
+            np.matmul(cols2d, W_mat, out=out2d)
+            np.add(out2d, b, out=out2d)
+            _apply_activation(out2d, act, slope)
+        steps.append(gemm)
+        return _chain(steps), out
+
+
+class _Affine(_Kernel):
+    """Standalone eval-mode BatchNorm2D: y = x * scale + shift per channel."""
+
+    def __init__(self, bn: BatchNorm2D, dtype: np.dtype) -> None:
+        scale = bn.gamma / np.sqrt(bn.running_var.astype(np.float64) + bn.eps)
+        self.scale = scale.astype(dtype)
+        self.shift = (bn.beta - bn.running_mean * scale).astype(dtype)
+
+    def out_shape(self, in_shape):
+        return in_shape
+
+    def bind(self, x):
+        x2d = x.reshape(-1, x.shape[-1])
+        scale, shift, act, slope = self.scale, self.shift, self.act, self.slope
+
+        def run() -> None:
+            np.multiply(x2d, scale, out=x2d)
+            np.add(x2d, shift, out=x2d)
+            _apply_activation(x2d, act, slope)
+        return run, x
+
+
+class _Activation(_Kernel):
+    def __init__(self, act: str, slope: float = 0.0) -> None:
+        self.act = act
+        self.slope = slope
+
+    def out_shape(self, in_shape):
+        return in_shape
+
+    def bind(self, x):
+        x2d = x.reshape(x.shape[0], -1) if self.act != "softmax" else x
+        act, slope = self.act, self.slope
+        return (lambda: _apply_activation(x2d, act, slope)), x
+
+
+class _Pool(_Kernel):
+    def __init__(self, kernel_size: Tuple[int, int], stride: int, mode: str) -> None:
+        self.kernel_size = kernel_size
+        self.stride = stride
+        self.mode = mode
+
+    def out_shape(self, in_shape):
+        H, W, C = in_shape
+        (KH, KW), S = self.kernel_size, self.stride
+        return ((H - KH) // S + 1, (W - KW) // S + 1, C)
+
+    def bind(self, x):
+        N, H, W, C = x.shape
+        (KH, KW), S = self.kernel_size, self.stride
+        Ho, Wo, _ = self.out_shape((H, W, C))
+        out = np.empty((N, Ho, Wo, C), dtype=x.dtype)
+        views = [x[:, i:i + S * Ho:S, j:j + S * Wo:S, :] for i in range(KH) for j in range(KW)]
+        combine = np.maximum if self.mode == "max" else np.add
+        inv_area = 1.0 / (KH * KW)
+        mode = self.mode
+
+        def run() -> None:
+            np.copyto(out, views[0])
+            for v in views[1:]:
+                combine(out, v, out=out)
+            if mode == "avg":
+                np.multiply(out, inv_area, out=out)
+        return run, out
+
+
+class _AdaptiveAvg(_Kernel):
+    def __init__(self, output_size: Tuple[int, int]) -> None:
+        self.output_size = output_size
+
+    def out_shape(self, in_shape):
+        return tuple(self.output_size) + (in_shape[2],)
+
+    def bind(self, x):
+        N, H, W, C = x.shape
+        OH, OW = self.output_size
+        if (H, W) == (OH, OW):
+            return (lambda: None), x
+        out = np.empty((N, OH, OW, C), dtype=x.dtype)
+        if H % OH == 0 and W % OW == 0:
+            blocks = x.reshape(N, OH, H // OH, OW, W // OW, C)
+            return (lambda: np.mean(blocks, axis=(2, 4), out=out)), out
+        bins_h = AdaptiveAvgPool2D._bins(H, OH)
+        bins_w = AdaptiveAvgPool2D._bins(W, OW)
+        cells = [(out[:, i, j, :], x[:, h0:h1, w0:w1, :])
+                 for i, (h0, h1) in enumerate(bins_h) for j, (w0, w1) in enumerate(bins_w)]
+
+        def run() -> None:
+            for dst, region in cells:
+                np.mean(region, axis=(1, 2), out=dst)
+        return run, out
+
+
+class _Dense(_Kernel):
+    def __init__(self, dense: Dense, dtype: np.dtype) -> None:
+        # W.T is a free view; only a dtype change copies (mmapped weights stay shared)
+        self.W = dense.W if dense.W.dtype == dtype else dense.W.astype(dtype)
+        b = dense.b if dense.use_bias and dense.b is not None else np.zeros(dense.W.shape[0])
+        self.b = b.astype(dtype)
+
+    def out_shape(self, in_shape):
+        if int(np.prod(in_shape)) != self.W.shape[1]:
+            raise ValueError(f"Dense expects {self.W.shape[1]} features, got {in_shape}")
+        return (self.W.shape[0],)
+
+    def bind(self, x):
+        N = x.shape[0]
+        steps: List[Run] = []
+        if x.ndim == 4:
+            # NHWC -> flattened (C, H, W) order expected by the weights
+            flat = np.empty((N, int(np.prod(x.shape[1:]))), dtype=x.dtype)
+            nchw = flat.reshape(N, x.shape[3], x.shape[1], x.shape[2])
+            src = x.transpose(0, 3, 1, 2)
+            steps.append(lambda: np.copyto(nchw, src))
+        else:
+            flat = x
+        out = np.empty((N, self.W.shape[0]), dtype=x.dtype)
+        Wt, b, act, slope = self.W.T, self.b, self.act, self.slope
+
+        def gemm() -> None:
+            np.matmul(flat, Wt, out=out)
+            np.add(out, b, out=out)
+            _apply_activation(out, act, slope)
+        steps.append(gemm)
+        return _chain(steps), out
+
+
+def _chain(steps: List[Run]) -> Run:
+    if len(steps) == 1:
+        return steps[0]
+
+    def run() -> None:
+        for step in steps:
+            step()
+    return run
+
+
+def _activation_of(layer: Layer) -> Tuple[str, float] | None:
+    if isinstance(layer, ReLU):
+        return "relu", 0.0
+    if isinstance(layer, LeakyReLU):
+        return "leaky_relu", layer.negative_slope
+    if isinstance(layer, Tanh):
+        return "tanh", 0.0
+    if isinstance(layer, Softmax) and layer.axis in (-1, 1):
+        return "softmax", 0.0
+    return None
+
+
+def _fuse(layers: Sequence[Layer], dtype: np.dtype) -> List[_Kernel]:
+    """Group layers into kernels: Conv[+BN][+act], BN[+act], Dense[+act], pools."""
+    layers = [l for l in layers if not isinstance(l, Dropout)]  # identity in eval mode
+    kernels: List[_Kernel] = []
+    i = 0
+    while i < len(layers):
+        layer = layers[i]
+        nxt = layers[i + 1] if i + 1 < len(layers) else None
+        if isinstance(layer, Conv2D):
+            bn = nxt if isinstance(nxt, BatchNorm2D) else None
+            kernel: _Kernel = _Conv(layer, bn, dtype)
+            i += 2 if bn is not None else 1
+        elif isinstance(layer, BatchNorm2D):
+            kernel, i = _Affine(layer, dtype), i + 1
+        elif isinstance(layer, Dense):
+            kernel, i = _Dense(layer, dtype), i + 1
+        elif isinstance(layer, MaxPool2D):
+            kernel, i = _Pool(layer.kernel_size, layer.stride, "max"), i + 1
+        elif isinstance(layer, AvgPool2D):
+            kernel, i = _Pool(layer.kernel_size, layer.stride, "avg"), i + 1
+        elif isinstance(layer, AdaptiveAvgPool2D):
+            kernel, i = _AdaptiveAvg(layer.output_size), i + 1
+        elif _activation_of(layer) is not None:
+            kernel, i = _Activation(*_activation_of(layer)), i + 1
+        else:
+            raise ValueError(f"Cannot compile layer {layer.__class__.__name__}")
+
+        # fold a following activation into conv / affine / dense kernels
+        if isinstance(kernel, (_Conv, _Affine, _Dense)) and i < len(layers):
+            act = _activation_of(layers[i])
+            if act is not None and (act[0] != "softmax" or isinstance(kernel, _Dense)):
+                kernel.act, kernel.slope = act
+                i += 1
+        kernels.append(kernel)
+    return kernels
+
+
+class CompiledModel:
+    """
+    Fused, preallocated inference plan for a Sequential (see module docstring).
+    Call with an (N, C, H, W) batch; any N works, inputs are split into the
+    compiled batch sizes (the last chunk padded up to the nearest one).
+    """
+
+    def __init__(self, kernels: List[_Kernel], input_shape: Tuple[int, int, int],
+                 batch_sizes: Sequence[int], dtype: np.dtype) -> None:
+        self.kernels = kernels
+        self.input_shape = tuple(input_shape)
+        self.dtype = np.dtype(dtype)
+        self.batch_sizes = sorted({int(n) for n in batch_sizes})
+        assert self.batch_sizes and self.batch_sizes[0] > 0, "batch_sizes must be positive"
+        self._plans: Dict[int, Tuple[np.ndarray, Run, np.ndarray]] = {n: self._plan(n) for n in self.batch_sizes}
+
+    def _plan(self, n: int) -> Tuple[np.ndarray, Run, np.ndarray]:
+        C, H, W = self.input_shape
+        x_in = np.zeros((n, H, W, C), dtype=self.dtype)  # padding rows stay finite
+        x = x_in
+        steps: List[Run] = []
+        for kernel in self.kernels:
+            run, x = kernel.bind(x)
+            steps.append(run)
+        return x_in, _chain(steps), x
+
+    def _run(self, x: np.ndarray) -> np.ndarray:
+        n = x.shape[0]
+        size = next((s for s in self.batch_sizes if s >= n), self.batch_sizes[-1])
+        x_in, run, out = self._plans[size]
+        np.copyto(x_in[:n], x.transpose(0, 2, 3, 1), casting="unsafe")
+        run()
+        out = out[:n]
+        return (out.transpose(0, 3, 1, 2) if out.ndim == 4 else out).copy()
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x)
+        if x.shape[1:] != self.input_shape:
+            raise ValueError(f"Expected input (N, {', '.join(map(str, self.input_shape))}), got {x.shape}")
+        largest = self.batch_sizes[-1]
+        if x.shape[0] <= largest:
+            return self._run(x)
+        return np.concatenate([self._run(x[s:s + largest]) for s in range(0, x.shape[0], largest)])
+
+    # Sequential-compatible inference API (e.g. for train.loop.evaluate)
+    def forward(self, x: np.ndarray, training: bool | None = None) -> np.ndarray:
+        if training:
+            raise RuntimeError("CompiledModel is inference-only.")
+        return self(x)
+
+    def eval(self) -> None:
+        pass
+
+
+def compile_model(
+    model: Sequential,
+    input_shape: Tuple[int, int, int],
+    batch_sizes: Sequence[int] = (1,),
+    dtype: np.dtype | None = None,
+) -> CompiledModel:
+    """
+    Compile `model` (its current eval-mode weights) for (C, H, W) inputs.
+    dtype defaults to the first parameter's dtype. Later weight updates are
+    not seen by the compiled model except for Dense weights used in place.
+    """
+    if dtype is None:
+        dtype = next(iter(model.params().values())).dtype
+    kernels = _fuse(model.layers, np.dtype(dtype))
+    shape: Tuple[int, ...] = (input_shape[1], input_shape[2], input_shape[0])
+    for kernel in kernels:
+        shape = kernel.out_shape(shape)  # validates shapes at compile time
+    return CompiledModel(kernels, input_shape, batch_sizes, np.dtype(dtype))
@@ -1,12 +1,16 @@
 """
 src/models/sequential.py
 Lightweight sequential container to stack Layer instances.
+
+Frozen layers (requires_grad=False, see freeze()) are excluded from
+trainable_params()/trainable_grads(), and backward stops after the lowest
+layer that still has trainable params: nothing below it needs a gradient.
 """
 
 from __future__ import annotations
 import numpy as np
-from typing import List, Dict
-from ..layers.base import Layer, ParamDict
+from typing import Callable, List, Dict, Mapping
+from ..layers.base import Layer, ParamDict, ParamSpec
 
 
 class Sequential(Layer):
@@ -15,6 +19,11 @@ class Sequential(Layer):
         if not layers:
             raise ValueError("Sequential requires at least one layer.")
         self.layers = layers
+        self._backward_hooks: List[Callable[[int, Layer], None]] = []
+
+    def register_backward_hook(self, fn: Callable[[int, Layer], None]) -> None:
+        """Call fn(index, layer) right after each layer's backward (its grads are ready)."""
+        self._backward_hooks.append(fn)
 
     def train(self) -> None:
         self.training = True
@@ -37,11 +46,48 @@ class Sequential(Layer):
             out = l.forward(out)
         return out
 
-    def backward(self, grad_out: np.ndarray) -> np.ndarray:
+    def freeze(self, stop: int | None = None) -> None:
+        """Freeze all layers, or only layers[:stop] (e.g. a pretrained backbone)."""
+        for l in self.layers[:stop]:
+            l.freeze()
+
+    def unfreeze(self) -> None:
+        for l in self.layers:
+            l.unfreeze()
+
+    def _first_trainable(self) -> int | None:
+        for i, l in enumerate(self.layers):
+            if l.requires_grad and l.params():
+                return i
+        return None
+
+    def backward(self, grad_out: np.ndarray, need_input_grad: bool = True) -> np.ndarray | None:
+        """
+        Backpropagate through the layers. With frozen layers at the bottom,
+        stops after the lowest trainable layer and returns None (no input
+        gradient); otherwise returns the gradient wrt the input.
+        need_input_grad=False (training, where the input is data) also lets
+        the lowest layer run skip its own input-gradient work; returns None.
+        """
+        if all(l.requires_grad for l in self.layers):
+            stop = 0
+        else:
+            first = self._first_trainable()
+            stop = len(self.layers) if first is None else first
+        want_dx = need_input_grad and stop == 0
         grad = grad_out
-        for l in reversed(self.layers):
-            grad = l.backward(grad)
-        return grad
+        for i in reversed(range(stop, len(self.layers))):
+            grad = self.layers[i].backward(grad, need_input_grad=want_dx or i > stop)
+            for fn in self._backward_hooks:
+                fn(i, self.layers[i])
+        return grad if want_dx else None
+
+    def trainable_params(self) -> ParamDict:
+        """params() restricted to layers with requires_grad."""
+        return {k: v for k, v in self.params().items() if self.layers[int(k.split(".", 1)[0])].requires_grad}
+
+    def trainable_grads(self) -> ParamDict:
+        return {k: v for k, v in self.grads().items() if self.layers[int(k.split(".", 1)[0])].requires_grad}
 
     def params(self) -> ParamDict:
         out: ParamDict = {}
@@ -56,3 +102,61 @@ class Sequential(Layer):
             for k, v in l.grads().items():
                 out[f"{i}.{l.__class__.__name__}.{k}"] = v
         return out
+
+    def buffers(self) -> ParamDict:
+        out: ParamDict = {}
+        for i, l in enumerate(self.layers):
+            for k, v in l.buffers().items():
+                out[f"{i}.{l.__class__.__name__}.{k}"] = v
+        return out
+
+    def param_specs(self) -> Dict[str, ParamSpec]:
+        """(shape, dtype) for the keys of params(), without drawing deferred params."""
+        out: Dict[str, ParamSpec] = {}
+        for i, l in enumerate(self.layers):
+            for k, spec in l.param_specs().items():
+                out[f"{i}.{l.__class__.__name__}.{k}"] = spec
+        return out
+
+    def _layer_spec(self, key: str) -> tuple:
+        i, cls_name, name = key.split(".", 2)
+        layer = self.layers[int(i)]
+        specs = {**layer.param_specs(), **{k: (v.shape, v.dtype) for k, v in layer.buffers().items()}}
+        if layer.__class__.__name__ != cls_name or name not in specs:
+            raise KeyError(f"Parameter {key} does not match layer {i} ({layer.__class__.__name__}).")
+        return layer, name, specs[name]
+
+    def bind_params(self, arrays: ParamDict) -> None:
+        """
+        Rebind parameters to externally owned arrays (shared memory, memmaps).
+        Keys follow params() or buffers(); current values are not copied, the
+        caller fills the arrays. Deferred params bound here are never drawn.
+        """
+        for key, arr in arrays.items():
+            layer, name, (expected, _) = self._layer_spec(key)
+            if arr.shape != expected:
+                raise ValueError(f"Shape mismatch for {key}: {arr.shape} vs {expected}.")
+            layer.set_param(name, arr)
+
+    def load_params(self, arrays: Mapping[str, np.ndarray], strict: bool = True) -> None:
+        """
+        Fill params (and any buffers present) from checkpoint arrays, cast to
+        each layer's dtype. Arrays are taken over, not copied into the current
+        ones, so a model built under deferred_init() never draws its init, and
+        read-only mmap views of a matching dtype are used in place (such a
+        model is for inference only).
+        strict: every params() key must be in `arrays`; other keys are ignored.
+        """
+        if strict:
+            missing = [k for k in self.param_specs() if k not in arrays]
+            if missing:
+                raise KeyError(f"Weight keys {missing} not found in checkpoint.")
+        for key in arrays:
+            try:
+                layer, name, (expected, dtype) = self._layer_spec(key)
+            except (KeyError, ValueError, IndexError):
+                continue
+            arr = np.ascontiguousarray(arrays[key], dtype=dtype)
+            if arr.shape != expected:
+                raise ValueError(f"Shape mismatch for {key}: {arr.shape} vs {expected}.")
+            layer.set_param(name, arr)
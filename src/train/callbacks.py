@@ -8,6 +8,8 @@ import os
 import numpy as np
 from typing import Dict
 
+from ..models.checkpoint import save_checkpoint
+
 
 def EarlyStopping(monitor: str = "val_loss", patience: int = 5, mode: str = "min"):
     best = np.inf if mode == "min" else -np.inf
@@ -35,8 +37,8 @@ def ModelCheckpoint(filepath: str, monitor: str = "val_acc", mode: str = "max"):
     best = -np.inf if mode == "max" else np.inf
 
     def save_weights(model, path: str):
-        params = model.params()
-        np.savez(path, **{k: v for k, v in params.items()})
+        # params and BatchNorm running stats, written atomically
+        save_checkpoint(path, {**model.params(), **model.buffers()})
         print(f"Saved checkpoint to {path}")
 
     def cb(state: Dict):
@@ -0,0 +1,138 @@
+"""
+src/train/feature_cache.py
+Train only the head of a model whose backbone is frozen, on cached features.
+
+With model.freeze(stop=k) the first k layers never change, so their output
+for a given image never changes either. cached_features() runs that frozen
+prefix once over the dataset (eval mode, batched, on a thread pool with one
+model copy per thread) and stores the result as a float32 .npy memmap named
+after a hash of the prefix weights/buffers and of the input data. Any change
+to the backbone or the data gives a new key, so stale features are never
+reused; entries for other keys are left on disk.
+
+train_head() then runs train.loop.train on (features, labels) with a
+Sequential made of the model's own head layers, so the head is updated in
+place and callbacks still see the full model.
+"""
+
+from __future__ import annotations
+import copy
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
+import numpy as np
+
+from ..models.sequential import Sequential
+from ..core.utils import make_batches
+from ..data.cache import to_float
+from .loop import Callback, train
+
+
+def frozen_prefix(model: Sequential) -> int:
+    """Number of leading layers below the lowest trainable one (0: nothing frozen)."""
+    for i, l in enumerate(model.layers):
+        if l.requires_grad and l.params():
+            return i
+    return len(model.layers)
+
+
+def _hash_arrays(h, arrays: Dict[str, np.ndarray]) -> None:
+    for k in sorted(arrays):
+        a = np.ascontiguousarray(arrays[k])
+        h.update(f"{k}:{a.dtype.str}:{a.shape}".encode())
+        h.update(memoryview(a).cast("B"))
+
+
+def feature_key(model: Sequential, stop: int, X, chunk: int = 4096) -> str:
+    """Hash of layers[:stop] (classes, params, buffers) and of the bytes of X."""
+    h = hashlib.blake2b(digest_size=16)
+    for i, l in enumerate(model.layers[:stop]):
+        h.update(f"{i}.{l.__class__.__name__}".encode())
+        _hash_arrays(h, l.params())
+        _hash_arrays(h, l.buffers())
+    h.update(f"{X.dtype}:{tuple(X.shape)}".encode())
+    for start, end in make_batches(X.shape[0], chunk):
+        h.update(memoryview(np.ascontiguousarray(np.asarray(X[start:end]))).cast("B"))
+    return h.hexdigest()
+
+
+def cached_features(
+    model: Sequential,
+    X,
+    cache_dir: str,
+    stop: int | None = None,
+    batch_size: int = 256,
+    workers: int | None = None,
+) -> np.ndarray:
+    """
+    Output of model.layers[:stop] (default: the frozen prefix) for every row
+    of X, as a read-only memmap under cache_dir. Computed only on a miss.
+    """
+    stop = frozen_prefix(model) if stop is None else int(stop)
+    if stop == 0:
+        raise ValueError("Model has no frozen prefix; freeze the backbone first (model.freeze(stop=k)).")
+    path = os.path.join(cache_dir, f"features-{feature_key(model, stop, X)}.npy")
+    if os.path.exists(path):
+        return np.load(path, mmap_mode="r")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    prefix = Sequential(model.layers[:stop])
+    batches = list(make_batches(X.shape[0], batch_size))
+    feat_shape = prefix.forward(to_float(X[0:1]), training=False).shape[1:]
+    tmp = path + ".tmp"
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(X.shape[0],) + feat_shape)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(batches)))
+
+    def run(rank: int, out: np.ndarray) -> None:
+        # layers cache activations, so every thread needs its own copy
+        net = copy.deepcopy(prefix) if workers > 1 else prefix
+        for start, end in batches[rank::workers]:
+            out[start:end] = net.forward(to_float(X[start:end]), training=False)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for f in [pool.submit(run, r, out) for r in range(workers)]:
+            f.result()
+    out.flush()
+    del out  # unmap before the rename
+    os.replace(tmp, path)
+    return np.load(path, mmap_mode="r")
+
+
+def train_head(
+    model: Sequential,
+    optimizer,
+    train_data: Tuple[np.ndarray, np.ndarray],
+    val_data: Tuple[np.ndarray, np.ndarray] | None,
+    cache_dir: str,
+    batch_size: int = 128,
+    callbacks: list[Callback] | None = None,
+    workers: int | None = None,
+    **train_kwargs,
+) -> Dict[str, list[float]]:
+    """
+    train.loop.train for the head of `model` on cached frozen-backbone
+    features (see cached_features). Same arguments and history as train().
+    """
+    stop = frozen_prefix(model)
+    if stop >= len(model.layers):
+        raise ValueError("All layers are frozen; nothing to train.")
+    X_train, y_train = train_data
+    F_train = cached_features(model, X_train, cache_dir, stop, batch_size, workers)
+    F_val = None
+    if val_data is not None:
+        F_val = (cached_features(model, val_data[0], cache_dir, stop, batch_size, workers), val_data[1])
+
+    head = Sequential(model.layers[stop:])  # same layer objects: updates land in `model`
+    if callbacks:
+        # callbacks (e.g. ModelCheckpoint) expect the full model
+        def full_model(cb: Callback) -> Callback:
+            wrapped = lambda state: cb({**state, "model": model})  # noqa: E731
+            wrapped.__dict__.update(getattr(cb, "__dict__", {}))  # keep e.g. EarlyStopping.stopped
+            return wrapped
+        callbacks = [full_model(cb) for cb in callbacks]
+    history = train(head, optimizer, (F_train, y_train), F_val, batch_size=batch_size,
+                    callbacks=callbacks, **train_kwargs)
+    model.train()
+    return history
@@ -0,0 +1,179 @@
+"""
+src/train/hogwild.py
+Asynchronous Hogwild-style SGD across processes.
+
+All workers bind their model replica to one shared parameter block and apply
+SGD updates to it in place, without locks or barriers. Each worker owns a
+fixed strided shard of the training set and reshuffles it every epoch.
+For small models such as lenet_mnist this avoids the per-step
+synchronization that dominates synchronous data parallelism.
+
+The main process only coordinates epochs (learning rate, validation,
+callbacks). Momentum buffers stay private to each worker; BatchNorm running
+statistics are averaged across workers at the end of each epoch.
+"""
+
+from __future__ import annotations
+import multiprocessing as mp
+import time
+from typing import Dict, List, Tuple
+import numpy as np
+
+from ..models.sequential import Sequential
+from ..core.optim import SGD
+from ..core.losses import softmax_cross_entropy, softmax_cross_entropy_backward
+from ..core.utils import make_batches, one_hot
+from ..data.cache import to_float
+from .loop import Callback, evaluate, _init_history, _end_epoch
+from .parallel import measure_throughput
+from .shared import SharedArrays, Spec
+
+
+def _worker(
+    rank: int,
+    world: int,
+    model: Sequential,
+    optimizer: SGD,
+    batch_size: int,
+    num_classes: int,
+    specs: Dict[str, Spec],
+    names: Dict[str, str],
+    seed: int,
+    conn,
+) -> None:
+    data = SharedArrays(specs["data"], name=names["data"])
+    params = SharedArrays(specs["params"], name=names["params"])
+    model.bind_params(params.arrays)
+    shared = model.trainable_params()  # frozen layers are never stepped
+    X, y = data["X"], data["y"]
+    rng = np.random.default_rng([seed, rank])
+    for l in model.layers:
+        if hasattr(l, "rng"):
+            l.rng = np.random.default_rng([seed, rank, 1])
+    own = np.arange(rank, X.shape[0], world)
+    model.train()
+    try:
+        while True:
+            msg = conn.recv()
+            if msg[0] == "stop":
+                break
+            _, lr = msg
+            optimizer.lr = lr
+            order = own[rng.permutation(own.size)]
+            loss_sum, correct = 0.0, 0
+            for start, end in make_batches(order.size, batch_size):
+                idx = order[start:end]
+                xb, yb = to_float(X[idx]), y[idx]
+                logits = model.forward(xb, training=True)
+                y_one = one_hot(yb, num_classes)
+                loss_sum += softmax_cross_entropy(logits, y_one) * idx.size
+                model.backward(softmax_cross_entropy_backward(logits, y_one), need_input_grad=False)
+                optimizer.step(shared, model.trainable_grads())  # lock-free in-place update
+                correct += int(np.sum(np.argmax(logits, axis=1) == yb))
+            buffers = {k: np.array(v) for k, v in model.buffers().items()}
+            conn.send((loss_sum, correct, buffers))
+    finally:
+        model.bind_params({k: v.copy() for k, v in params.arrays.items()})
+        del X, y, shared
+        data.close()
+        params.close()
+
+
+def train_hogwild(
+    model: Sequential,
+    optimizer: SGD,
+    train_data: Tuple[np.ndarray, np.ndarray],
+    val_data: Tuple[np.ndarray, np.ndarray] | None,
+    epochs: int = 10,
+    batch_size: int = 128,
+    num_classes: int = 10,
+    num_workers: int = 2,
+    log_csv_path: str | None = None,
+    callbacks: list[Callback] | None = None,
+    scheduler=None,
+    baseline_steps: int = 10,
+    seed: int = 0,
+) -> Dict[str, list[float]]:
+    """
+    Same contract as train.loop.train. The history additionally records
+    samples_per_sec and speedup over the synchronous single-process loop
+    (measured over `baseline_steps` batches; 0 skips the baseline).
+    """
+    if not isinstance(optimizer, SGD):
+        raise TypeError("Hogwild training requires the SGD optimizer.")
+    assert num_workers >= 1, "num_workers must be >= 1"
+    X_train, y_train = train_data
+    X_val, y_val = val_data if val_data is not None else (None, None)
+    N = X_train.shape[0]
+
+    baseline = 0.0
+    if baseline_steps > 0:
+        baseline = measure_throughput(model, optimizer, X_train, y_train, batch_size,
+                                      num_classes, steps=baseline_steps)
+
+    blocks = {
+        "data": SharedArrays.from_arrays({"X": X_train, "y": y_train}),
+        "params": SharedArrays.from_arrays(model.params()),
+    }
+    model.bind_params(blocks["params"].arrays)
+    specs = {k: b.spec for k, b in blocks.items()}
+    names = {k: b.name for k, b in blocks.items()}
+
+    ctx = mp.get_context()
+    conns, procs = [], []
+    for r in range(num_workers):
+        parent, child = ctx.Pipe()
+        p = ctx.Process(target=_worker, daemon=True,
+                        args=(r, num_workers, model, optimizer, batch_size, num_classes,
+                              specs, names, seed, child))
+        p.start()
+        conns.append(parent)
+        procs.append(p)
+
+    history = _init_history(log_csv_path)
+    history.update({"samples_per_sec": [], "speedup": [], "baseline_samples_per_sec": [baseline]})
+    try:
+        for epoch in range(1, epochs + 1):
+            t0 = time.time()
+            for c in conns:
+                c.send(("epoch", optimizer.lr))
+            total_loss, total_correct = 0.0, 0
+            worker_buffers: List[Dict[str, np.ndarray]] = []
+            for c in conns:
+                loss_sum, correct, buffers = c.recv()
+                total_loss += loss_sum
+                total_correct += correct
+                worker_buffers.append(buffers)
+            for k, v in model.buffers().items():
+                v[...] = np.mean([b[k] for b in worker_buffers], axis=0)
+
+            sps = N / max(time.time() - t0, 1e-12)
+            history["samples_per_sec"].append(sps)
+            history["speedup"].append(sps / baseline if baseline > 0 else float("nan"))
+
+            if X_val is not None:
+                val_loss, val_acc = evaluate(model, X_val, y_val, batch_size, num_classes)
+                model.train()
+            else:
+                val_loss = float("nan")
+                val_acc = float("nan")
+
+            print(f"[{epoch:03d}] hogwild {num_workers} workers: {sps:.1f} samples/s "
+                  f"({history['speedup'][-1]:.2f}x synchronous)")
+            _end_epoch(history, epoch, total_loss / N, total_correct / N, val_loss, val_acc,
+                       model, optimizer, log_csv_path, callbacks, scheduler, t0)
+    finally:
+        for c in conns:
+            try:
+                c.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        for p in procs:
+            p.join(timeout=10)
+            if p.is_alive():
+                p.terminate()
+        model.bind_params({k: v.copy() for k, v in blocks["params"].arrays.items()})
+        for b in blocks.values():
+            b.close()
+
+    return history
@@ -12,123 +12,224 @@ import numpy as np
 from ..models.sequential import Sequential
 from ..core.losses import softmax_cross_entropy, softmax_cross_entropy_backward
 from ..core.metrics import accuracy
-from ..core.utils import make_batches, one_hot
+from ..core.utils import one_hot
+from ..core.tensor import resize_nchw
+from ..data.batching import BatchIterator, BlockShuffleIterator, prefetched
+from ..data.sampler import WeightedSampler
+from .scheduler import ProgressiveResize
 
 
 BatchIter = Iterable[Tuple[np.ndarray, np.ndarray]]
 Callback = Callable[[Dict], None]
 
 
+def evaluate(
+    model: Sequential,
+    X: np.ndarray,
+    y: np.ndarray,
+    batch_size: int = 128,
+    num_classes: int = 10,
+) -> Tuple[float, float]:
+    """
+    Run the model in eval mode over (X, y) and return (loss, accuracy).
+    The model is left in eval mode; callers switch back with model.train().
+    """
+    # BatchIterator also handles uint8 / memory-mapped inputs
+    batches = BatchIterator(X, y, batch_size, shuffle=False, prefetch=1)
+    return evaluate_batches(model, batches, num_classes)
+
+
+def evaluate_batches(model: Sequential, batches: BatchIter, num_classes: int = 10) -> Tuple[float, float]:
+    """Same as evaluate() for any iterable of (xb, yb) batches, e.g. a DataLoader."""
+    model.eval()
+    logits_list = []
+    targets = []
+    for xb, yb in batches:
+        logits_list.append(model.forward(xb, training=False))
+        targets.append(np.array(yb))
+    logits = np.concatenate(logits_list, axis=0)
+    y_true = np.concatenate(targets, axis=0)
+    loss = softmax_cross_entropy(logits, one_hot(y_true, num_classes))
+    return loss, accuracy(logits, y_true)
+
+
+def time_to_accuracy(history: Dict[str, list[float]], target: float, key: str = "val_acc") -> float | None:
+    """Cumulative training seconds until history[key] first reaches target, or None."""
+    for t, acc in zip(history["time"], history[key]):
+        if acc >= target:
+            return t
+    return None
+
+
+def _init_history(log_csv_path: str | None) -> Dict[str, list[float]]:
+    if log_csv_path is not None:
+        with open(log_csv_path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["epoch", "train_loss", "train_acc", "val_loss", "val_acc"])
+    return {"train_loss": [], "train_acc": [], "val_loss": [], "val_acc": [], "time": []}
+
+
+def _end_epoch(
+    history: Dict[str, list[float]],
+    epoch: int,
+    train_loss: float,
+    train_acc: float,
+    val_loss: float,
+    val_acc: float,
+    model: Sequential,
+    optimizer,
+    log_csv_path: str | None,
+    callbacks: list[Callback] | None,
+    scheduler,
+    t0: float,
+) -> None:
+    """Record metrics, write the CSV row, run callbacks and the scheduler, print a summary."""
+    history["train_loss"].append(train_loss)
+    history["train_acc"].append(train_acc)
+    history["val_loss"].append(val_loss)
+    history["val_acc"].append(val_acc)
+    # cumulative wall-clock seconds, for time-to-accuracy comparisons
+    history["time"].append((history["time"][-1] if history["time"] else 0.0) + time.time() - t0)
+
+    if log_csv_path is not None:
+        with open(log_csv_path, "a", newline="") as f:
+            w = csv.writer(f)
+            w.writerow([epoch, train_loss, train_acc, val_loss, val_acc])
+
+    # callbacks
+    if callbacks:
+        state = {
+            "epoch": epoch,
+            "train_loss": train_loss,
+            "train_acc": train_acc,
+            "val_loss": val_loss,
+            "val_acc": val_acc,
+            "model": model,
+            "optimizer": optimizer,
+        }
+        for cb in callbacks:
+            cb(state)
+
+    # scheduler step at end of epoch
+    if scheduler is not None:
+        scheduler.step(epoch)
+
+    dt = time.time() - t0
+    lr_str = f" lr={getattr(optimizer, 'lr', None):.3e}" if hasattr(optimizer, "lr") else ""
+    print(f"[{epoch:03d}] train_loss={train_loss:.4f} acc={train_acc:.4f} "
+          f"val_loss={val_loss:.4f} val_acc={val_acc:.4f}{lr_str} ({dt:.1f}s)")
+
+
 def train(
     model: Sequential,
     optimizer,
-    train_data: Tuple[np.ndarray, np.ndarray],
-    val_data: Tuple[np.ndarray, np.ndarray] | None,
+    train_data: Tuple[np.ndarray, np.ndarray] | BatchIter,
+    val_data: Tuple[np.ndarray, np.ndarray] | BatchIter | None,
     epochs: int = 10,
     batch_size: int = 128,
     num_classes: int = 10,
     log_csv_path: str | None = None,
     callbacks: list[Callback] | None = None,
     scheduler=None,
+    prefetch: int = 2,
+    resize_schedule: ProgressiveResize | None = None,
+    sampler: WeightedSampler | None = None,
+    transform: Callable[[np.ndarray, np.random.Generator], np.ndarray] | None = None,
 ) -> Dict[str, list[float]]:
-    X_train, y_train = train_data
-    X_val, y_val = val_data if val_data is not None else (None, None)
-
-    history = {"train_loss": [], "train_acc": [], "val_loss": [], "val_acc": []}
-    if log_csv_path is not None:
-        with open(log_csv_path, "w", newline="") as f:
-            w = csv.writer(f)
-            w.writerow(["epoch", "train_loss", "train_acc", "val_loss", "val_acc"])
+    """
+    train_data / val_data are either (X, y) arrays, a block dataset with
+    read(start, stop) (out-of-core, see src.data.batching.BlockShuffleIterator)
+    or a re-iterable source of (xb, yb) batches such as
+    src.data.loader.DataLoader, iterated once per epoch (batch_size and
+    prefetch then do not apply).
+
+    resize_schedule (progressive resizing) downscales the training batches of
+    each epoch to resize_schedule.size_at(epoch) on a background thread; the
+    model must be resolution-agnostic (e.g. an AdaptiveAvgPool2D head).
+    Validation always runs at the native resolution. history["time"] holds
+    the cumulative training time, see time_to_accuracy().
+
+    sampler (e.g. class-balanced, see src.data.sampler) replaces the uniform
+    shuffle of (X, y) training arrays; its num_samples sets the epoch length.
+
+    transform(xb, rng) (e.g. dermascan's BatchAugmenter) is applied to each
+    raw training batch before normalization, for (X, y) arrays and block
+    datasets; a DataLoader takes its own transform.
+    """
+    history = _init_history(log_csv_path)
+
+    if isinstance(train_data, tuple):
+        # shuffles indices only; batches are gathered ahead of time on a background thread
+        X_train, y_train = train_data
+        batches = BatchIterator(X_train, y_train, batch_size, shuffle=True, prefetch=prefetch,
+                                sampler=sampler, transform=transform)
+    elif hasattr(train_data, "read"):
+        batches = BlockShuffleIterator(train_data, batch_size, prefetch=prefetch, transform=transform)
+    else:
+        batches = train_data
+    if transform is not None and batches is train_data:
+        raise ValueError("transform needs (X, y) arrays or a block dataset; pass it to the DataLoader instead")
+    if sampler is not None and not isinstance(train_data, tuple):
+        raise ValueError("sampler needs (X, y) training arrays; pass it to the DataLoader instead")
+    if val_data is not None and hasattr(val_data, "read"):
+        val_data = BlockShuffleIterator(val_data, batch_size, shuffle=False, prefetch=1)
+
+    if resize_schedule is not None:
+        history["image_size"] = []
 
     model.train()
-    N = X_train.shape[0]
     for epoch in range(1, epochs + 1):
         t0 = time.time()
         # training
-        perm = np.random.permutation(N)
-        X_train, y_train = X_train[perm], y_train[perm]
-
         total_loss = 0.0
         total_correct = 0
         total_seen = 0
 
-        for start, end in make_batches(N, batch_size):
-            xb = X_train[start:end]
-            yb = y_train[start:end]
+        epoch_batches = batches
+        if resize_schedule is not None:
+            size = resize_schedule.size_at(epoch)
+            history["image_size"].append(size)
+            if size is not None:
+                # resize copies xb; copy yb too since the source may reuse its buffers
+                epoch_batches = prefetched(((resize_nchw(xb, size), np.array(yb)) for xb, yb in batches),
+                                           max(prefetch, 1))
+
+        for xb, yb in epoch_batches:
+            n = yb.shape[0]
             logits = model.forward(xb, training=True)  # (B, C)
             y_one = one_hot(yb, num_classes)
             loss = softmax_cross_entropy(logits, y_one)
             grad_logits = softmax_cross_entropy_backward(logits, y_one)
 
-            # backward
-            grad = grad_logits
-            grad = model.backward(grad)
+            # backward (the input is data: no gradient wrt it)
+            model.backward(grad_logits, need_input_grad=False)
 
-            # params update
-            params = model.params()
-            grads = model.grads()
+            # params update (frozen layers are left out)
+            params = model.trainable_params()
+            grads = model.trainable_grads()
             optimizer.step(params, grads)
 
             # metrics
-            total_loss += loss * (end - start)
+            total_loss += loss * n
             preds = np.argmax(logits, axis=1)
             total_correct += int(np.sum(preds == yb))
-            total_seen += (end - start)
+            total_seen += n
 
         train_loss = total_loss / total_seen
         train_acc = total_correct / total_seen
 
         # validation
-        if X_val is not None:
-            model.eval()
-            val_logits = []
-            val_targets = []
-            for start, end in make_batches(X_val.shape[0], batch_size):
-                xb = X_val[start:end]
-                logits = model.forward(xb, training=False)
-                val_logits.append(logits)
-                val_targets.append(y_val[start:end])
-            val_logits = np.concatenate(val_logits, axis=0)
-            val_targets = np.concatenate(val_targets, axis=0)
-            y_one = one_hot(val_targets, num_classes)
-            val_loss = softmax_cross_entropy(val_logits, y_one)
-            val_acc = accuracy(val_logits, val_targets)
+        if isinstance(val_data, tuple):
+            val_loss, val_acc = evaluate(model, val_data[0], val_data[1], batch_size, num_classes)
+            model.train()
+        elif val_data is not None:
+            val_loss, val_acc = evaluate_batches(model, val_data, num_classes)
             model.train()
         else:
             val_loss = float("nan")
             val_acc = float("nan")
 
-        history["train_loss"].append(train_loss)
-        history["train_acc"].append(train_acc)
-        history["val_loss"].append(val_loss)
-        history["val_acc"].append(val_acc)
-
-        if log_csv_path is not None:
-            with open(log_csv_path, "a", newline="") as f:
-                w = csv.writer(f)
-                w.writerow([epoch, train_loss, train_acc, val_loss, val_acc])
-
-        # callbacks
-        if callbacks:
-            state = {
-                "epoch": epoch,
-                "train_loss": train_loss,
-                "train_acc": train_acc,
-                "val_loss": val_loss,
-                "val_acc": val_acc,
-                "model": model,
-                "optimizer": optimizer,
-            }
-            for cb in callbacks:
-                cb(state)
-
-        # scheduler step at end of epoch
-        if scheduler is not None:
-            scheduler.step(epoch)
-
-        dt = time.time() - t0
-        lr_str = f" lr={getattr(optimizer, 'lr', None):.3e}" if hasattr(optimizer, "lr") else ""
-        print(f"[{epoch:03d}] train_loss={train_loss:.4f} acc={train_acc:.4f} "
-              f"val_loss={val_loss:.4f} val_acc={val_acc:.4f}{lr_str} ({dt:.1f}s)")
+        _end_epoch(history, epoch, train_loss, train_acc, val_loss, val_acc,
+                   model, optimizer, log_csv_path, callbacks, scheduler, t0)
 
     return history
@@ -0,0 +1,319 @@
+"""
+src/train/parallel.py
+Synchronous data-parallel training on one host with worker processes.
+
+Each worker holds a replica of the model whose parameters are bound to one
+shared memory block, so the optimizer update done by the main process is
+visible to every replica without copies. Per step:
+
+1. the main process sends (start, end) of the next batch in the shared
+   permutation to every worker;
+2. worker r runs forward/backward on its shard of the batch, with the loss
+   gradient scaled by its share of the batch, and writes its gradients
+   into its own slot of a shared buffer;
+3. after a barrier, every worker sums a disjoint subset of the parameters
+   across all slots into the shared gradient block;
+4. the main process runs one optimizer step on the reduced gradients.
+
+BatchNorm is synchronized (SyncBN): at each BatchNorm2D forward the replicas
+share their per-channel (count, sum, sum of squares) through shared memory
+slots and a barrier, and all normalize with the full-batch mean/var; the
+backward shares the per-channel sums of dy and dy * x_hat the same way. The
+outputs and gradients are those of a single process on the whole batch,
+whatever the number of workers, and the main model's running statistics
+are updated from the same full-batch moments. Every shard must therefore be
+non-empty: batch_size >= num_workers, and a last batch smaller than
+num_workers is merged into the previous one.
+
+Set OMP_NUM_THREADS / OPENBLAS_NUM_THREADS so that workers * BLAS threads
+does not exceed the number of cores.
+"""
+
+from __future__ import annotations
+import copy
+import multiprocessing as mp
+import time
+from typing import Dict, List, Tuple
+import numpy as np
+
+from ..models.sequential import Sequential
+from ..layers.batchnorm import BatchNorm2D
+from ..core.losses import softmax_cross_entropy, softmax_cross_entropy_backward
+from ..core.utils import make_batches, one_hot
+from ..data.cache import to_float
+from .loop import Callback, evaluate, _init_history, _end_epoch
+from .shared import SharedArrays, Spec, spec_of
+
+
+def _shard_bounds(n: int, world: int) -> np.ndarray:
+    """Boundaries of `world` near-equal contiguous shards of n items."""
+    return (np.arange(world + 1) * n) // world
+
+
+def _partition_keys(spec: Spec, world: int) -> List[List[str]]:
+    """Greedy size-balanced assignment of parameter names to reducing workers."""
+    sizes = {k: int(np.prod(shape, dtype=np.int64)) for k, (shape, _) in spec.items()}
+    parts: List[List[str]] = [[] for _ in range(world)]
+    load = [0] * world
+    for k in sorted(sizes, key=sizes.get, reverse=True):
+        r = int(np.argmin(load))
+        parts[r].append(k)
+        load[r] += sizes[k]
+    return parts
+
+
+def _bn_layers(model: Sequential) -> List[Tuple[int, BatchNorm2D]]:
+    return [(i, l) for i, l in enumerate(model.layers) if isinstance(l, BatchNorm2D)]
+
+
+def _batches(n: int, batch_size: int, world: int) -> List[Tuple[int, int]]:
+    """make_batches, with a last batch smaller than `world` merged into the previous one."""
+    batches = list(make_batches(n, batch_size))
+    if len(batches) > 1 and batches[-1][1] - batches[-1][0] < world:
+        batches[-2:] = [(batches[-2][0], n)]
+    return batches
+
+
+def _slot_spec(grad_spec: Spec, bn: List[Tuple[int, BatchNorm2D]], world: int) -> Spec:
+    spec: Spec = {}
+    for r in range(world):
+        for k, (shape, _) in grad_spec.items():
+            spec[f"{r}/{k}"] = (shape, "<f8")
+        for i, l in bn:
+            spec[f"{r}/{i}.forward"] = ((2 * l.C + 1,), "<f8")   # count, sum, sum of squares
+            spec[f"{r}/{i}.backward"] = ((2 * l.C,), "<f8")      # sum of dy, sum of dy * x_hat
+    return spec
+
+
+def _full_batch_moments(slots: SharedArrays, i: int, C: int, world: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-channel mean/var of the whole batch from the replicas' forward slots of BN layer i."""
+    total = sum(slots[f"{r}/{i}.forward"] for r in range(world))
+    mean = total[1:C + 1] / total[0]
+    return mean, np.maximum(total[C + 1:] / total[0] - mean * mean, 0.0)
+
+
+def _sync_hook(slots: SharedArrays, i: int, rank: int, world: int, barrier):
+    """BatchNorm2D.sync for layer i: publish this replica's sums, wait, add up every replica's."""
+    def sync(kind: str, local: np.ndarray) -> np.ndarray:
+        slots[f"{rank}/{i}.{kind}"][...] = local
+        barrier.wait()
+        # same order on every rank: bit-identical statistics on all replicas
+        total = np.zeros(local.shape, dtype=np.float64)
+        for r in range(world):
+            total += slots[f"{r}/{i}.{kind}"]
+        return total
+    return sync
+
+
+def _worker(
+    rank: int,
+    world: int,
+    model: Sequential,
+    num_classes: int,
+    specs: Dict[str, Spec],
+    names: Dict[str, str],
+    owned: List[str],
+    conn,
+    barrier,
+) -> None:
+    blocks = {k: SharedArrays(specs[k], name=names[k]) for k in names}
+    data, params, slots, grads = blocks["data"], blocks["params"], blocks["slots"], blocks["grads"]
+    model.bind_params(params.arrays)
+    for i, l in _bn_layers(model):
+        l.sync = _sync_hook(slots, i, rank, world, barrier)
+    # decorrelate dropout masks across replicas
+    for l in model.layers:
+        if hasattr(l, "rng"):
+            l.rng = np.random.default_rng([rank, int(np.random.randint(2**31))])
+    X, y, perm = data["X"], data["y"], data["perm"]
+    model.train()
+    try:
+        while True:
+            msg = conn.recv()
+            if msg[0] == "stop":
+                break
+            _, start, end = msg
+            bounds = _shard_bounds(end - start, world)
+            weights = np.diff(bounds) / float(end - start)
+            idx = perm[start + bounds[rank]:start + bounds[rank + 1]]
+
+            # shards are never empty (see _batches): every replica takes part
+            # in each BatchNorm sync
+            xb, yb = to_float(X[idx]), y[idx]
+            logits = model.forward(xb, training=True)
+            y_one = one_hot(yb, num_classes)
+            loss_sum = softmax_cross_entropy(logits, y_one) * idx.size
+            # this shard's part of the gradient of the full-batch mean loss
+            grad_logits = softmax_cross_entropy_backward(logits, y_one) * weights[rank]
+            model.backward(grad_logits, need_input_grad=False)
+            for k, g in model.grads().items():
+                slots[f"{rank}/{k}"][...] = g
+            correct = int(np.sum(np.argmax(logits, axis=1) == yb))
+            barrier.wait()
+
+            # reduce the parameters this rank owns: sum of the shards' parts
+            for k in owned:
+                acc = grads[k]
+                acc[...] = 0
+                for r in range(world):
+                    acc += slots[f"{r}/{k}"]
+                del acc
+            conn.send((loss_sum, correct))
+    finally:
+        model.bind_params({k: v.copy() for k, v in params.arrays.items()})
+        del X, y, perm
+        for b in blocks.values():
+            b.close()
+
+
+def measure_throughput(
+    model: Sequential,
+    optimizer,
+    X: np.ndarray,
+    y: np.ndarray,
+    batch_size: int = 128,
+    num_classes: int = 10,
+    steps: int = 10,
+) -> float:
+    """
+    Single-process training throughput (samples/s) of a copy of model/optimizer,
+    measured over `steps` batches. The originals are left untouched.
+    """
+    model = copy.deepcopy(model)
+    optimizer = copy.deepcopy(optimizer)
+    model.train()
+    n = min(X.shape[0], steps * batch_size)
+    t0 = time.perf_counter()
+    for start, end in make_batches(n, batch_size):
+        logits = model.forward(to_float(X[start:end]), training=True)
+        y_one = one_hot(y[start:end], num_classes)
+        model.backward(softmax_cross_entropy_backward(logits, y_one), need_input_grad=False)
+        optimizer.step(model.trainable_params(), model.trainable_grads())
+    return n / max(time.perf_counter() - t0, 1e-12)
+
+
+def train_data_parallel(
+    model: Sequential,
+    optimizer,
+    train_data: Tuple[np.ndarray, np.ndarray],
+    val_data: Tuple[np.ndarray, np.ndarray] | None,
+    epochs: int = 10,
+    batch_size: int = 128,
+    num_classes: int = 10,
+    num_workers: int = 2,
+    log_csv_path: str | None = None,
+    callbacks: list[Callback] | None = None,
+    scheduler=None,
+    baseline_steps: int = 10,
+) -> Dict[str, list[float]]:
+    """
+    Same contract as train.loop.train, with each batch split across
+    `num_workers` processes. The history additionally records
+    samples_per_sec and scaling_efficiency (throughput divided by
+    num_workers times the single-process throughput measured over
+    `baseline_steps` batches; 0 skips the baseline).
+    """
+    assert num_workers >= 1, "num_workers must be >= 1"
+    X_train, y_train = train_data
+    X_val, y_val = val_data if val_data is not None else (None, None)
+    N = X_train.shape[0]
+    if batch_size < num_workers or N < num_workers:
+        raise ValueError(f"batch_size ({batch_size}) and the dataset ({N}) need at least "
+                         f"num_workers ({num_workers}) samples: every worker gets a non-empty shard")
+
+    baseline = 0.0
+    if baseline_steps > 0:
+        baseline = measure_throughput(model, optimizer, X_train, y_train, batch_size,
+                                      num_classes, steps=baseline_steps)
+
+    grad_spec = spec_of(model.params())
+    bn = _bn_layers(model)
+    blocks = {
+        "data": SharedArrays.from_arrays({
+            "X": X_train, "y": y_train, "perm": np.arange(N, dtype=np.int64),
+        }),
+        "params": SharedArrays.from_arrays(model.params()),
+        "slots": SharedArrays(_slot_spec(grad_spec, bn, num_workers)),
+        "grads": SharedArrays({k: (shape, "<f8") for k, (shape, _) in grad_spec.items()}),
+    }
+    model.bind_params(blocks["params"].arrays)
+    perm, slots = blocks["data"]["perm"], blocks["slots"]
+    specs = {k: b.spec for k, b in blocks.items()}
+    names = {k: b.name for k, b in blocks.items()}
+    parts = _partition_keys(grad_spec, num_workers)
+
+    ctx = mp.get_context()
+    barrier = ctx.Barrier(num_workers)
+    conns, procs = [], []
+    for r in range(num_workers):
+        parent, child = ctx.Pipe()
+        p = ctx.Process(target=_worker, daemon=True,
+                        args=(r, num_workers, model, num_classes, specs, names, parts[r], child, barrier))
+        p.start()
+        conns.append(parent)
+        procs.append(p)
+
+    params: Dict[str, np.ndarray] = {}
+    grads: Dict[str, np.ndarray] = {}
+    history = _init_history(log_csv_path)
+    history.update({"samples_per_sec": [], "scaling_efficiency": [], "baseline_samples_per_sec": [baseline]})
+    try:
+        model.train()
+        for epoch in range(1, epochs + 1):
+            t0 = time.time()
+            perm[...] = np.random.permutation(N)
+
+            total_loss = 0.0
+            total_correct = 0
+            for start, end in _batches(N, batch_size, num_workers):
+                for c in conns:
+                    c.send(("step", start, end))
+                for c in conns:
+                    loss_sum, correct = c.recv()
+                    total_loss += loss_sum
+                    total_correct += correct
+
+                # running stats from the full-batch moments the replicas normalized with
+                for i, l in bn:
+                    l.update_running_stats(*_full_batch_moments(slots, i, l.C, num_workers))
+
+                # frozen layers (requires_grad=False) are left untouched
+                params = model.trainable_params()
+                grads = {k: blocks["grads"][k] for k in params}
+                optimizer.step(params, grads)
+
+            train_time = time.time() - t0
+            train_loss = total_loss / N
+            train_acc = total_correct / N
+            sps = N / max(train_time, 1e-12)
+            history["samples_per_sec"].append(sps)
+            history["scaling_efficiency"].append(sps / (num_workers * baseline) if baseline > 0 else float("nan"))
+
+            if X_val is not None:
+                val_loss, val_acc = evaluate(model, X_val, y_val, batch_size, num_classes)
+                model.train()
+            else:
+                val_loss = float("nan")
+                val_acc = float("nan")
+
+            print(f"[{epoch:03d}] {num_workers} workers: {sps:.1f} samples/s, "
+                  f"scaling efficiency {history['scaling_efficiency'][-1]:.2f}")
+            _end_epoch(history, epoch, train_loss, train_acc, val_loss, val_acc,
+                       model, optimizer, log_csv_path, callbacks, scheduler, t0)
+    finally:
+        for c in conns:
+            try:
+                c.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        for p in procs:
+            p.join(timeout=10)
+            if p.is_alive():
+                p.terminate()
+        # give the model private copies before releasing shared memory
+        model.bind_params({k: v.copy() for k, v in blocks["params"].arrays.items()})
+        del perm, slots, grads, params
+        for b in blocks.values():
+            b.close()
+
+    return history
@@ -13,6 +13,9 @@ Supported:
 - CosineAnnealingLR(T_max, min_lr=0.0)
 - WarmupCosineLR(warmup_epochs, T_max, max_lr=None, base_lr=None, min_lr=0.0)
 
+Resolution schedule for progressive resizing (passed to train.loop.train):
+- ProgressiveResize([(1, 64), (6, 128), (11, None)])  # None = native size
+
 Notes:
 - Optimizer must expose an attribute `lr` that we update in place.
 """
@@ -109,6 +112,37 @@ class WarmupCosineLR(LRScheduler):
             self._set_lr(lr)
 
 
+class ProgressiveResize:
+    """
+    Training image size per epoch: `schedule` is a list of (start_epoch, size)
+    pairs; each size applies from its start epoch until the next one. size is
+    an int (square) or None for the native resolution.
+    """
+
+    def __init__(self, schedule) -> None:
+        self.schedule = sorted((int(e), None if s is None else int(s)) for e, s in schedule)
+        assert self.schedule, "schedule must not be empty"
+
+    def size_at(self, epoch: int) -> Optional[int]:
+        size = self.schedule[0][1]
+        for start, s in self.schedule:
+            if epoch >= start:
+                size = s
+        return size
+
+
+def build_resize_schedule(cfg: dict | None) -> Optional[ProgressiveResize]:
+    """
+    Factory. cfg example:
+        {"schedule": [[1, 64], [6, 128], [11, 224]]}
+
+    Returns a ProgressiveResize or None if cfg is empty.
+    """
+    if not cfg or not cfg.get("schedule"):
+        return None
+    return ProgressiveResize([tuple(item) for item in cfg["schedule"]])
+
+
 def build_scheduler(optimizer, cfg: dict | None):
     """
     Factory. cfg example:
@@ -0,0 +1,83 @@
+"""
+src/train/shared.py
+Named NumPy arrays packed into a single multiprocessing.shared_memory block.
+
+The multi-process trainers use it to share parameters, gradients and data
+between processes: a spec (name -> (shape, dtype)) is enough to attach to an
+existing block from another process and get zero-copy views.
+"""
+
+from __future__ import annotations
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+import numpy as np
+
+from ..layers.base import ParamDict
+
+
+Spec = Dict[str, Tuple[Tuple[int, ...], str]]
+
+_ALIGN = 64  # cache-line alignment for every array
+
+
+def spec_of(arrays: ParamDict) -> Spec:
+    """Return the (shape, dtype) spec of a dict of arrays."""
+    return {k: (tuple(v.shape), np.dtype(v.dtype).str) for k, v in arrays.items()}
+
+
+def _layout(spec: Spec) -> Tuple[Dict[str, int], int]:
+    offsets: Dict[str, int] = {}
+    pos = 0
+    for k, (shape, dtype) in spec.items():
+        pos = (pos + _ALIGN - 1) // _ALIGN * _ALIGN
+        offsets[k] = pos
+        pos += int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+    return offsets, max(pos, 1)
+
+
+class SharedArrays:
+    """
+    A set of named arrays living in one shared memory block.
+
+    Create with SharedArrays(spec) (owner, unlinks on close) or attach from
+    another process with SharedArrays(spec, name=owner.name).
+    """
+
+    def __init__(self, spec: Spec, name: str | None = None) -> None:
+        self.spec = dict(spec)
+        offsets, size = _layout(self.spec)
+        self._owner = name is None
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.arrays: ParamDict = {
+            k: np.ndarray(shape, dtype=np.dtype(dtype), buffer=self.shm.buf, offset=offsets[k])
+            for k, (shape, dtype) in self.spec.items()
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: ParamDict) -> "SharedArrays":
+        """Allocate a block matching `arrays` and copy their current values in."""
+        out = cls(spec_of(arrays))
+        for k, v in arrays.items():
+            out.arrays[k][...] = v
+        return out
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.arrays[key]
+
+    def close(self) -> None:
+        """Drop the views and release the block (the owner also unlinks it)."""
+        self.arrays = {}
+        try:
+            self.shm.close()
+        except BufferError:
+            # views still referenced elsewhere; the mapping goes away with them
+            pass
+        if self._owner:
+            self.shm.unlink()
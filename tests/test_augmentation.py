@@ -0,0 +1,106 @@
+import numpy as np
+from dermascan.preprocessing.augmentation import BatchAugmenter
+
+
+def _batch(n=16, h=8, w=8, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (n, 3, h, w), dtype=np.uint8)
+
+
+def test_flips_match_per_image_numpy_reference():
+    X = _batch(h=6, w=9)
+    out = BatchAugmenter(horizontal_flip=True, vertical_flip=True)(X, np.random.default_rng(1))
+    assert out.shape == X.shape and out.dtype == np.uint8
+    seen = set()
+    for x, o in zip(X, out):
+        refs = [x, x[:, :, ::-1], x[:, ::-1, :], x[:, ::-1, ::-1]]
+        matches = [k for k, r in enumerate(refs) if np.array_equal(o, r)]
+        assert matches, "output is not a flip of its input"
+        seen.add(matches[0])
+    assert len(seen) > 1
+
+
+def test_rot90_matches_per_image_numpy_reference():
+    X = _batch(h=7, w=7)
+    out = BatchAugmenter(rot90=True)(X, np.random.default_rng(2))
+    assert out.shape == X.shape and out.dtype == np.uint8
+    for x, o in zip(X, out):
+        assert any(np.array_equal(o, np.rot90(x, k, axes=(1, 2))) for k in range(4))
+
+
+def test_color_lut_matches_per_pixel_reference():
+    X = _batch()
+    aug = BatchAugmenter(brightness_range=(1.5, 1.5), contrast_range=(0.5, 0.5))
+    out = aug(X, np.random.default_rng(3))
+    v = X.astype(np.float32)
+    ref = np.clip(np.rint((v * np.float32(1.5) - 127.5) * np.float32(0.5) + 127.5), 0, 255).astype(np.uint8)
+    assert out.dtype == np.uint8 and np.array_equal(out, ref)
+    # odd pixel count per sample: byte table instead of the pixel-pair table
+    X7 = _batch(h=7, w=7)
+    v7 = X7.astype(np.float32)
+    ref7 = np.clip(np.rint((v7 * np.float32(1.5) - 127.5) * np.float32(0.5) + 127.5), 0, 255).astype(np.uint8)
+    assert np.array_equal(aug(X7, np.random.default_rng(3)), ref7)
+
+    Xf = X.astype(np.float32) / 255.0
+    outf = aug(Xf, np.random.default_rng(3))
+    assert outf.dtype == np.float32
+    assert np.allclose(outf, np.clip((Xf * 1.5 - 0.5) * 0.5 + 0.5, 0.0, 1.0), atol=1e-6)
+
+
+def test_output_size_and_dtype_with_full_config():
+    cfg = {"rotation_range": 20, "horizontal_flip": True, "vertical_flip": True, "rot90": True,
+           "brightness_range": [0.8, 1.2], "contrast_range": [0.8, 1.2], "zoom_range": [0.9, 1.1],
+           "random_resized_crop": {"scale": [0.6, 1.0], "ratio": [0.75, 1.333]}}
+    X = _batch(n=5, h=20, w=24)
+    for size in (None, (12, 10)):
+        aug = BatchAugmenter.from_config(cfg, output_size=size)
+        for x in (X, X.astype(np.float32) / 255.0):
+            out = aug(x, np.random.default_rng(4))
+            assert out.shape == (5, 3) + (size or (20, 24)) and out.dtype == x.dtype
+    # same seed, same batch
+    aug = BatchAugmenter.from_config(cfg)
+    assert np.array_equal(aug(X, np.random.default_rng(5)), aug(X, np.random.default_rng(5)))
+
+
+def test_color_lookup_after_geometry_matches_separate_passes():
+    X = _batch(n=6, h=10, w=10)
+    geo = {"rotation_range": 30, "horizontal_flip": True, "zoom_range": [0.8, 1.2]}
+    both = BatchAugmenter.from_config({**geo, "brightness_range": [1.3, 1.3]})(X, np.random.default_rng(6))
+    moved = BatchAugmenter.from_config(geo)(X, np.random.default_rng(6))
+    colored = BatchAugmenter(brightness_range=(1.3, 1.3))(moved, np.random.default_rng(0))
+    assert np.array_equal(both, colored)
+
+
+def test_throughput_at_224(record_property):
+    import time
+    cfg = {"rotation_range": 20, "horizontal_flip": True, "vertical_flip": True, "rot90": True,
+           "brightness_range": [0.8, 1.2], "contrast_range": [0.8, 1.2], "zoom_range": [0.9, 1.1],
+           "random_resized_crop": {"scale": [0.6, 1.0], "ratio": [0.75, 1.333]}}
+    aug = BatchAugmenter.from_config(cfg)
+    X = _batch(n=32, h=224, w=224)
+    rng = np.random.default_rng(7)
+    aug(X, rng)
+    t0, n = time.perf_counter(), 0
+    while n < 320:
+        aug(X, rng)
+        n += X.shape[0]
+    rate = n / (time.perf_counter() - t0)
+    record_property("augment_img_per_s", round(rate))
+    print(f"BatchAugmenter: {rate:.0f} img/s at 224x224")
+    assert rate > 100  # loose floor, shared CI runners are noisy
+
+
+def test_training_batches_are_normalized_like_serving_uploads():
+    from PIL import Image
+    from dermascan.preprocessing.image_processor import ImageProcessor
+    from dermascan.scripts.train_dermascan import build_transforms
+    from src.data.batching import BatchIterator
+
+    processor = ImageProcessor(target_size=(8, 8))
+    X = _batch(n=6)
+    served = np.stack([processor.process_image(Image.fromarray(x.transpose(1, 2, 0))) for x in X])
+    train_tf, eval_tf = build_transforms({"horizontal_flip": True}, processor)
+    xb, _ = next(iter(BatchIterator(X, np.arange(6), batch_size=6, shuffle=False, transform=eval_tf)))
+    assert np.array_equal(xb, served)
+    xb, _ = next(iter(BatchIterator(X, np.arange(6), batch_size=6, shuffle=False, transform=train_tf)))
+    for x, s in zip(xb, served):
+        assert np.array_equal(x, s) or np.array_equal(x, s[:, :, ::-1])
@@ -0,0 +1,56 @@
+import numpy as np
+from src.data.batching import BatchIterator
+
+
+def test_batch_iterator_covers_every_sample_once_per_epoch():
+    X = np.arange(23, dtype=np.float32).reshape(23, 1) * np.ones((1, 3), dtype=np.float32)
+    y = np.arange(23)
+    it = BatchIterator(X, y, batch_size=5, shuffle=True, prefetch=2)
+    assert len(it) == 5
+    for _ in range(2):
+        seen = []
+        for xb, yb in it:
+            assert np.all(xb[:, 0] == yb)
+            seen.extend(yb.tolist())  # copy: buffers are reused
+        assert sorted(seen) == list(range(23))
+
+
+def test_batch_iterator_early_exit_and_no_prefetch():
+    X = np.random.randn(40, 2)
+    y = np.arange(40)
+    it = BatchIterator(X, y, batch_size=4, shuffle=False, prefetch=1)
+    for k, (xb, yb) in enumerate(it):
+        if k == 2:
+            break
+    sync = list(BatchIterator(X, y, batch_size=8, shuffle=False, prefetch=0, drop_last=True))
+    assert len(sync) == 5
+
+
+def test_block_shuffle_iterator_covers_every_sample_with_bounded_windows():
+    from src.data.batching import BlockShuffleIterator
+    from src.data.loader import ArrayDataset
+    X = np.arange(53, dtype=np.uint8).reshape(53, 1)
+    y = np.arange(53)
+    it = BlockShuffleIterator(ArrayDataset(X, y), batch_size=4, block_size=8, buffer_blocks=2, seed=1)
+    assert len(it) == 14
+    epochs = []
+    for _ in range(2):
+        seen = []
+        for xb, yb in it:
+            assert xb.dtype == np.float32 and np.allclose(xb[:, 0] * 255.0, yb)
+            assert yb.size <= 4
+            seen.extend(yb.tolist())
+        assert sorted(seen) == list(range(53))
+        epochs.append(seen)
+    assert epochs[0] != epochs[1]
+    ordered = [b.tolist() for _, b in BlockShuffleIterator(ArrayDataset(X, y), 10, block_size=8, shuffle=False)]
+    assert sum(ordered, []) == list(range(53))
+
+
+def test_batch_iterator_applies_transform_before_normalization():
+    X = np.arange(12, dtype=np.uint8).reshape(12, 1, 1, 1) * np.ones((1, 3, 2, 2), dtype=np.uint8)
+    y = np.arange(12)
+    flip = lambda xb, rng: 255 - xb  # noqa: E731
+    for xb, yb in BatchIterator(X, y, batch_size=5, shuffle=True, transform=flip):
+        assert xb.dtype == np.float32
+        assert np.allclose(xb * 255.0, (255 - yb)[:, None, None, None])
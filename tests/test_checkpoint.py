@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from src.layers.base import deferred_init
+from src.models.checkpoint import ALIGN, load_checkpoint, read_header, save_checkpoint
+from src.models.convnet_small import lenet_mnist
+
+
+def test_checkpoint_roundtrip_and_bind(tmp_path):
+    model = lenet_mnist(num_classes=10)
+    path = save_checkpoint(str(tmp_path / "w.ckpt"), {**model.params(), **model.buffers()}, meta={"k": [1, 2]})
+    arrays, meta = load_checkpoint(path)
+    assert meta == {"k": [1, 2]}
+    for k, v in model.params().items():
+        assert np.array_equal(arrays[k], v) and arrays[k].dtype == v.dtype
+        assert not arrays[k].flags.writeable
+    assert all(offset % ALIGN == 0 for offset, _, _ in read_header(path)["arrays"].values())
+
+    other = lenet_mnist(num_classes=10)
+    other.bind_params(arrays)
+    x = np.random.rand(2, 1, 28, 28)
+    assert np.allclose(other.forward(x, training=False), model.forward(x, training=False))
+
+
+def test_checkpoint_partial_copy_and_legacy_npz(tmp_path):
+    model = lenet_mnist(num_classes=10)
+    path = save_checkpoint(str(tmp_path / "w.ckpt"), model.params())
+    key = "0.Conv2D.W"
+    arrays, _ = load_checkpoint(path, names=[key], mmap=False)
+    assert list(arrays) == [key] and arrays[key].flags.writeable
+    assert np.array_equal(arrays[key], model.params()[key])
+    with pytest.raises(KeyError):
+        load_checkpoint(path, names=["missing"])
+
+    np.savez(tmp_path / "w.npz", **model.params())
+    with deferred_init():
+        other = lenet_mnist(num_classes=10)
+    other.load_params(load_checkpoint(str(tmp_path / "w.npz"))[0])
+    assert np.array_equal(other.params()[key], model.params()[key])
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from src.layers.batchnorm import BatchNorm2D
+from src.models.compiled import compile_model
+from src.models.convnet_small import lenet_mnist, vgg_tiny_cifar10
+
+
+def test_compiled_lenet_matches_forward():
+    model = lenet_mnist(num_classes=10)
+    x = np.random.rand(13, 1, 28, 28)  # padded into the 8 plan, then chunked
+    engine = compile_model(model, (1, 28, 28), batch_sizes=(1, 8), dtype=np.float64)
+    expected = model.forward(x, training=False)
+    assert np.allclose(engine(x), expected, atol=1e-10)
+    assert np.allclose(engine(x[:1]), expected[:1], atol=1e-10)
+    with pytest.raises(ValueError):
+        engine(np.random.rand(2, 1, 32, 32))
+
+
+def test_compiled_vgg_folds_batchnorm():
+    rng = np.random.default_rng(0)
+    model = vgg_tiny_cifar10(num_classes=10)
+    for layer in model.layers:
+        if isinstance(layer, BatchNorm2D):
+            layer.gamma[...] = rng.uniform(0.5, 1.5, layer.C)
+            layer.beta[...] = rng.normal(0, 0.1, layer.C)
+            layer.running_mean[...] = rng.normal(0, 0.1, layer.C)
+            layer.running_var[...] = rng.uniform(0.5, 2.0, layer.C)
+    x = rng.random((5, 3, 32, 32)).astype(np.float32)
+    expected = model.forward(x, training=False)
+    engine = compile_model(model, (3, 32, 32), batch_sizes=(4,), dtype=np.float32)
+    out = engine(x)
+    assert out.dtype == np.float32
+    assert np.allclose(out, expected, atol=1e-5)
@@ -0,0 +1,36 @@
+import numpy as np
+from src.data.cache import IndexedView, load_or_build, split_indices, to_float
+from src.data.batching import BatchIterator
+
+
+def test_cache_is_built_once_and_memory_mapped(tmp_path):
+    calls = []
+    X = np.random.default_rng(0).integers(0, 256, size=(20, 1, 4, 4), dtype=np.uint8)
+
+    def build():
+        calls.append(1)
+        return {"X": X, "y": np.arange(20)}
+
+    a = load_or_build(str(tmp_path), ["X", "y"], build)
+    b = load_or_build(str(tmp_path), ["X", "y"], build)
+    assert len(calls) == 1
+    assert isinstance(b["X"], np.memmap) and b["X"].dtype == np.uint8
+    assert np.array_equal(a["X"], X)
+
+
+def test_uint8_view_batches_match_float_pipeline():
+    X = np.random.default_rng(1).integers(0, 256, size=(30, 1, 3, 3), dtype=np.uint8)
+    y = np.arange(30)
+    train_idx, _ = split_indices(30, 0.2, seed=0)
+    view = IndexedView(X, train_idx)
+    assert view.shape == (24, 1, 3, 3) and len(view[2:5]) == 3
+
+    expected = X[train_idx].astype(np.float32) / 255.0
+    got = {}
+    for xb, yb in BatchIterator(view, y[train_idx], batch_size=7, shuffle=False, prefetch=1):
+        assert xb.dtype == np.float32
+        for row, label in zip(xb, yb):
+            got[int(label)] = row.copy()
+    for j, i in enumerate(train_idx):
+        assert np.array_equal(got[int(i)], expected[j])
+    assert np.array_equal(to_float(X), X.astype(np.float32) / 255.0)
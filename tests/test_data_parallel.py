@@ -0,0 +1,99 @@
+import numpy as np
+from src.models.sequential import Sequential
+from src.layers.conv2d import Conv2D
+from src.layers.batchnorm import BatchNorm2D
+from src.layers.activations import ReLU
+from src.layers.dense import Dense
+from src.core.optim import SGD
+from src.core.utils import one_hot
+from src.core.losses import softmax_cross_entropy_backward
+from src.train.parallel import train_data_parallel
+
+
+def _model(seed, bn=False):
+    rng = np.random.default_rng(seed)
+    layers = [Conv2D(1, 3, 3, padding=1, rng=rng)]
+    if bn:
+        layers.append(BatchNorm2D(3))
+    layers += [ReLU(), Dense(3 * 6 * 6, 4, rng=rng)]
+    return Sequential(layers)
+
+
+def test_data_parallel_step_matches_single_process():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(10, 1, 6, 6))
+    y = rng.integers(0, 4, size=10)
+
+    ref = _model(1)
+    logits = ref.forward(X, training=True)
+    ref.backward(softmax_cross_entropy_backward(logits, one_hot(y, 4)))
+    SGD(lr=0.1).step(ref.params(), ref.grads())
+
+    # a single batch covering the whole set, so the permutation does not matter
+    model = _model(1)
+    train_data_parallel(model, SGD(lr=0.1), (X, y), None, epochs=1, batch_size=10,
+                        num_classes=4, num_workers=3, baseline_steps=0)
+    for k, v in ref.params().items():
+        assert np.allclose(model.params()[k], v, atol=1e-10), k
+
+
+def test_data_parallel_syncbn_step_matches_single_process_for_any_worker_count():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(10, 1, 6, 6))
+    y = rng.integers(0, 4, size=10)
+
+    ref = _model(1, bn=True)
+    logits = ref.forward(X, training=True)
+    ref.backward(softmax_cross_entropy_backward(logits, one_hot(y, 4)))
+    SGD(lr=0.1).step(ref.params(), ref.grads())
+
+    # per-shard BN would give worker-count-dependent gradients; SyncBN does not
+    for workers in (2, 3):
+        model = _model(1, bn=True)
+        train_data_parallel(model, SGD(lr=0.1), (X, y), None, epochs=1, batch_size=10,
+                            num_classes=4, num_workers=workers, baseline_steps=0)
+        for k, v in ref.params().items():
+            assert np.allclose(model.params()[k], v, atol=1e-10), (workers, k)
+
+
+def test_data_parallel_merges_a_last_batch_smaller_than_the_worker_count():
+    from src.train.parallel import _batches
+    assert _batches(10, 4, 3) == [(0, 4), (4, 10)]
+    assert _batches(11, 4, 3) == [(0, 4), (4, 8), (8, 11)]
+    assert _batches(2, 4, 3) == [(0, 2)]
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(9, 1, 6, 6))
+    y = rng.integers(0, 4, size=9)
+    model = _model(1, bn=True)
+    hist = train_data_parallel(model, SGD(lr=0.1), (X, y), None, epochs=1, batch_size=4,
+                               num_classes=4, num_workers=2, baseline_steps=0)
+    assert np.isfinite(hist["train_loss"][0])
+
+
+def test_data_parallel_batchnorm_running_stats_use_full_batch():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(10, 1, 6, 6))
+    y = rng.integers(0, 4, size=10)
+
+    ref = _model(1, bn=True)
+    ref.forward(X, training=True)
+
+    model = _model(1, bn=True)
+    train_data_parallel(model, SGD(lr=0.1), (X, y), None, epochs=1, batch_size=10,
+                        num_classes=4, num_workers=3, baseline_steps=0)
+    for k, v in ref.buffers().items():
+        assert np.allclose(model.buffers()[k], v, atol=1e-6), k
+
+
+def test_data_parallel_leaves_frozen_layers_untouched():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(12, 1, 6, 6))
+    y = rng.integers(0, 4, size=12)
+    model = _model(1)
+    model.freeze(stop=1)
+    W0 = model.layers[0].W.copy()
+    D0 = model.layers[-1].W.copy()
+    train_data_parallel(model, SGD(lr=0.1, weight_decay=0.1), (X, y), None, epochs=1, batch_size=4,
+                        num_classes=4, num_workers=2, baseline_steps=1)
+    assert np.array_equal(model.layers[0].W, W0)
+    assert not np.array_equal(model.layers[-1].W, D0)
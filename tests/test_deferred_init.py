@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from src.layers.base import deferred_init
+from src.models.convnet_small import lenet_mnist
+
+
+def test_deferred_params_load_without_drawing(tmp_path):
+    ref = lenet_mnist(num_classes=10)
+    np.savez(tmp_path / "w.npz", **ref.params())
+
+    with deferred_init():
+        model = lenet_mnist(num_classes=10)
+    assert model.param_specs() == {k: (v.shape, v.dtype) for k, v in ref.params().items()}
+    assert all(l.__dict__.get("_deferred") for l in model.layers if "W" in l.param_specs())
+
+    with np.load(tmp_path / "w.npz") as data:
+        model.load_params({k: data[k] for k in data.files})
+    assert not any(l.__dict__.get("_deferred") for l in model.layers)
+    x = np.random.rand(2, 1, 28, 28)
+    assert np.allclose(model.forward(x, training=False), ref.forward(x, training=False))
+
+    with pytest.raises(KeyError):
+        model.load_params({})
+
+
+def test_deferred_params_drawn_on_first_use():
+    with deferred_init():
+        model = lenet_mnist(num_classes=10)
+    W = model.layers[0].W
+    assert W.shape == model.param_specs()["0.Conv2D.W"][0] and W.std() > 0
+    assert model.layers[0].W is W  # drawn once
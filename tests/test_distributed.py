@@ -0,0 +1,67 @@
+import multiprocessing as mp
+import socket
+import numpy as np
+from src.train.distributed import DistributedOptimizer, ProcessGroup
+from src.models.sequential import Sequential
+from src.layers.dense import Dense
+from src.layers.activations import ReLU
+from src.core.optim import SGD
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _rank_main(rank, world, port, out):
+    group = ProcessGroup(rank, world, master_port=port, timeout=20)
+    try:
+        # odd length so chunks are uneven
+        x = np.arange(11, dtype=np.float64) * (rank + 1)
+        group.allreduce_(x)
+        b = np.full(5, float(rank), dtype=np.float32)
+        group.broadcast_(b, root=1)
+
+        rng = np.random.default_rng(rank)
+        model = Sequential([Dense(4, 8, rng=rng), ReLU(), Dense(8, 3, rng=rng)])
+        group.broadcast_params(model)
+        opt = DistributedOptimizer(SGD(lr=0.1), model, group, bucket_mb=1e-4)
+        xb = rng.normal(size=(5, 4))
+        model.forward(xb, training=True)
+        model.backward(np.full((5, 3), float(rank + 1)))
+        grads = {k: v.copy() for k, v in model.grads().items()}
+        opt.step(model.params(), model.grads())
+        opt.close()
+        out.put((rank, x, b, grads, {k: v.copy() for k, v in model.params().items()}))
+    finally:
+        group.close()
+
+
+def test_ring_allreduce_broadcast_and_optimizer_on_localhost():
+    world, port = 3, _free_port()
+    ctx = mp.get_context()
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_rank_main, args=(r, world, port, out)) for r in range(world)]
+    for p in procs:
+        p.start()
+    results = sorted((out.get(timeout=60) for _ in range(world)), key=lambda t: t[0])
+    for p in procs:
+        p.join(timeout=30)
+
+    expected = np.arange(11, dtype=np.float64) * sum(r + 1 for r in range(world))
+    for _, x, b, _, _ in results:
+        assert np.allclose(x, expected)
+        assert np.all(b == 1.0)
+
+    # all ranks apply the same averaged gradient, so parameters stay in sync
+    params0 = results[0][4]
+    for _, _, _, _, params in results[1:]:
+        for k in params0:
+            assert np.allclose(params[k], params0[k])
+    # rank 0's initial weights were broadcast; one SGD step with the mean gradient
+    rng = np.random.default_rng(0)
+    init = Sequential([Dense(4, 8, rng=rng), ReLU(), Dense(8, 3, rng=rng)]).params()
+    mean_grad = {k: np.mean([r[3][k] for r in results], axis=0) for k in params0}
+    for k in params0:
+        assert np.allclose(params0[k], init[k] - 0.1 * mean_grad[k])
@@ -0,0 +1,30 @@
+import os
+import numpy as np
+from src.core.optim import SGD
+from src.models.convnet_small import lenet_mnist
+from src.train.feature_cache import cached_features, train_head
+
+
+def test_feature_cache_hits_invalidates_and_trains_head(tmp_path):
+    rng = np.random.default_rng(0)
+    X = (rng.random((37, 1, 28, 28)) * 255).astype(np.uint8)
+    y = rng.integers(0, 10, 37)
+    model = lenet_mnist(10)
+    model.freeze(stop=6)  # conv backbone -> (N, 16, 5, 5)
+
+    F = cached_features(model, X, str(tmp_path), batch_size=8, workers=3)
+    expected = model.forward(X.astype(np.float32) / 255.0, training=False)
+    model.train()
+    from src.models.sequential import Sequential
+    assert np.allclose(F, Sequential(model.layers[:6]).forward(X.astype(np.float32) / 255.0, training=False), atol=1e-5)
+    assert len(os.listdir(tmp_path)) == 1
+    assert cached_features(model, X, str(tmp_path)).filename == F.filename  # hit
+
+    backbone = {k: v.copy() for k, v in model.params().items() if int(k.split(".")[0]) < 6}
+    hist = train_head(model, SGD(lr=0.05), (X, y), (X, y), str(tmp_path), batch_size=16, epochs=2)
+    assert len(hist["val_acc"]) == 2 and len(os.listdir(tmp_path)) == 1
+    assert all(np.array_equal(v, model.params()[k]) for k, v in backbone.items())
+    assert not np.allclose(model.forward(X.astype(np.float32) / 255.0, training=False), expected)
+
+    model.layers[0].W += 0.01  # backbone changed -> new key
+    assert cached_features(model, X, str(tmp_path)).filename != F.filename
@@ -0,0 +1,93 @@
+import hashlib
+import io
+import os
+import pickle
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from src.data.fetch import fetch, fetch_all
+
+
+class _Files(BaseHTTPRequestHandler):
+    """Serves in-memory files with Range support; 'cut' files drop the first response halfway."""
+    files: dict = {}
+    cut: set = set()
+    ranges: list = []
+
+    def do_GET(self):
+        data = self.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+        start = 0
+        rng = self.headers.get("Range")
+        if rng:
+            start = int(rng.split("=")[1].split("-")[0])
+            self.ranges.append((self.path, start))
+        body = data[start:]
+        self.send_response(206 if rng else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.path in self.cut:
+            self.cut.discard(self.path)
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.connection.shutdown(2)  # simulate a dropped connection
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Files)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_fetch_resumes_verifies_and_runs_in_parallel(tmp_path):
+    rng = np.random.default_rng(0)
+    blobs = {f"/f{i}.bin": rng.bytes(300_000 + i) for i in range(3)}
+    _Files.files = blobs
+    _Files.cut = {"/f0.bin"}
+    _Files.ranges = []
+    server, base = _serve()
+    try:
+        jobs = [([f"{base}/missing", f"{base}{name}"], str(tmp_path / name[1:]), hashlib.md5(b).hexdigest())
+                for name, b in blobs.items()]
+        paths = fetch_all(jobs, workers=3, retries=2, sleep=0.0)
+        for (name, b), p in zip(blobs.items(), paths):
+            assert open(p, "rb").read() == b
+        assert [r for r in _Files.ranges if r[0] == "/f0.bin" and r[1] > 0]  # resumed, not restarted
+        assert not any(f.endswith(".part") for f in os.listdir(tmp_path))
+
+        bad = tmp_path / "bad.bin"
+        try:
+            fetch(f"{base}/f1.bin", str(bad), md5="0" * 32, retries=1, sleep=0.0)
+            raise AssertionError("expected an MD5 failure")
+        except RuntimeError as e:
+            assert "MD5" in str(e)
+        assert not bad.exists() and not os.path.exists(str(bad) + ".part")
+    finally:
+        server.shutdown()
+
+
+def test_cifar_batches_are_read_from_the_tarball(tmp_path):
+    from src.data.cifar10 import _read_tar_batches
+    tgz = tmp_path / "c.tar.gz"
+    with tarfile.open(tgz, "w:gz") as tar:
+        for name in ["test_batch"] + [f"data_batch_{i}" for i in range(1, 6)]:
+            payload = pickle.dumps({"data": np.full((2, 3072), 7, np.uint8), "labels": [1, 2]})
+            info = tarfile.TarInfo(f"cifar-10-batches-py/{name}")
+            info.size = len(payload)
+            tar.addfile(info, io.BytesIO(payload))
+    batches = _read_tar_batches(str(tgz))
+    assert sorted(batches) == ["data_batch_1", "data_batch_2", "data_batch_3", "data_batch_4",
+                               "data_batch_5", "test_batch"]
+    X, y = batches["test_batch"]
+    assert X.shape == (2, 3, 32, 32) and X.dtype == np.uint8 and y.tolist() == [1, 2]
+    assert not (tmp_path / "cifar-10-batches-py").exists()
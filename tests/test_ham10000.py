@@ -0,0 +1,36 @@
+import csv
+import numpy as np
+from PIL import Image
+from dermascan.data.ham10000 import DX_TO_CLASS, HAM10000Store, ingest
+
+
+def _write_raw(raw, rows):
+    (raw / "part_1").mkdir(parents=True, exist_ok=True)
+    for image_id, _, _ in rows:
+        Image.new("RGB", (12, 10), (len(image_id) * 20, 0, 0)).save(raw / "part_1" / f"{image_id}.jpg")
+    with open(raw / "HAM10000_metadata.csv", "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["lesion_id", "image_id", "dx"])
+        w.writerows([(lesion, image_id, dx) for image_id, lesion, dx in rows])
+
+
+def test_reingest_ignores_index_entries_past_the_manifest_count(tmp_path):
+    raw, out = tmp_path / "raw", tmp_path / "store"
+    rows = [("img_a", "L1", "nv"), ("img_b", "L2", "mel")]
+    _write_raw(raw, rows)
+    assert ingest(raw, out, image_size=(8, 8), shard_size=4, workers=1) == 2
+
+    # crash after the index arrays were saved but before the manifest commit
+    np.save(out / "labels.npy", np.array([5, 4, 0, 0, 0], dtype=np.int64))
+    np.save(out / "lesion_ids.npy", np.array(["L1", "L2", "X", "X", "X"]))
+
+    rows += [("img_c", "L3", "bcc"), ("img_dd", "L3", "bcc"), ("img_e", "L4", "df")]
+    _write_raw(raw, rows)
+    assert ingest(raw, out, image_size=(8, 8), shard_size=4, workers=1) == 3
+
+    store = HAM10000Store(out)
+    by_id = {image_id: (lesion, dx) for image_id, lesion, dx in rows}
+    assert len(store) == 5 and len(np.load(out / "labels.npy")) == 5
+    for i, image_id in enumerate(store.image_ids):
+        lesion, dx = by_id[image_id]
+        assert store.labels[i] == DX_TO_CLASS[dx] and store.lesion_ids[i] == lesion
@@ -0,0 +1,31 @@
+import numpy as np
+from src.models.sequential import Sequential
+from src.layers.dense import Dense
+from src.layers.activations import ReLU
+from src.core.optim import SGD
+from src.train.hogwild import train_hogwild
+
+
+def test_hogwild_learns_separable_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 2))
+    y = (X[:, 0] + X[:, 1] > 0).astype(np.int64)
+    model = Sequential([Dense(2, 16, rng=rng), ReLU(), Dense(16, 2, rng=rng)])
+    hist = train_hogwild(model, SGD(lr=0.1), (X, y), (X, y), epochs=3, batch_size=16,
+                         num_classes=2, num_workers=2, baseline_steps=2)
+    assert hist["val_acc"][-1] > 0.9
+    assert len(hist["samples_per_sec"]) == 3 and hist["speedup"][-1] > 0
+
+
+def test_hogwild_leaves_frozen_layers_untouched():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(64, 2))
+    y = (X[:, 0] > 0).astype(np.int64)
+    model = Sequential([Dense(2, 8, rng=rng), ReLU(), Dense(8, 2, rng=rng)])
+    model.freeze(stop=1)
+    W0 = model.layers[0].W.copy()
+    D0 = model.layers[2].W.copy()
+    train_hogwild(model, SGD(lr=0.1, weight_decay=0.1), (X, y), None, epochs=1, batch_size=8,
+                  num_classes=2, num_workers=2, baseline_steps=1)
+    assert np.array_equal(model.layers[0].W, W0)
+    assert not np.array_equal(model.layers[2].W, D0)
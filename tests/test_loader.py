@@ -0,0 +1,49 @@
+import numpy as np
+from src.data.loader import ArrayDataset, DataLoader
+
+
+def _noisy(x, rng):
+    return x + rng.integers(0, 3)
+
+
+def _collect(loader):
+    return [(xb.copy(), yb.copy()) for xb, yb in loader]
+
+
+def test_dataloader_order_and_determinism_independent_of_workers():
+    X = np.arange(37, dtype=np.float32)[:, None].repeat(4, axis=1)
+    ds = ArrayDataset(X, np.arange(37))
+    with DataLoader(ds, batch_size=8, num_workers=1, transform=_noisy, seed=3) as a, \
+         DataLoader(ds, batch_size=8, num_workers=3, transform=_noisy, seed=3) as b:
+        for _ in range(2):  # two epochs, different shuffles
+            ea, eb = _collect(a), _collect(b)
+            assert len(ea) == len(a) == 5
+            for (xa, ya), (xb, yb) in zip(ea, eb):
+                assert np.array_equal(xa, xb) and np.array_equal(ya, yb)
+                assert np.all(xa[:, 0] - ya >= 0) and np.all(xa[:, 0] - ya <= 2)
+            assert sorted(np.concatenate([y for _, y in ea]).tolist()) == list(range(37))
+
+
+def test_dataloader_early_exit_then_clean_shutdown():
+    ds = ArrayDataset(np.zeros((50, 2)), np.zeros(50, dtype=np.int64))
+    loader = DataLoader(ds, batch_size=4, num_workers=2, shuffle=False)
+    for k, _ in enumerate(loader):
+        if k == 1:
+            break
+    assert len(_collect(loader)) == 13
+    procs = list(loader._procs)
+    loader.close()
+    assert all(not p.is_alive() for p in procs)
+
+
+def test_dataloader_batches_match_batch_iterator_for_uint8():
+    from src.data.batching import BatchIterator
+    X = np.random.default_rng(0).integers(0, 256, (21, 3, 4, 4), dtype=np.uint8)
+    y = np.arange(21)
+    with DataLoader(ArrayDataset(X, y), batch_size=8, num_workers=2, shuffle=False) as loader:
+        ours = _collect(loader)
+    ref = [(xb.copy(), yb.copy()) for xb, yb in BatchIterator(X, y, batch_size=8, shuffle=False)]
+    assert len(ours) == len(ref) == 3
+    for (xa, ya), (xb, yb) in zip(ours, ref):
+        assert xa.dtype == xb.dtype == np.float32
+        assert np.array_equal(xa, xb) and np.array_equal(ya, yb)
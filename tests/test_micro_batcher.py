@@ -0,0 +1,82 @@
+import asyncio
+import numpy as np
+import pytest
+from dermascan.inference.batching import MicroBatcher
+
+
+def _images(n):
+    return [np.full((1, 3, 2, 2), i, dtype=np.float32) for i in range(n)]
+
+
+def test_concurrent_requests_are_grouped_and_answered_in_order():
+    seen = []
+
+    def predict_batch(x):
+        seen.append(x.shape[0])
+        return [int(v) for v in x[:, 0, 0, 0]]
+
+    async def main():
+        batcher = MicroBatcher(predict_batch, max_batch=4, max_wait_ms=50)
+        await batcher.start()
+        try:
+            results = await asyncio.gather(*[batcher.submit(im) for im in _images(10)])
+        finally:
+            await batcher.stop()
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(main())
+    assert results == list(range(10))
+    assert seen == [4, 4, 2]
+    assert stats["requests"] == 10 and stats["batches"] == 3
+    assert stats["batch_size_histogram"] == {2: 1, 4: 2}
+
+
+def test_lone_request_is_served_after_max_wait():
+    async def main():
+        batcher = MicroBatcher(lambda x: list(range(x.shape[0])), max_batch=8, max_wait_ms=1)
+        await batcher.start()
+        try:
+            return await asyncio.wait_for(batcher.submit(_images(1)[0][0]), timeout=5)
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(main()) == 0
+
+
+def test_forward_errors_reach_every_request_of_the_batch_only():
+    calls = []
+
+    def predict_batch(x):
+        calls.append(x.shape[0])
+        if len(calls) == 1:
+            raise RuntimeError("forward failed")
+        return [int(v) for v in x[:, 0, 0, 0]]
+
+    async def main():
+        batcher = MicroBatcher(predict_batch, max_batch=3, max_wait_ms=50)
+        await batcher.start()
+        try:
+            first = await asyncio.gather(*[batcher.submit(im) for im in _images(3)], return_exceptions=True)
+            second = await batcher.submit(_images(5)[4])
+        finally:
+            await batcher.stop()
+        return first, second, batcher.stats()
+
+    first, second, stats = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) and str(r) == "forward failed" for r in first)
+    assert second == 4 and stats["batches"] == 1
+
+
+def test_submit_validates_input_and_lifecycle():
+    async def main():
+        batcher = MicroBatcher(lambda x: list(x))
+        with pytest.raises(RuntimeError, match="before start"):
+            await batcher.submit(np.zeros((3, 2, 2)))
+        await batcher.start()
+        try:
+            with pytest.raises(ValueError, match="single image"):
+                await batcher.submit(np.zeros((2, 3, 2, 2)))
+        finally:
+            await batcher.stop()
+
+    asyncio.run(main())
@@ -30,3 +30,19 @@ def test_avgpool2d_backward_numeric():
         return np.sum(pool.forward(xx))
     dx_num = finite_diff_grad(f_input, x.copy(), eps=1e-6)
     assert rel_error(dx, dx_num) < 2e-6
+
+def test_adaptive_avgpool2d_backward_numeric():
+    from src.layers.pooling import AdaptiveAvgPool2D
+    rng = np.random.default_rng(6)
+    for shape, out_size in (((2, 3, 7, 5), (3, 2)), ((2, 3, 6, 6), 3)):
+        x = rng.normal(size=shape).astype(np.float64)
+        pool = AdaptiveAvgPool2D(out_size)
+        y = pool.forward(x)
+        assert y.shape[2:] == ((out_size, out_size) if isinstance(out_size, int) else out_size)
+        grad_out = rng.normal(size=y.shape)
+        dx = pool.backward(grad_out)
+
+        def f_input(xx):
+            return np.sum(pool.forward(xx.reshape(shape)) * grad_out)
+        dx_num = finite_diff_grad(f_input, x.copy(), eps=1e-6)
+        assert rel_error(dx, dx_num) < 2e-6
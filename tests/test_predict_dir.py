@@ -0,0 +1,51 @@
+from pathlib import Path
+import numpy as np
+from dermascan.scripts.predict_dir import IMAGE_EXTENSIONS, find_images, score
+
+
+class _Predictor:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.calls = 0
+
+    def predict_batch(self, images, top_k=3):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise RuntimeError("out of memory")
+        return [[{"class_name": f"c{int(x[0, 0, 0])}", "confidence": 1.0}] for x in images]
+
+
+def _batch(root, ids, bad=()):
+    return [(root / f"{i}.jpg", OSError(f"cannot read {i}") if i in bad else np.full((3, 2, 2), i, np.float32))
+            for i in ids]
+
+
+def test_score_keeps_file_order_around_load_errors():
+    root = Path("/data")
+    records = score(_Predictor(), _batch(root, range(5), bad={0, 3}), 3, root)
+    assert [r["path"] for r in records] == [f"{i}.jpg" for i in range(5)]
+    assert records[0] == {"path": "0.jpg", "error": "cannot read 0"} and "predictions" not in records[3]
+    assert [r["predictions"][0]["class_name"] for r in records if "predictions" in r] == ["c1", "c2", "c4"]
+
+
+def test_score_turns_a_failed_forward_into_error_records():
+    root = Path("/data")
+    predictor = _Predictor(fail_on=1)
+    failed = score(predictor, _batch(root, range(3), bad={1}), 3, root)
+    assert failed[1]["error"] == "cannot read 1"
+    assert failed[0]["error"] == failed[2]["error"] == "Prediction failed: out of memory"
+    # the next batch is scored normally
+    ok = score(predictor, _batch(root, range(3, 5)), 3, root)
+    assert [r["predictions"][0]["class_name"] for r in ok] == ["c3", "c4"]
+    assert score(predictor, _batch(root, [5], bad={5}), 3, root) == [{"path": "5.jpg", "error": "cannot read 5"}]
+    assert predictor.calls == 2
+
+
+def test_find_images_walks_in_sorted_rglob_order(tmp_path):
+    for name in ["b.jpg", "a/x.PNG", "a/notes.txt", "a.jpg", "a/c/y.jpg", "a-b/z.jpeg", "c/d/e/w.tif"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_bytes(b"")
+    walked = find_images(tmp_path)
+    assert iter(walked) is walked  # lazy, not a prebuilt list
+    ref = [p for p in sorted(tmp_path.rglob("*")) if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS]
+    assert list(walked) == ref and len(ref) == 6
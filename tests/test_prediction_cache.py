@@ -0,0 +1,89 @@
+import asyncio
+from dermascan.inference import cache as cache_mod
+from dermascan.inference.cache import PredictionCache, prediction_key
+
+
+def test_prediction_key_depends_on_bytes_and_model_version():
+    assert prediction_key(b"img", "v1") == prediction_key(b"img", "v1")
+    assert prediction_key(b"img", "v1") != prediction_key(b"img", "v2")
+    assert prediction_key(b"img", "v1") != prediction_key(b"img2", "v1")
+
+
+def test_concurrent_duplicates_share_one_computation():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["result"]
+
+    async def main():
+        cache = PredictionCache()
+        results = await asyncio.gather(*[cache.get_or_compute("k", compute) for _ in range(5)])
+        assert all(r is results[0] for r in results)
+        assert await cache.get_or_compute("k", compute) is results[0]
+        return cache.stats()
+
+    stats = asyncio.run(main())
+    assert len(calls) == 1
+    assert (stats["misses"], stats["coalesced"], stats["hits"], stats["inflight"]) == (1, 4, 1, 0)
+
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def ok():
+        return 42
+
+    async def main():
+        cache = PredictionCache()
+        results = await asyncio.gather(*[cache.get_or_compute("k", fail) for _ in range(3)],
+                                       return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert await cache.get_or_compute("k", ok) == 42
+
+    asyncio.run(main())
+
+
+def test_ttl_expiry_and_lru_eviction(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_mod.time, "monotonic", lambda: now[0])
+
+    async def value(v):
+        return v
+
+    async def main():
+        cache = PredictionCache(max_entries=2, ttl_s=10.0)
+        get = lambda k, v: cache.get_or_compute(k, lambda: value(v))  # noqa: E731
+        await get("a", 1)
+        await get("b", 2)
+        assert await get("a", -1) == 1  # hit, "a" becomes most recent
+        await get("c", 3)  # evicts "b", the least recently used
+        assert await get("b", 22) == 22 and cache.evictions == 2  # and "b" evicted "a"
+        assert await get("c", -1) == 3
+        now[0] += 10.0
+        assert await get("c", 33) == 33 and cache.expirations == 1
+        return cache.stats()
+
+    stats = asyncio.run(main())
+    assert stats["size"] == 2 and stats["hits"] == 2 and stats["misses"] == 5
+
+
+def test_zero_entries_still_coalesces():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 1
+
+    async def main():
+        cache = PredictionCache(max_entries=0)
+        await asyncio.gather(*[cache.get_or_compute("k", compute) for _ in range(3)])
+        await cache.get_or_compute("k", compute)
+        return cache.stats()
+
+    stats = asyncio.run(main())
+    assert len(calls) == 2 and stats["size"] == 0 and stats["coalesced"] == 2
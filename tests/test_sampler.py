@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from src.data.batching import BatchIterator
+from src.data.sampler import AliasTable, WeightedSampler, build_sampler
+
+
+def test_alias_table_matches_weights():
+    w = np.array([1.0, 2.0, 0.0, 7.0])
+    draws = AliasTable(w).draw(100000, np.random.default_rng(0))
+    freq = np.bincount(draws, minlength=4) / draws.size
+    assert np.allclose(freq, w / w.sum(), atol=0.01)
+    assert freq[2] == 0.0
+
+
+def test_weighted_sampler_modes_and_lesion_groups():
+    y = np.array([0] * 90 + [1] * 10)
+    bal = WeightedSampler(y, mode="balanced", num_samples=500, seed=3)
+    assert np.allclose(list(bal.class_distribution(y).values()), [0.5, 0.5])
+    assert np.array_equal(bal.indices(1), bal.indices(1)) and len(bal.indices(2)) == 500
+    sqrt = WeightedSampler(y, mode="inverse_freq", power=0.5)
+    assert np.isclose(sqrt.class_distribution(y)[1], np.sqrt(10) / (np.sqrt(10) + np.sqrt(90)))
+    # class 0: one lesion with 80 photos and 10 single-photo lesions -> 11 equal lesions
+    groups = np.array(["big"] * 80 + [f"s{i}" for i in range(10)] + [f"m{i}" for i in range(10)])
+    grouped = WeightedSampler(y, groups=groups)
+    assert np.isclose(grouped.weights[:80].sum(), grouped.weights[80])
+    assert np.isclose(grouped.weights[:90].sum(), 0.5)
+
+    it = BatchIterator(np.arange(100.0)[:, None], y, batch_size=50, sampler=bal, prefetch=0)
+    labels = np.concatenate([yb.copy() for _, yb in it])
+    assert len(it) == 10 and labels.size == 500 and 0.35 < labels.mean() < 0.65
+
+
+def test_build_sampler_group_by_lesion_needs_groups():
+    y = np.array([0] * 6 + [1] * 2)
+    cfg = {"mode": "balanced", "group_by_lesion": True}
+    with pytest.raises(ValueError, match="group_by_lesion"):
+        build_sampler(cfg, y)
+    groups = np.array(["a"] * 5 + ["b", "c", "d"])
+    s = build_sampler(cfg, y, groups=groups)
+    assert np.isclose(s.weights[:5].sum(), s.weights[5])
+    assert build_sampler({"mode": "uniform", "group_by_lesion": True}, y) is None
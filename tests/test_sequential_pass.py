@@ -14,3 +14,34 @@ def test_lenet_mnist_forward_backward_shapes():
     grad_logits = softmax_cross_entropy_backward(logits, y1)
     dx = model.backward(grad_logits)
     assert dx.shape == x.shape
+
+
+def test_frozen_backbone_skips_backward_and_updates():
+    from src.core.optim import SGD
+    from src.train.loop import train
+    model = lenet_mnist(num_classes=10)
+    model.freeze(stop=len(model.layers) - 1)  # train only the last Dense
+    backbone = {k: v.copy() for k, v in model.params().items()}
+    called = []
+    model.register_backward_hook(lambda i, layer: called.append(i))
+
+    x = np.random.randn(4, 1, 28, 28).astype(np.float32)
+    logits = model.forward(x, training=True)
+    assert model.backward(softmax_cross_entropy_backward(logits, one_hot(np.arange(4), 10))) is None
+    assert called == [len(model.layers) - 1]
+    assert list(model.trainable_params()) == [f"{len(model.layers) - 1}.Dense.W", f"{len(model.layers) - 1}.Dense.b"]
+
+    train(model, SGD(lr=0.1), (x, np.arange(4)), None, epochs=1, batch_size=4)
+    after = model.params()
+    changed = [k for k in backbone if not np.array_equal(backbone[k], after[k])]
+    assert changed == list(model.trainable_params())
+
+
+def test_backward_without_input_grad_keeps_param_grads():
+    model = lenet_mnist(num_classes=10)
+    x = np.random.randn(4, 1, 28, 28).astype(np.float32)
+    grad_logits = softmax_cross_entropy_backward(model.forward(x, training=True), one_hot(np.arange(4), 10))
+    assert model.backward(grad_logits).shape == x.shape
+    full = {k: v.copy() for k, v in model.grads().items()}
+    assert model.backward(grad_logits, need_input_grad=False) is None
+    assert all(np.allclose(full[k], v) for k, v in model.grads().items())
@@ -0,0 +1,26 @@
+import numpy as np
+from dermascan.api.supervisor import _export, _is_float32_checkpoint
+from dermascan.inference.predictor import DermaScanPredictor, build_model
+from src.models.checkpoint import load_checkpoint, save_checkpoint
+
+
+def test_is_float32_checkpoint_and_export(tmp_path):
+    model = build_model(7)
+    f64 = save_checkpoint(str(tmp_path / "m.ckpt"), {**model.params(), **model.buffers()})
+    np.savez(tmp_path / "legacy.npz", W=np.zeros(3, np.float32))
+    assert not _is_float32_checkpoint(None)
+    assert not _is_float32_checkpoint(str(tmp_path / "missing.ckpt"))
+    assert not _is_float32_checkpoint(str(tmp_path / "legacy.npz"))
+    assert not _is_float32_checkpoint(f64)
+
+    f32 = str(tmp_path / "m.f32.ckpt")
+    _export(f64, f32)
+    assert _is_float32_checkpoint(f32)
+    src, _ = load_checkpoint(f64)
+    out, _ = load_checkpoint(f32)
+    assert src.keys() == out.keys()
+    assert all(np.array_equal(out[k], src[k].astype(np.float32)) for k in src)
+    x = np.random.default_rng(0).random((2, 3, 32, 32), dtype=np.float32)
+    a = DermaScanPredictor(f64, compile=False, image_size=(32, 32))._forward(x)
+    b = DermaScanPredictor(f32, compile=False, image_size=(32, 32))._forward(x)
+    assert np.allclose(a, b, atol=1e-5)
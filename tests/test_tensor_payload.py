@@ -0,0 +1,71 @@
+import io
+import numpy as np
+import pytest
+from dermascan.inference.tensor_payload import parse_tensor
+
+
+def _npy(x, version=None):
+    f = io.BytesIO()
+    np.lib.format.write_array(f, x, version=version)
+    return f.getvalue()
+
+
+@pytest.mark.parametrize("version", [(1, 0), (2, 0), (3, 0)])
+def test_npy_versions_are_viewed_without_copy(version):
+    x = np.random.default_rng(0).random((2, 3, 4, 5), dtype=np.float32)
+    body = _npy(x, version)
+    out = parse_tensor(body, "application/x-npy; charset=binary", (4, 5))
+    assert out.dtype == np.float32 and np.array_equal(out, x)
+    assert not out.flags.writeable and not out.flags.owndata
+
+
+def test_octet_stream_and_single_image():
+    x = np.arange(3 * 4 * 5, dtype=np.uint8).reshape(3, 4, 5)
+    out = parse_tensor(x.tobytes(), "application/octet-stream", (4, 5), shape_header="3x4x5")
+    assert out.shape == (1, 3, 4, 5) and out.dtype == np.uint8 and np.array_equal(out[0], x)
+
+
+@pytest.mark.parametrize("kwargs, match", [
+    ({"content_type": "image/png"}, "Content-Type"),
+    ({"shape_header": None}, "X-Tensor-Shape header is required"),
+    ({"shape_header": "2,3,a,5"}, "Invalid X-Tensor-Shape"),
+    ({"shape_header": "2,3,0,5"}, "Invalid X-Tensor-Shape"),
+    ({"dtype_header": "nope"}, "Invalid X-Tensor-Dtype"),
+    ({"dtype_header": "float64"}, "dtype must be"),
+    ({"dtype_header": ">f4"}, "dtype must be"),
+    ({"shape_header": "2,1,4,5"}, "Expected shape"),
+    ({"shape_header": "2,3,5,4"}, "Expected shape"),
+    ({"max_images": 1}, "At most 1 images"),
+    ({"body": bytes(2 * 3 * 4 * 5 - 1)}, "data bytes"),
+    ({"body": bytes(2 * 3 * 4 * 5 + 1)}, "data bytes"),
+])
+def test_octet_stream_rejects_bad_payloads(kwargs, match):
+    args = {"body": bytes(2 * 3 * 4 * 5), "content_type": "application/octet-stream",
+            "image_size": (4, 5), "shape_header": "2,3,4,5", "dtype_header": "uint8"}
+    args.update(kwargs)
+    with pytest.raises(ValueError, match=match):
+        parse_tensor(**args)
+
+
+def test_npy_rejects_bad_headers_dtypes_and_non_finite_values():
+    x = np.zeros((1, 3, 4, 5), dtype=np.float32)
+    with pytest.raises(ValueError, match="Not a .npy"):
+        parse_tensor(b"garbage", "application/x-npy", (4, 5))
+    body = bytearray(_npy(x))
+    body[6] = 9
+    with pytest.raises(ValueError, match="Unsupported .npy version"):
+        parse_tensor(bytes(body), "application/x-npy", (4, 5))
+    body = _npy(x).replace(b"'shape'", b"'shapf'")
+    with pytest.raises(ValueError, match="Invalid .npy header"):
+        parse_tensor(body, "application/x-npy", (4, 5))
+    with pytest.raises(ValueError, match="Fortran"):
+        parse_tensor(_npy(np.asfortranarray(np.zeros((2, 3, 4, 5), np.float32))), "application/x-npy", (4, 5))
+    with pytest.raises(ValueError, match="dtype must be"):
+        parse_tensor(_npy(x.astype(np.float64)), "application/x-npy", (4, 5))
+    with pytest.raises(ValueError, match="data bytes"):
+        parse_tensor(_npy(x)[:-4], "application/x-npy", (4, 5))
+    for bad in (np.nan, np.inf):
+        y = x.copy()
+        y[0, 1, 2, 3] = bad
+        with pytest.raises(ValueError, match="NaN or Inf"):
+            parse_tensor(_npy(y), "application/x-npy", (4, 5))
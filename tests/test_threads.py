@@ -0,0 +1,19 @@
+import sys
+from dermascan.inference.threads import blas_threads, preprocess_workers
+
+
+def test_blas_threads_and_preprocess_workers_from_env(monkeypatch):
+    monkeypatch.setitem(sys.modules, "threadpoolctl", None)  # not installed
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "DERMASCAN_PREPROCESS_WORKERS"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    assert blas_threads() == 8
+    monkeypatch.setenv("OMP_NUM_THREADS", "bad")
+    monkeypatch.setenv("OPENBLAS_NUM_THREADS", "3")
+    assert blas_threads() == 3
+    assert preprocess_workers() == 5
+    assert preprocess_workers(blas=7) == 2  # never below 2
+    monkeypatch.setenv("DERMASCAN_PREPROCESS_WORKERS", "0")
+    assert preprocess_workers() == 1
+    monkeypatch.setenv("DERMASCAN_PREPROCESS_WORKERS", "6")
+    assert preprocess_workers(blas=1) == 6